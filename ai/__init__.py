@@ -1,7 +1,25 @@
 # این فایل برای شناسایی پوشه ai به عنوان یک پکیج پایتون است
+#
+# کلاس‌ها در اولین دسترسی import می‌شوند (PEP 562) تا import پکیج ai
+# کتابخانه‌های سنگین یادگیری ماشین را بارگذاری نکند.
 
-from .analyzer import AIAnalyzer
-from .predictor import AIPredictor
-from .food_recognition import FoodRecognizer
+import importlib
 
-__all__ = ['AIAnalyzer', 'AIPredictor', 'FoodRecognizer']
\ No newline at end of file
+_EXPORTS = {
+    'AIAnalyzer': '.analyzer',
+    'AIPredictor': '.predictor',
+    'FoodRecognizer': '.food_recognition',
+}
+
+__all__ = ['AIAnalyzer', 'AIPredictor', 'FoodRecognizer']
+
+def __getattr__(name):
+    module_name = _EXPORTS.get(name)
+    if module_name is None:
+        raise AttributeError(f"module {__name__!r} has no attribute {name!r}")
+    value = getattr(importlib.import_module(module_name, __name__), name)
+    globals()[name] = value
+    return value
+
+def __dir__():
+    return sorted(list(globals()) + __all__)
@@ -7,14 +7,20 @@
 
 import logging
 from datetime import datetime
-import numpy as np
-from sklearn.linear_model import LinearRegression
-from sklearn.preprocessing import StandardScaler
-import joblib
 import os
 
+from utils.lazy import lazy_import
+from utils.logging import timed_event
+from utils.metrics import timed, counter, AI_TRAIN_SECONDS, AI_PREDICT_SECONDS
+
 logger = logging.getLogger(__name__)
 
+# sklearn و joblib سنگین‌اند و فقط هنگام اولین استفاده از مدل بارگذاری می‌شوند
+np = lazy_import('numpy')
+linear_model = lazy_import('sklearn.linear_model')
+preprocessing = lazy_import('sklearn.preprocessing')
+joblib = lazy_import('joblib')
+
 class AIAnalyzer:
     """
     کلاس تحلیل‌گر هوش مصنوعی برای تحلیل داده‌های قند خون
@@ -23,22 +29,57 @@ class AIAnalyzer:
         """مقداردهی اولیه تحلیلگر"""
         self.db = db_manager
         self.config = config
-        self.model_path = os.path.join('models', 'glucose_predictor.joblib')
-        self.scaler_path = os.path.join('models', 'scaler.joblib')
+        self.model_path, self.scaler_path = self._model_paths(config.get('AI') if config else None)
+        
+        # مدل در اولین دسترسی به model یا scaler بارگذاری یا ایجاد می‌شود
+        self._model = None
+        self._scaler = None
+        
+        # تغییر مسیر مدل در تنظیمات بدون راه‌اندازی مجدد اعمال می‌شود
+        subscribe = getattr(config, 'subscribe', None)
+        if subscribe is not None:
+            subscribe(self.apply_config, sections=('AI',))
+            
+    @staticmethod
+    def _model_paths(ai_config):
+        """مسیر فایل‌های مدل و مقیاس‌کننده از بخش AI تنظیمات"""
+        ai_config = ai_config or {}
+        return (ai_config.get('model_path') or os.path.join('models', 'glucose_predictor.joblib'),
+                ai_config.get('scaler_path') or os.path.join('models', 'scaler.joblib'))
         
-        # بارگذاری یا ایجاد مدل
-        self._load_or_create_model()
+    def apply_config(self, changes):
+        """بارگذاری مدل از مسیر جدید (در اولین استفاده) در صورت تغییر model_path یا scaler_path"""
+        paths = self._model_paths(changes.get('AI'))
+        if paths == (self.model_path, self.scaler_path):
+            return
+        self.model_path, self.scaler_path = paths
+        self._model = None
+        self._scaler = None
+        
+    @property
+    def model(self):
+        """مدل پیش‌بینی (بارگذاری تأخیری)"""
+        if self._model is None:
+            self._load_or_create_model()
+        return self._model
+        
+    @property
+    def scaler(self):
+        """مقیاس‌کننده ورودی مدل (بارگذاری تأخیری)"""
+        if self._scaler is None:
+            self._load_or_create_model()
+        return self._scaler
         
     def _load_or_create_model(self):
         """بارگذاری یا ایجاد مدل پیش‌بینی"""
         try:
             if os.path.exists(self.model_path) and os.path.exists(self.scaler_path):
-                self.model = joblib.load(self.model_path)
-                self.scaler = joblib.load(self.scaler_path)
+                self._model = joblib.load(self.model_path)
+                self._scaler = joblib.load(self.scaler_path)
                 logger.info("مدل پیش‌بینی با موفقیت بارگذاری شد")
             else:
-                self.model = LinearRegression()
-                self.scaler = StandardScaler()
+                self._model = linear_model.LinearRegression()
+                self._scaler = preprocessing.StandardScaler()
                 logger.info("مدل پیش‌بینی جدید ایجاد شد")
         except Exception as e:
             logger.error(f"خطا در بارگذاری/ایجاد مدل: {str(e)}")
@@ -60,33 +101,43 @@ class AIAnalyzer:
             logger.error(f"خطا در آماده‌سازی داده‌ها: {str(e)}")
             raise
             
+    @timed(AI_TRAIN_SECONDS, "مدت آموزش مدل")
     def train_model(self):
         """آموزش مدل با داده‌های جدید"""
-        try:
-            # دریافت داده‌های آموزشی
-            readings = self.db.get_glucose_readings(limit=100)  # 100 خوانش آخر
-            
-            if len(readings) < 2:
-                logger.warning("داده‌های کافی برای آموزش مدل وجود ندارد")
+        with timed_event('ai.train_model') as event:
+            try:
+                # دریافت داده‌های آموزشی
+                readings = self.db.get_glucose_readings(limit=100)  # 100 خوانش آخر
+                event['rows'] = len(readings)
+                
+                if len(readings) < 2:
+                    logger.warning("داده‌های کافی برای آموزش مدل وجود ندارد")
+                    event['outcome'] = 'skipped'
+                    return False
+                    
+                # آماده‌سازی داده‌ها
+                X, y = self._prepare_data(readings)
+                
+                # آموزش مدل
+                self.model.fit(X, y)
+                
+                # ذخیره مدل
+                joblib.dump(self.model, self.model_path)
+                joblib.dump(self.scaler, self.scaler_path)
+                
+                logger.info("مدل با موفقیت آموزش داده شد")
+                return True
+                
+            except Exception as e:
+                logger.error(f"خطا در آموزش مدل: {str(e)}")
+                event['outcome'] = 'error'
                 return False
                 
-            # آماده‌سازی داده‌ها
-            X, y = self._prepare_data(readings)
-            
-            # آموزش مدل
-            self.model.fit(X, y)
-            
-            # ذخیره مدل
-            joblib.dump(self.model, self.model_path)
-            joblib.dump(self.scaler, self.scaler_path)
-            
-            logger.info("مدل با موفقیت آموزش داده شد")
-            return True
-            
-        except Exception as e:
-            logger.error(f"خطا در آموزش مدل: {str(e)}")
-            return False
+            finally:
+                counter("ai_train_model_total", "تعداد آموزش مدل به تفکیک نتیجه",
+                        outcome=event.get('outcome', 'ok')).inc()
             
+    @timed(AI_PREDICT_SECONDS, "مدت پیش‌بینی")
     def predict_next_reading(self, current_value):
         """پیش‌بینی مقدار قند خون بعدی"""
         try:
@@ -100,6 +151,7 @@ class AIAnalyzer:
             
         except Exception as e:
             logger.error(f"خطا در پیش‌بینی: {str(e)}")
+            counter("ai_predict_failures_total", "پیش‌بینی‌های ناموفق").inc()
             return None
             
     def analyze_trends(self, readings):
@@ -8,7 +8,6 @@
 import logging
 import os
 import json
-import numpy as np
 
 class FoodRecognizer:
     """
@@ -7,15 +7,17 @@
 
 import logging
 from datetime import datetime, timedelta
-import numpy as np
 from .analyzer import AIAnalyzer
 
 class AIPredictor:
     """
     کلاس پیش‌بینی‌کننده قند خون با استفاده از هوش مصنوعی پیشرفته‌تر
     """
-    def __init__(self):
+    MODEL_VERSION = "1.0"
+
+    def __init__(self, db_manager=None):
         self.analyzer = AIAnalyzer()
+        self.db_manager = db_manager  # در صورت وجود، هر اجرای پیش‌بینی ذخیره می‌شود
         self.is_trained = False
         self.prediction_horizon = 24  # پیش‌بینی تا 24 ساعت آینده
 
@@ -52,7 +54,7 @@ class AIPredictor:
             confidence_scores = []
             
             # پیش‌بینی برای هر ساعت
-            for hour in range(24):
+            for hour in range(self.prediction_horizon):
                 glucose, confidence = self.analyzer.predict_glucose(hour)
                 if glucose is not None:
                     predictions.append({
@@ -65,12 +67,21 @@ class AIPredictor:
             # میانگین اطمینان
             avg_confidence = sum(confidence_scores) / len(confidence_scores) if confidence_scores else 0
             
-            return {
+            result = {
                 'predictions': predictions,
                 'avg_confidence': avg_confidence,
-                'prediction_date': (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d")
+                'prediction_date': (datetime.now() + timedelta(days=1)).strftime("%Y-%m-%d"),
+                'model_version': self.MODEL_VERSION
             }
             
+            # ذخیره کل افق پیش‌بینی در یک تراکنش
+            if self.db_manager is not None and predictions:
+                result['run_id'] = self.db_manager.insert_predictions_batch(
+                    user_id, result['prediction_date'], predictions, self.MODEL_VERSION
+                )
+            
+            return result
+            
         except Exception as e:
             logging.error(f"خطا در پیش‌بینی روز آینده: {e}")
             return None
@@ -0,0 +1,104 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بنچمارک تبدیل تاریخ: توابع تک‌مقداری (بدون و با حافظه نهان) در برابر نسخه‌های برداری NumPy
+
+اجرا:
+    python benchmarks/bench_date_conversion.py --rows 100000 --repeat 5
+"""
+
+import os
+import sys
+import time
+import argparse
+from datetime import date, datetime, timedelta
+
+import numpy as np
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_utils import (
+    gregorian_to_jalali, jalali_to_gregorian, format_datetime, gregorian_to_jalali_display,
+    gregorian_dates_to_jalali, jalali_dates_to_gregorian, format_datetimes,
+    get_date_cache_stats, clear_date_caches, parse_datetime_columns
+)
+
+# نسخه‌های بدون حافظه نهان برای مقایسه
+_uncached_g2j = gregorian_to_jalali.__wrapped__
+_uncached_j2g = jalali_to_gregorian.__wrapped__
+_uncached_display = gregorian_to_jalali_display.__wrapped__
+
+
+def build_inputs(rows):
+    """ساخت خوانش‌های آزمایشی (هر 5 دقیقه یک خوانش)"""
+    start = date(2020, 1, 1)
+    dates = [(start + timedelta(minutes=5 * i)).isoformat() for i in range(rows)]
+    times = [f"{(5 * i) % 1440 // 60:02d}:{(5 * i) % 60:02d}" for i in range(rows)]
+    jalali = list(gregorian_dates_to_jalali(dates, sep='-'))
+    return dates, times, jalali
+
+
+def best_of(repeat, func):
+    """کمترین زمان اجرا در چند تکرار (میلی‌ثانیه)"""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings) * 1000
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    dates, times, jalali = build_inputs(args.rows)
+    date_array, time_array, jalali_array = np.array(dates), np.array(times), np.array(jalali)
+
+    # اطمینان از یکسان بودن خروجی‌ها پیش از اندازه‌گیری
+    sample = slice(0, args.rows, max(1, args.rows // 1000))
+    assert [gregorian_to_jalali(d) for d in dates[sample]] == list(gregorian_dates_to_jalali(date_array[sample], sep='-'))
+    assert [jalali_to_gregorian(d) for d in jalali[sample]] == list(jalali_dates_to_gregorian(jalali_array[sample]))
+    assert ([np.datetime64(datetime.strptime(f"{d} {t}", "%Y-%m-%d %H:%M"), 'm') for d, t in zip(dates[sample], times[sample])]
+            == list(parse_datetime_columns(date_array[sample], time_array[sample])[0]))
+
+    cases = [
+        ('gregorian_to_jalali',
+         lambda: [_uncached_g2j(d) for d in dates],
+         lambda: [gregorian_to_jalali(d) for d in dates],
+         lambda: gregorian_dates_to_jalali(date_array, sep='-')),
+        ('jalali_to_gregorian',
+         lambda: [_uncached_j2g(d) for d in jalali],
+         lambda: [jalali_to_gregorian(d) for d in jalali],
+         lambda: jalali_dates_to_gregorian(jalali_array)),
+        ('format_datetime',
+         lambda: [f"{_uncached_display(d) or d} {t}" for d, t in zip(dates, times)],
+         lambda: [format_datetime(d, t) for d, t in zip(dates, times)],
+         lambda: format_datetimes(date_array, time_array)),
+        ('parse_datetime',
+         lambda: [datetime.strptime(f"{d} {t}", "%Y-%m-%d %H:%M") for d, t in zip(dates, times)],
+         None,
+         lambda: parse_datetime_columns(date_array, time_array)),
+    ]
+
+    print(f"rows={args.rows} repeat={args.repeat}")
+    clear_date_caches()
+    for name, scalar, cached, vectorized in cases:
+        scalar_ms = best_of(args.repeat, scalar)
+        vector_ms = best_of(args.repeat, vectorized)
+        line = f"{name:>20}: scalar={scalar_ms:9.1f} ms  "
+        if cached is not None:
+            cached_ms = best_of(args.repeat, cached)
+            line += f"cached={cached_ms:8.1f} ms  speedup(cached)={scalar_ms / cached_ms:6.1f}x  "
+        print(line + f"vectorized={vector_ms:8.1f} ms  speedup(vectorized)={scalar_ms / vector_ms:6.1f}x")
+
+    for name, stats in get_date_cache_stats().items():
+        print(f"{name:>28}: hits={stats['hits']} misses={stats['misses']} "
+              f"size={stats['size']}/{stats['maxsize']} hit_rate={stats['hit_rate']:.1%}")
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,106 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بنچمارک اسکن بازه‌ای خوانش‌ها با تنظیمات مختلف ذخیره‌سازی SQLite
+
+اجرا:
+    python benchmarks/bench_range_scan.py --rows 500000 --repeat 20
+"""
+
+import os
+import sys
+import time
+import shutil
+import random
+import sqlite3
+import argparse
+import tempfile
+from datetime import date, timedelta
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from database.db_manager import DatabaseManager
+from database.tuning import rebuild_page_size
+
+PROFILES = {
+    'default': {'mmap_size': 0, 'cache_size': -2000, 'page_size': 4096},
+    'mmap': {'mmap_size': 1 << 30, 'cache_size': -2000, 'page_size': 4096},
+    'mmap+cache': {'mmap_size': 1 << 30, 'cache_size': -262144, 'page_size': 4096},
+    'mmap+cache+16k': {'mmap_size': 1 << 30, 'cache_size': -262144, 'page_size': 16384},
+}
+
+
+def build_database(path, rows):
+    """ساخت پایگاه داده آزمایشی با خوانش‌های تصادفی (هر 5 دقیقه یک خوانش)"""
+    DatabaseManager(path).close()
+    start = date(2020, 1, 1)
+    conn = sqlite3.connect(path)
+    batch = []
+    for i in range(rows):
+        day = start + timedelta(minutes=5 * i)
+        minutes = (5 * i) % 1440
+        batch.append((1, day.strftime("%Y-%m-%d"), day.strftime("%Y/%m/%d"),
+                      f"{minutes // 60:02d}:{minutes % 60:02d}", random.randint(60, 250)))
+        if len(batch) == 10000:
+            conn.executemany("INSERT INTO readings (user_id, gregorian_date, jalali_date, time, glucose_level) "
+                             "VALUES (?, ?, ?, ?, ?)", batch)
+            batch = []
+    if batch:
+        conn.executemany("INSERT INTO readings (user_id, gregorian_date, jalali_date, time, glucose_level) "
+                         "VALUES (?, ?, ?, ?, ?)", batch)
+    conn.commit()
+    conn.close()
+
+
+def run_profile(path, settings, repeat):
+    """اجرای اسکن‌های بازه‌ای و بازگرداندن میانه زمان‌ها (میلی‌ثانیه)"""
+    rebuild_page_size(path, settings['page_size'])
+    db = DatabaseManager(path, settings)
+    timings = {'fetch_all_readings': [], 'fetch_recent_readings(90)': [], 'date_range(1 year)': [],
+               'jalali_month(1400/07)': []}
+
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        db.fetch_all_readings()
+        timings['fetch_all_readings'].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        db.fetch_recent_readings(days=90)
+        timings['fetch_recent_readings(90)'].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        db.fetch_readings_by_date_range("2021/01/01", "2021/12/29")
+        timings['date_range(1 year)'].append(time.perf_counter() - t0)
+
+        t0 = time.perf_counter()
+        db.fetch_readings_by_jalali_period(1400, month=7)
+        timings['jalali_month(1400/07)'].append(time.perf_counter() - t0)
+
+    db.close()
+    return {name: sorted(values)[len(values) // 2] * 1000 for name, values in timings.items()}
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--rows', type=int, default=200000)
+    parser.add_argument('--repeat', type=int, default=10)
+    args = parser.parse_args()
+
+    workdir = tempfile.mkdtemp(prefix='glucose_bench_')
+    try:
+        base = os.path.join(workdir, 'base.db')
+        build_database(base, args.rows)
+        print(f"rows={args.rows} repeat={args.repeat} size={os.path.getsize(base) / 1e6:.1f} MB")
+
+        for name, settings in PROFILES.items():
+            path = os.path.join(workdir, f'{name}.db')
+            shutil.copy2(base, path)
+            result = run_profile(path, settings, args.repeat)
+            print(f"{name:>16}: " + "  ".join(f"{k}={v:8.1f} ms" for k, v in result.items()))
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,97 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بنچمارک اعتبارسنجی خوانش: توابع جداگانه هر فیلد در برابر طرح‌واره کامپایل‌شده
+(رکورد در ثانیه)
+
+اجرا:
+    python benchmarks/bench_reading_schema.py --records 100000 --repeat 3
+"""
+
+import os
+import sys
+import time
+import random
+import argparse
+
+sys.path.insert(0, os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
+
+from utils.date_utils import jalali_to_gregorian
+from utils.validation import (
+    validate_glucose_level, validate_meal_status, validate_mood, validate_stress_level,
+    validate_exercise_minutes, validate_sleep_hours, VALID_MEAL_STATUSES, VALID_MOODS
+)
+from utils.reading_schema import READING_SCHEMA
+
+
+def build_records(count, invalid_ratio=0.05):
+    """ساخت رکوردهای خام شبیه ورودی فرم یا فایل (رشته‌ای)"""
+    rng = random.Random(42)
+    records = []
+    for _ in range(count):
+        record = {
+            'jalali_date': f"14{rng.randint(0, 3):02d}/{rng.randint(1, 12):02d}/{rng.randint(1, 29):02d}",
+            'time': f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}",
+            'glucose_level': str(rng.randint(40, 400)),
+            'description': '',
+            'meal_status': rng.choice(VALID_MEAL_STATUSES),
+            'mood': rng.choice(VALID_MOODS),
+            'stress_level': str(rng.randint(1, 10)),
+            'exercise_minutes': str(rng.randint(0, 120)),
+            'sleep_hours': f"{rng.uniform(4, 10):.1f}",
+        }
+        if rng.random() < invalid_ratio:
+            record[rng.choice(['glucose_level', 'time', 'mood'])] = 'x'
+        records.append(record)
+    return records
+
+
+def legacy_validate(record):
+    """مسیر پیشین: فراخوانی جداگانه اعتبارسنج هر فیلد و تبدیل تاریخ با jdatetime"""
+    ok_glucose, glucose = validate_glucose_level(record['glucose_level'])
+    ok_stress, stress = validate_stress_level(record['stress_level'])
+    ok_exercise, exercise = validate_exercise_minutes(record['exercise_minutes'])
+    ok_sleep, sleep = validate_sleep_hours(record['sleep_hours'])
+    hour, _, minute = record['time'].partition(':')
+    ok_time = hour.isdigit() and minute.isdigit() and int(hour) <= 23 and int(minute) <= 59
+    # تبدیل بدون حافظه نهان تا مقایسه منصفانه باشد
+    gregorian = jalali_to_gregorian.__wrapped__(record['jalali_date'].replace('/', '-'))
+    return (ok_glucose and ok_stress and ok_exercise and ok_sleep and ok_time and gregorian is not None
+            and validate_meal_status(record['meal_status']) and validate_mood(record['mood']))
+
+
+def best_of(repeat, func):
+    """کمترین زمان اجرا در چند تکرار (ثانیه)"""
+    timings = []
+    for _ in range(repeat):
+        t0 = time.perf_counter()
+        func()
+        timings.append(time.perf_counter() - t0)
+    return min(timings)
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__)
+    parser.add_argument('--records', type=int, default=100000)
+    parser.add_argument('--repeat', type=int, default=3)
+    args = parser.parse_args()
+
+    records = build_records(args.records)
+
+    # اطمینان از یکسان بودن نتیجه دو مسیر پیش از اندازه‌گیری
+    legacy_valid = sum(1 for record in records if legacy_validate(record))
+    schema_valid = len(READING_SCHEMA.normalize_many(records)[0])
+    assert legacy_valid == schema_valid, (legacy_valid, schema_valid)
+
+    legacy = best_of(args.repeat, lambda: [legacy_validate(record) for record in records])
+    compiled = best_of(args.repeat, lambda: READING_SCHEMA.normalize_many(records))
+
+    print(f"records={args.records} valid={schema_valid} repeat={args.repeat}")
+    print(f"{'per-field validators':>22}: {args.records / legacy:12,.0f} records/s")
+    print(f"{'compiled schema':>22}: {args.records / compiled:12,.0f} records/s  "
+          f"speedup={legacy / compiled:5.1f}x")
+
+
+if __name__ == "__main__":
+    main()
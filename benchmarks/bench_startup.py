@@ -0,0 +1,215 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بنچمارک راه‌اندازی: زمان تا نمایش اولین پنجره، زمان تا آمادگی تعامل و (برای
+main.py) زمان تا پایان مراحل پس‌زمینه، برای main.py و ghand2.py با پایگاه
+داده‌هایی با اندازه‌های مختلف
+
+هر اجرا در یک پوشه موقت تازه (با پایگاه داده از پیش پر شده) و یک مفسر تازه
+انجام می‌شود. برنامه با متغیر GLUCOSE_STARTUP_REPORT پس از آماده شدن گزارش
+مراحل (utils/startup.py) را می‌نویسد و بسته می‌شود. زمان‌ها نسبت به لحظه
+اجرای فرایند محاسبه می‌شوند، پس شروع مفسر هم در آن‌ها لحاظ است.
+
+به نمایشگر نیاز دارد؛ اگر DISPLAY تنظیم نشده باشد از xvfb-run استفاده می‌شود.
+
+اجرا:
+    python benchmarks/bench_startup.py
+    python benchmarks/bench_startup.py --targets main --sizes 0 10000 --repeat 5 --out startup.json
+"""
+
+import os
+import sys
+import json
+import time
+import random
+import shutil
+import sqlite3
+import argparse
+import platform
+import statistics
+import subprocess
+import tempfile
+from datetime import date, timedelta
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+sys.path.insert(0, ROOT)
+
+from utils.startup import STARTUP_REPORT_ENV
+
+TARGETS = {
+    'main': 'main.py',
+    'ghand2': 'ghand2.py',
+}
+
+
+def _rows(count):
+    """خوانش‌های ساختگی با تاریخ میلادی، شمسی و ساعت"""
+    import jdatetime
+
+    rng = random.Random(42)
+    start = date.today() - timedelta(days=count // 4 + 1)
+    for i in range(count):
+        day = start + timedelta(days=i // 4)
+        yield (day.isoformat(), jdatetime.date.fromgregorian(date=day).strftime('%Y/%m/%d'),
+               f"{rng.randint(0, 23):02d}:{rng.randint(0, 59):02d}", rng.randint(60, 300))
+
+
+def seed_main(workdir, count):
+    """ساخت data/glucose.db با طرح‌واره core.database_manager"""
+    from core.database_manager import DatabaseManager
+
+    db = DatabaseManager(os.path.join(workdir, 'data', 'glucose.db'))
+    db.close()
+    with sqlite3.connect(os.path.join(workdir, 'data', 'glucose.db')) as conn:
+        conn.executemany(
+            "INSERT INTO glucose_readings (value, date, time, note) VALUES (?, ?, ?, '')",
+            ((value, day, clock) for day, _, clock, value in _rows(count))
+        )
+
+
+def seed_ghand2(workdir, count):
+    """ساخت glucose_readings.db با طرح‌واره ghand2"""
+    from ghand2 import DatabaseManager
+
+    path = os.path.join(workdir, 'glucose_readings.db')
+    DatabaseManager(path)
+    with sqlite3.connect(path) as conn:
+        conn.executemany(
+            "INSERT INTO readings (user_id, gregorian_date, jalali_date, time, glucose_level) "
+            "VALUES (1, ?, ?, ?, ?)",
+            _rows(count)
+        )
+
+
+SEEDERS = {
+    'main': seed_main,
+    'ghand2': seed_ghand2,
+}
+
+
+def display_prefix():
+    """پیشوند فرمان برای محیط بدون نمایشگر"""
+    if os.environ.get('DISPLAY') or sys.platform in ('win32', 'darwin'):
+        return []
+    xvfb = shutil.which('xvfb-run')
+    if xvfb is None:
+        return None
+    return [xvfb, '-a']
+
+
+def run_once(target, size, prefix, timeout):
+    """
+    یک اجرای کامل برنامه تا آمادگی تعامل
+
+    Returns:
+        dict: زمان‌های مراحل و نقاط عطف (میلی‌ثانیه) یا خطا
+    """
+    workdir = tempfile.mkdtemp(prefix=f'bench_startup_{target}_')
+    try:
+        SEEDERS[target](workdir, size)
+        report_path = os.path.join(workdir, 'startup.json')
+        env = dict(os.environ, **{STARTUP_REPORT_ENV: report_path})
+        env['PYTHONPATH'] = os.pathsep.join(filter(None, [ROOT, env.get('PYTHONPATH')]))
+
+        spawned = time.time()
+        try:
+            result = subprocess.run(prefix + [sys.executable, os.path.join(ROOT, TARGETS[target])],
+                                    cwd=workdir, env=env, capture_output=True, text=True,
+                                    timeout=timeout)
+        except subprocess.TimeoutExpired:
+            return {'error': f'timeout after {timeout}s'}
+
+        if not os.path.exists(report_path):
+            return {'error': f'exit code {result.returncode}', 'stderr': result.stderr[-2000:]}
+        with open(report_path, encoding='utf-8') as f:
+            report = json.load(f)
+
+        # فاصله اجرای فرایند تا import شدن utils.startup (شروع مفسر و xvfb)
+        offset_ms = (report['origin_epoch'] - spawned) * 1000
+        run = {
+            'process_start_ms': round(offset_ms, 3),
+            'phases_ms': report['phases_ms'],
+            'marks_ms': {name: round(value + offset_ms, 3) for name, value in report['marks_ms'].items()},
+        }
+        if not report['completed']:
+            run['error'] = f'exit code {result.returncode} before startup completed'
+            run['stderr'] = result.stderr[-2000:]
+        return run
+    finally:
+        shutil.rmtree(workdir, ignore_errors=True)
+
+
+def summarize(runs):
+    """میانه زمان‌ها در اجراهای موفق"""
+    ok = [run for run in runs if 'error' not in run]
+    if not ok:
+        return None
+    summary = {'runs': len(ok), 'marks_ms': {}, 'phases_ms': {}}
+    for key in ('marks_ms', 'phases_ms'):
+        names = sorted({name for run in ok for name in run[key]})
+        for name in names:
+            values = [run[key][name] for run in ok if name in run[key]]
+            summary[key][name] = round(statistics.median(values), 3)
+    return summary
+
+
+def git_revision():
+    try:
+        return subprocess.run(['git', 'rev-parse', '--short', 'HEAD'], cwd=ROOT,
+                              capture_output=True, text=True).stdout.strip() or None
+    except OSError:
+        return None
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='بنچمارک زمان راه‌اندازی')
+    parser.add_argument('--targets', nargs='+', choices=sorted(TARGETS), default=sorted(TARGETS))
+    parser.add_argument('--sizes', nargs='+', type=int, default=[0, 1000, 50000],
+                        help='تعداد خوانش‌های پایگاه داده')
+    parser.add_argument('--repeat', type=int, default=3)
+    parser.add_argument('--timeout', type=float, default=120, help='حداکثر زمان هر اجرا (ثانیه)')
+    parser.add_argument('--out', help='مسیر فایل JSON خروجی (پیش‌فرض: خروجی استاندارد)')
+    args = parser.parse_args(argv)
+
+    prefix = display_prefix()
+    if prefix is None:
+        print("no DISPLAY and xvfb-run not found; cannot start the Tk window", file=sys.stderr)
+        return 2
+
+    results = {
+        'meta': {
+            'python': platform.python_version(),
+            'platform': platform.platform(),
+            'git_rev': git_revision(),
+            'repeat': args.repeat,
+            'timestamp': time.strftime('%Y-%m-%dT%H:%M:%S'),
+        },
+        'results': [],
+    }
+    failed = False
+    for target in args.targets:
+        for size in args.sizes:
+            runs = [run_once(target, size, prefix, args.timeout) for _ in range(max(1, args.repeat))]
+            summary = summarize(runs)
+            failed = failed or summary is None
+            results['results'].append({'target': target, 'size': size, 'median': summary, 'runs': runs})
+            if summary:
+                marks = summary['marks_ms']
+                print(f"{target:>7} size={size:>7}: first_window={marks.get('first_window', float('nan')):8.1f} ms "
+                      f"interactive={marks.get('interactive', float('nan')):8.1f} ms "
+                      f"ready={marks.get('ready', float('nan')):8.1f} ms", file=sys.stderr)
+            else:
+                print(f"{target:>7} size={size:>7}: failed ({runs[0].get('error')})", file=sys.stderr)
+
+    text = json.dumps(results, ensure_ascii=False, indent=2)
+    if args.out:
+        with open(args.out, 'w', encoding='utf-8') as f:
+            f.write(text + '\n')
+    else:
+        print(text)
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
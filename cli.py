@@ -0,0 +1,466 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+رابط خط فرمان سیستم مدیریت قند خون برای کارهای دسته‌ای بدون رابط گرافیکی
+
+دستورها مستقیماً از DatabaseManager و AIAnalyzer استفاده می‌کنند و tkinter یا
+backend گرافیکی matplotlib را وارد نمی‌کنند؛ بنابراین روی سرور بدون نمایشگر
+(مثلاً در cron) قابل اجرا هستند. خروجی هر دستور خط به خط و بلافاصله نوشته
+می‌شود. لاگ‌ها فقط در فایل نوشته می‌شوند مگر با --verbose.
+
+اجرا:
+    python cli.py import readings.csv
+    python cli.py export - --from 2024-01-01 > readings.csv
+    python cli.py train
+    python cli.py predict --value 145
+    python cli.py report --days 30 --json
+    python cli.py backup
+    python cli.py bench bench_range_scan --rows 100000
+    python main.py report --days 7          (همان دستورها از طریق main.py)
+"""
+
+import os
+import sys
+import csv
+import json
+import math
+import logging
+import argparse
+import subprocess
+from datetime import datetime
+from typing import Any, Dict, Iterator, List, Optional, Tuple
+
+ROOT = os.path.dirname(os.path.abspath(__file__))
+if ROOT not in sys.path:
+    sys.path.insert(0, ROOT)
+
+logger = logging.getLogger(__name__)
+
+EXPORT_FIELDS = ('id', 'value', 'date', 'time', 'note', 'created_at')
+BENCHMARKS_DIR = os.path.join(ROOT, 'benchmarks')
+DEFAULT_CONFIG_FILE = os.path.join('config', 'default_config.json')
+
+
+class CommandError(Exception):
+    """خطای قابل نمایش به کاربر؛ با کد خروج 1 پایان می‌یابد"""
+
+
+def emit(line: str = '', stream=None) -> None:
+    """نوشتن یک خط و تخلیه فوری بافر تا خروجی در لوله‌ها جریانی باشد"""
+    stream = stream or sys.stdout
+    stream.write(line + '\n')
+    stream.flush()
+
+
+def _resolve_format(path: str, fmt: Optional[str]) -> str:
+    """قالب فایل بر اساس آرگومان یا پسوند (پیش‌فرض csv)"""
+    if fmt:
+        return fmt
+    return 'jsonl' if path.lower().endswith(('.jsonl', '.json')) else 'csv'
+
+
+def _open_services(args, need_analyzer: bool = False):
+    """
+    ایجاد تنظیمات، مدیر پایگاه داده و (در صورت نیاز) تحلیلگر
+
+    Returns:
+        Tuple[ConfigManager, DatabaseManager, Optional[AIAnalyzer]]
+    """
+    from core.config_manager import ConfigManager
+    from core.database_manager import DatabaseManager
+
+    # تنظیمات فقط خوانده می‌شود؛ پایش فایل برای اجرای کوتاه لازم نیست
+    config = ConfigManager(args.config, save_delay=0)
+    db_name = args.db or config['DATABASE']['name']
+    db_manager = DatabaseManager(db_name, config['DATABASE'])
+    analyzer = None
+    if need_analyzer:
+        from ai.analyzer import AIAnalyzer
+        analyzer = AIAnalyzer(db_manager, config)
+    return config, db_manager, analyzer
+
+
+def _validate_date(value: str) -> Optional[str]:
+    """تاریخ میلادی YYYY-MM-DD یا None"""
+    try:
+        return datetime.strptime(value.strip(), '%Y-%m-%d').strftime('%Y-%m-%d')
+    except (ValueError, AttributeError):
+        return None
+
+
+# ---------------------------------------------------------------- import
+
+def _iter_import_records(path: str, fmt: str) -> Iterator[Tuple[int, Optional[Dict[str, Any]]]]:
+    """خواندن جریانی رکوردهای فایل ورودی به صورت (شماره سطر، رکورد)؛ سطر JSON نامعتبر None است"""
+    stream = sys.stdin if path == '-' else open(path, newline='', encoding='utf-8-sig')
+    try:
+        if fmt == 'csv':
+            for number, record in enumerate(csv.DictReader(stream), start=2):
+                yield number, record
+        else:
+            for number, line in enumerate(stream, start=1):
+                line = line.strip()
+                if not line:
+                    continue
+                try:
+                    yield number, json.loads(line)
+                except ValueError:
+                    yield number, None
+    finally:
+        if stream is not sys.stdin:
+            stream.close()
+
+
+def _parse_import_record(record: Optional[Dict[str, Any]]) -> Tuple[Optional[Tuple[float, str, str, str]], str]:
+    """
+    تبدیل و اعتبارسنجی یک رکورد ورودی
+
+    ستون‌ها: value (یا glucose_level)، date میلادی (یا jalali_date شمسی)، time و note اختیاری
+
+    Returns:
+        Tuple: (رکورد (value, date, time, note) یا None، پیام خطا)
+    """
+    from utils.date_utils import jalali_to_gregorian, validate_time
+    from utils.validation import validate_glucose_level
+
+    if not isinstance(record, dict):
+        return None, "invalid JSON record"
+    raw_value = record.get('value', record.get('glucose_level'))
+    try:
+        value = float(raw_value)
+    except (TypeError, ValueError):
+        value = math.nan
+    # مقادیر صادرشده از ستون REAL اعشاری هستند (مثلاً 120.0)
+    if not math.isfinite(value) or not validate_glucose_level(str(round(value)))[0]:
+        return None, f"invalid glucose value {raw_value!r}"
+
+    if record.get('date'):
+        date = _validate_date(str(record['date']))
+    elif record.get('jalali_date'):
+        date = jalali_to_gregorian(str(record['jalali_date']).strip().replace('/', '-'))
+    else:
+        date = None
+    if date is None:
+        return None, f"invalid date {record.get('date') or record.get('jalali_date')!r}"
+
+    time = str(record.get('time') or '').strip()
+    if not validate_time(time):
+        return None, f"invalid time {time!r}"
+    return (value, date, time, str(record.get('note') or record.get('description') or '')), ''
+
+
+def cmd_import(args) -> int:
+    """ورود خوانش‌ها از CSV یا JSON lines به صورت دسته‌ای"""
+    fmt = _resolve_format(args.file, args.format)
+    _, db_manager, _ = _open_services(args)
+    imported = rejected = 0
+    batch: List[Tuple[float, str, str, str]] = []
+
+    def flush_batch():
+        nonlocal imported
+        if batch and not args.dry_run:
+            db_manager.add_glucose_readings(batch)
+        imported += len(batch)
+        batch.clear()
+        emit(f"imported {imported} rows ({rejected} rejected)", sys.stderr)
+
+    try:
+        for number, record in _iter_import_records(args.file, fmt):
+            row, error = _parse_import_record(record)
+            if row is None:
+                rejected += 1
+                emit(f"line {number}: {error}", sys.stderr)
+                continue
+            batch.append(row)
+            if len(batch) >= args.batch_size:
+                flush_batch()
+        flush_batch()
+    finally:
+        db_manager.close()
+
+    emit(json.dumps({'imported': imported, 'rejected': rejected, 'dry_run': args.dry_run}))
+    return 0 if imported or not rejected else 1
+
+
+# ---------------------------------------------------------------- export
+
+def cmd_export(args) -> int:
+    """صدور خوانش‌ها به CSV یا JSON lines؛ '-' برای خروجی استاندارد"""
+    fmt = _resolve_format(args.file, args.format)
+    _, db_manager, _ = _open_services(args)
+    stream = sys.stdout if args.file == '-' else open(args.file, 'w', newline='', encoding='utf-8')
+    count = 0
+    try:
+        writer = None
+        if fmt == 'csv':
+            writer = csv.DictWriter(stream, fieldnames=EXPORT_FIELDS, extrasaction='ignore')
+            writer.writeheader()
+        for reading in db_manager.iter_glucose_readings(args.start, args.end, args.batch_size):
+            if writer is not None:
+                writer.writerow(reading)
+            else:
+                stream.write(json.dumps(reading, ensure_ascii=False) + '\n')
+            count += 1
+            if count % args.batch_size == 0:
+                stream.flush()
+        stream.flush()
+    finally:
+        if stream is not sys.stdout:
+            stream.close()
+        db_manager.close()
+
+    if args.file != '-':
+        emit(json.dumps({'exported': count, 'file': args.file}, ensure_ascii=False))
+    else:
+        emit(f"exported {count} rows", sys.stderr)
+    return 0
+
+
+# ---------------------------------------------------------------- train / predict
+
+def cmd_train(args) -> int:
+    """آموزش مدل پیش‌بینی با آخرین خوانش‌ها و ذخیره آن"""
+    _, db_manager, analyzer = _open_services(args, need_analyzer=True)
+    try:
+        emit("training model...", sys.stderr)
+        trained = analyzer.train_model()
+    finally:
+        db_manager.close()
+    emit(json.dumps({'trained': bool(trained), 'model_path': analyzer.model_path}, ensure_ascii=False))
+    return 0 if trained else 1
+
+
+def cmd_predict(args) -> int:
+    """پیش‌بینی خوانش بعدی از مقدار داده‌شده یا آخرین خوانش ثبت‌شده"""
+    _, db_manager, analyzer = _open_services(args, need_analyzer=True)
+    try:
+        current = args.value
+        if current is None:
+            latest = db_manager.get_glucose_readings(limit=1)
+            if not latest:
+                raise CommandError("no readings in the database; pass --value")
+            current = latest[0]['value']
+        predicted = analyzer.predict_next_reading(current)
+    finally:
+        db_manager.close()
+    if predicted is None:
+        raise CommandError("prediction failed (is the model trained?)")
+    emit(json.dumps({'current': current, 'predicted': float(predicted)}))
+    return 0
+
+
+# ---------------------------------------------------------------- report
+
+def cmd_report(args) -> int:
+    """
+    گزارش بازه زمانی: یک سطر برای هر روز (به محض خواندن) و در پایان خلاصه،
+    روند و توصیه‌های AIAnalyzer
+    """
+    from utils.date_utils import get_date_range, gregorian_to_jalali_display
+
+    start, end = args.start, args.end
+    if not start and not end:
+        start, end = get_date_range(args.days)
+    config, db_manager, analyzer = _open_services(args, need_analyzer=True)
+    low = config.get('GLUCOSE_LEVELS.normal_min', 70)
+    high = config.get('GLUCOSE_LEVELS.normal_max', 140)
+
+    def write_record(record, text):
+        emit(json.dumps(record, ensure_ascii=False) if args.json else text)
+
+    def write_day(day, values):
+        record = {
+            'type': 'day', 'date': day, 'jalali_date': gregorian_to_jalali_display(day),
+            'count': len(values), 'mean': round(sum(values) / len(values), 1),
+            'min': min(values), 'max': max(values),
+        }
+        write_record(record, f"{day} ({record['jalali_date']}): n={record['count']:<3} "
+                             f"mean={record['mean']:6.1f} min={record['min']:5.0f} max={record['max']:5.0f}")
+
+    readings = []
+    day, day_values = None, []
+    try:
+        for reading in db_manager.iter_glucose_readings(start, end):
+            if reading['date'] != day and day_values:
+                write_day(day, day_values)
+                day_values = []
+            day = reading['date']
+            day_values.append(reading['value'])
+            readings.append({'value': reading['value']})
+        if day_values:
+            write_day(day, day_values)
+    finally:
+        db_manager.close()
+
+    values = [r['value'] for r in readings]
+    summary: Dict[str, Any] = {'type': 'summary', 'from': start, 'to': end, 'count': len(values)}
+    if values:
+        mean = sum(values) / len(values)
+        summary.update({
+            'mean': round(mean, 1),
+            'std': round(math.sqrt(sum((v - mean) ** 2 for v in values) / len(values)), 1),
+            'min': min(values),
+            'max': max(values),
+            'time_in_range_pct': round(100 * sum(low <= v <= high for v in values) / len(values), 1),
+            'range': [low, high],
+            # فرمول ADA: HbA1c(%) = (میانگین قند خون + 46.7) / 28.7
+            'estimated_hba1c': round((mean + 46.7) / 28.7, 2),
+        })
+        trends = analyzer.analyze_trends(readings)
+        if trends:
+            summary['trend'] = trends['trend']
+            summary['slope'] = float(trends['slope'])
+        summary['recommendations'] = analyzer.get_recommendations(readings)
+
+    if args.json:
+        emit(json.dumps(summary, ensure_ascii=False))
+    else:
+        emit()
+        emit(f"period: {start} .. {end}  readings: {summary['count']}")
+        if values:
+            emit(f"mean={summary['mean']} std={summary['std']} min={summary['min']} max={summary['max']}")
+            emit(f"time in range [{low}-{high}]: {summary['time_in_range_pct']}%  "
+                 f"estimated HbA1c: {summary['estimated_hba1c']}%")
+            if 'trend' in summary:
+                emit(f"trend: {summary['trend']} (slope {summary['slope']})")
+            for recommendation in summary['recommendations']:
+                emit(f"- {recommendation}")
+    return 0
+
+
+# ---------------------------------------------------------------- backup / bench
+
+def cmd_backup(args) -> int:
+    """پشتیبان‌گیری از پایگاه داده در پوشه پشتیبان تنظیمات یا --dir"""
+    config, db_manager, _ = _open_services(args)
+    try:
+        backup_dir = args.dir or config.get('DATABASE.backup_dir', os.path.join('data', 'backups'))
+        path = db_manager.backup_database(backup_dir)
+    finally:
+        db_manager.close()
+    emit(json.dumps({'backup': path, 'bytes': os.path.getsize(path)}, ensure_ascii=False))
+    return 0
+
+
+def _list_benchmarks() -> List[str]:
+    return sorted(name[:-3] for name in os.listdir(BENCHMARKS_DIR)
+                  if name.startswith('bench_') and name.endswith('.py'))
+
+
+def cmd_bench(args) -> int:
+    """اجرای یکی از بنچمارک‌های پوشه benchmarks با آرگومان‌های داده‌شده"""
+    available = _list_benchmarks()
+    if not args.name:
+        for name in available:
+            emit(name)
+        return 0
+    name = args.name if args.name.startswith('bench_') else f"bench_{args.name}"
+    if name not in available:
+        raise CommandError(f"unknown benchmark {args.name!r}; available: {', '.join(available)}")
+    # اجرا در مفسر جداگانه با خروجی مشترک تا نتایج همان لحظه نمایش داده شوند
+    result = subprocess.run([sys.executable, os.path.join(BENCHMARKS_DIR, f"{name}.py"), *args.bench_args],
+                            cwd=ROOT)
+    return result.returncode
+
+
+# ---------------------------------------------------------------- parser
+
+def add_commands(parser: argparse.ArgumentParser, required: bool = False) -> None:
+    """
+    افزودن زیر‌دستورهای خط فرمان به parser (برای cli.py و main.py)
+
+    Args:
+        parser (argparse.ArgumentParser): parser اصلی
+        required (bool): آیا انتخاب یک دستور الزامی است
+    """
+    common = argparse.ArgumentParser(add_help=False)
+    common.add_argument('--config', default=DEFAULT_CONFIG_FILE, help="مسیر فایل تنظیمات")
+    common.add_argument('--db', help="مسیر پایگاه داده (پیش‌فرض: DATABASE.name در تنظیمات)")
+    common.add_argument('-v', '--verbose', action='store_true', help="نمایش لاگ‌ها در کنسول")
+
+    subparsers = parser.add_subparsers(dest='command', metavar='COMMAND')
+    subparsers.required = required
+
+    sub = subparsers.add_parser('import', parents=[common], help="ورود خوانش‌ها از CSV یا JSON lines")
+    sub.add_argument('file', help="فایل ورودی؛ '-' برای ورودی استاندارد")
+    sub.add_argument('--format', choices=('csv', 'jsonl'))
+    sub.add_argument('--batch-size', type=int, default=1000)
+    sub.add_argument('--dry-run', action='store_true', help="فقط اعتبارسنجی، بدون ثبت")
+    sub.set_defaults(handler=cmd_import)
+
+    sub = subparsers.add_parser('export', parents=[common], help="صدور خوانش‌ها به CSV یا JSON lines")
+    sub.add_argument('file', help="فایل خروجی؛ '-' برای خروجی استاندارد")
+    sub.add_argument('--format', choices=('csv', 'jsonl'))
+    sub.add_argument('--from', dest='start', metavar='YYYY-MM-DD')
+    sub.add_argument('--to', dest='end', metavar='YYYY-MM-DD')
+    sub.add_argument('--batch-size', type=int, default=1000)
+    sub.set_defaults(handler=cmd_export)
+
+    sub = subparsers.add_parser('train', parents=[common], help="آموزش مدل پیش‌بینی")
+    sub.set_defaults(handler=cmd_train)
+
+    sub = subparsers.add_parser('predict', parents=[common], help="پیش‌بینی خوانش بعدی")
+    sub.add_argument('--value', type=float, help="مقدار فعلی (پیش‌فرض: آخرین خوانش)")
+    sub.set_defaults(handler=cmd_predict)
+
+    sub = subparsers.add_parser('report', parents=[common], help="گزارش روزانه و خلاصه بازه زمانی")
+    sub.add_argument('--from', dest='start', metavar='YYYY-MM-DD')
+    sub.add_argument('--to', dest='end', metavar='YYYY-MM-DD')
+    sub.add_argument('--days', type=int, default=30, help="بازه پیش‌فرض: n روز گذشته")
+    sub.add_argument('--json', action='store_true', help="خروجی JSON lines")
+    sub.set_defaults(handler=cmd_report)
+
+    sub = subparsers.add_parser('backup', parents=[common], help="پشتیبان‌گیری از پایگاه داده")
+    sub.add_argument('--dir', help="پوشه پشتیبان (پیش‌فرض: DATABASE.backup_dir)")
+    sub.set_defaults(handler=cmd_backup)
+
+    sub = subparsers.add_parser('bench', parents=[common], help="اجرای بنچمارک‌ها (بدون نام: فهرست)")
+    sub.add_argument('name', nargs='?')
+    sub.add_argument('bench_args', nargs=argparse.REMAINDER, help="آرگومان‌های بنچمارک")
+    sub.set_defaults(handler=cmd_bench)
+
+
+def run_command(args) -> int:
+    """
+    اجرای دستور انتخاب‌شده
+
+    Returns:
+        int: کد خروج
+    """
+    from utils.logging import setup_logging, LOG_STRUCTURED_ENV
+
+    setup_logging(
+        log_dir='logs',
+        log_level=logging.INFO,
+        console=args.verbose,
+        structured=os.environ.get(LOG_STRUCTURED_ENV, '') == '1'
+    )
+    for option in ('start', 'end'):
+        value = getattr(args, option, None)
+        if value and _validate_date(value) is None:
+            emit(f"error: invalid date {value!r} (expected YYYY-MM-DD)", sys.stderr)
+            return 2
+    try:
+        return args.handler(args)
+    except CommandError as e:
+        emit(f"error: {e}", sys.stderr)
+        return 1
+    except BrokenPipeError:
+        # خواننده لوله (مثلاً head) زودتر بسته شده است
+        sys.stderr.close()
+        return 0
+    except Exception as e:
+        logger.error(f"خطا در اجرای دستور {args.command}: {str(e)}")
+        emit(f"error: {type(e).__name__}: {e}", sys.stderr)
+        return 1
+
+
+def main(argv=None) -> int:
+    parser = argparse.ArgumentParser(description="رابط خط فرمان سیستم مدیریت قند خون")
+    add_commands(parser, required=True)
+    return run_command(parser.parse_args(argv))
+
+
+if __name__ == "__main__":
+    sys.exit(main())
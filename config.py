@@ -7,7 +7,8 @@
 
 import os
 import logging
-import matplotlib.pyplot as plt
+
+from utils.lazy import lazy_import
 
 # مسیرهای پایه
 BASE_DIR = os.path.dirname(os.path.abspath(__file__))
@@ -144,6 +145,11 @@ CONFIG = {
 }
 
 
-# تنظیم matplotlib برای فارسی
-plt.rcParams['font.family'] = [CONFIG['CHART']['font_family']]
-plt.rcParams['axes.unicode_minus'] = False
\ No newline at end of file
+def _configure_matplotlib(pyplot):
+    """تنظیم matplotlib برای فارسی (در اولین استفاده از نمودار)"""
+    pyplot.rcParams['font.family'] = [CONFIG['CHART']['font_family']]
+    pyplot.rcParams['axes.unicode_minus'] = False
+
+
+# matplotlib فقط هنگام رسم اولین نمودار بارگذاری می‌شود
+plt = lazy_import('matplotlib.pyplot', on_load=_configure_matplotlib)
@@ -6,19 +6,88 @@
 """
 
 import os
+import copy
 import json
+import atexit
 import logging
-from typing import Any, Dict, Optional
+import threading
+from contextlib import contextmanager
+from functools import lru_cache
+from itertools import count
+from typing import Any, Callable, Dict, Iterable, Iterator, Optional, Set, Tuple
+
+from database.tuning import validate_storage_settings
+from utils.metrics_exporter import DEFAULT_MONITORING_SETTINGS
 
 logger = logging.getLogger(__name__)
 
+# نشانگر نبود کلید (None می‌تواند مقدار معتبر تنظیمات باشد)
+_MISSING = object()
+
+# رنگ‌های مورد استفاده تب‌ها (ui/tabs.py)؛ کلیدهای نبود در فایل تنظیمات از اینجا پر می‌شوند
+DEFAULT_UI_COLORS = {
+    "primary": "#4a7abc",
+    "accent": "#2ecc71",
+    "bg": "#f0f0f0",
+    "light_bg": "#ffffff",
+    "fg": "#333333",
+    "grid": "#888888",
+    "success": "green",
+    "error": "red",
+    "disabled_fg": "gray"
+}
+
+# اندازه نسبی فونت‌ها نسبت به UI.font_size و سبک آن‌ها
+UI_FONT_STYLES = {
+    "small": (-1, None),
+    "normal": (0, None),
+    "normal_bold": (0, "bold"),
+    "large": (2, "bold")
+}
+
+def default_ui_fonts(family: str, size: int) -> Dict[str, list]:
+    """
+    فونت‌های تب‌ها بر اساس خانواده و اندازه پایه
+    
+    Returns:
+        Dict[str, list]: نام فونت -> [خانواده، اندازه، (سبک)]
+    """
+    fonts = {}
+    for name, (delta, style) in UI_FONT_STYLES.items():
+        fonts[name] = [family, size + delta] + ([style] if style else [])
+    return fonts
+
 class ConfigManager:
     """کلاس مدیریت تنظیمات"""
     
-    def __init__(self, config_file: str = "config/default_config.json"):
-        """مقداردهی اولیه مدیر تنظیمات"""
+    def __init__(self, config_file: str = "config/default_config.json", save_delay: float = 0.5):
+        """
+        مقداردهی اولیه مدیر تنظیمات
+        
+        Args:
+            config_file (str): مسیر فایل تنظیمات
+            save_delay (float): تأخیر ذخیره پس از آخرین تغییر به ثانیه (0 = ذخیره فوری)
+        """
         self.config_file = config_file
+        self.save_delay = save_delay
+        self._lock = threading.RLock()
+        self._save_timer: Optional[threading.Timer] = None
+        self._dirty = False
+        self._batch_depth = 0
+        self._batch_backup = None
+        self._value_cache: Dict[str, Any] = {}
+        self._subscribers: Dict[int, Tuple[Callable, Optional[frozenset]]] = {}
+        self._tokens = count(1)
+        self._pending_sections: Set[str] = set()
+        self._file_stamp = None
+        self._watch_stop = threading.Event()
+        self._watch_thread: Optional[threading.Thread] = None
         self.config = self._load_config()
+        self._validate_config()
+        self._file_stamp = self._stat_file()
+        
+        # تغییرات در انتظار ذخیره هنگام خروج نوشته می‌شوند
+        atexit.register(self.flush)
         
     def _load_config(self) -> Dict[str, Any]:
         """بارگذاری تنظیمات از فایل"""
@@ -36,12 +105,17 @@ class ConfigManager:
                         "theme": "default",
                         "language": "fa",
                         "font_family": "Vazirmatn",
-                        "font_size": 10
+                        "font_size": 10,
+                        "colors": dict(DEFAULT_UI_COLORS),
+                        "fonts": default_ui_fonts("Vazirmatn", 10)
                     },
                     "DATABASE": {
                         "name": "data/glucose.db",
                         "backup_dir": "data/backups",
-                        "backup_interval": 7
+                        "backup_interval": 7,
+                        "mmap_size": 0,
+                        "cache_size": -2000,
+                        "page_size": 4096
                     },
                     "GLUCOSE_LEVELS": {
                         "low": 70,
@@ -67,14 +141,15 @@ class ConfigManager:
                     "REMINDERS": {
                         "check_interval": 60,
                         "notification_duration": 5,
-                        "sound_enabled": true
+                        "sound_enabled": True
                     },
                     "EXPORT": {
                         "formats": ["csv", "pdf", "excel"],
                         "default_format": "csv",
                         "date_format": "%Y/%m/%d",
                         "time_format": "%H:%M"
-                    }
+                    },
+                    "MONITORING": dict(DEFAULT_MONITORING_SETTINGS)
                 }
                 
                 # ایجاد پوشه config اگر وجود نداشته باشد
@@ -90,14 +165,52 @@ class ConfigManager:
             logger.error(f"خطا در بارگذاری تنظیمات: {str(e)}")
             raise
             
+    def _validate_config(self, config: Optional[Dict[str, Any]] = None) -> None:
+        """اعتبارسنجی تنظیمات در زمان راه‌اندازی یا بارگذاری مجدد"""
+        if config is None:
+            config = self.config
+        try:
+            database = config.setdefault("DATABASE", {})
+            database.update(validate_storage_settings(database))
+            
+            # فایل‌های تنظیمات قدیمی رنگ‌ها و فونت‌های رابط کاربری را ندارند
+            ui = config.setdefault("UI", {})
+            colors = ui.setdefault("colors", {})
+            for key, value in DEFAULT_UI_COLORS.items():
+                colors.setdefault(key, value)
+            fonts = ui.setdefault("fonts", {})
+            for key, value in default_ui_fonts(ui.get("font_family", "Vazirmatn"),
+                                               int(ui.get("font_size", 10))).items():
+                fonts.setdefault(key, value)
+            
+            # فایل‌های تنظیمات قدیمی بخش MONITORING ندارند
+            monitoring = config.setdefault("MONITORING", {})
+            for key, value in DEFAULT_MONITORING_SETTINGS.items():
+                monitoring.setdefault(key, value)
+        except ValueError as e:
+            logger.error(f"تنظیمات پایگاه داده نامعتبر است: {str(e)}")
+            raise
+            
     def save_config(self, config: Optional[Dict[str, Any]] = None) -> None:
-        """ذخیره تنظیمات در فایل"""
+        """
+        ذخیره فوری و اتمی تنظیمات در فایل
+        
+        فایل ابتدا با نام موقت در همان پوشه نوشته و سپس با os.replace جایگزین
+        می‌شود تا قطع برنامه در میانه نوشتن فایل تنظیمات را خراب نکند.
+        """
         try:
-            if config is None:
-                config = self.config
-                
-            with open(self.config_file, 'w', encoding='utf-8') as f:
-                json.dump(config, f, indent=4, ensure_ascii=False)
+            with self._lock:
+                self._cancel_pending_save()
+                if config is None:
+                    config = self.config
+                    
+                temp_file = f"{self.config_file}.tmp"
+                with open(temp_file, 'w', encoding='utf-8') as f:
+                    json.dump(config, f, indent=4, ensure_ascii=False)
+                os.replace(temp_file, self.config_file)
+                self._dirty = False
+                # نوشتن خود برنامه نباید به عنوان تغییر خارجی بارگذاری شود
+                self._file_stamp = self._stat_file()
                 
             logger.info(f"تنظیمات در فایل {self.config_file} ذخیره شد")
             
@@ -105,35 +218,128 @@ class ConfigManager:
             logger.error(f"خطا در ذخیره تنظیمات: {str(e)}")
             raise
             
-    def get(self, key: str, default: Any = None) -> Any:
-        """دریافت مقدار تنظیمات"""
-        try:
-            keys = key.split('.')
-            value = self.config
+    def _cancel_pending_save(self) -> None:
+        if self._save_timer is not None:
+            self._save_timer.cancel()
+            self._save_timer = None
             
-            for k in keys:
-                value = value[k]
-                
-            return value
+    def _schedule_save(self) -> None:
+        """
+        ذخیره با تأخیر (debounce): تغییرات پیاپی در یک بازه save_delay ثانیه‌ای
+        فقط یک بار نوشته می‌شوند؛ داخل batch ذخیره به پایان batch موکول می‌شود
+        """
+        with self._lock:
+            self._dirty = True
+            if self._batch_depth:
+                return
+            self._cancel_pending_save()
+            if self.save_delay <= 0:
+                self.save_config()
+                return
+            self._save_timer = threading.Timer(self.save_delay, self.flush)
+            self._save_timer.daemon = True
+            self._save_timer.start()
             
-        except (KeyError, TypeError):
-            return default
+    def flush(self) -> None:
+        """نوشتن فوری تغییرات ذخیره‌نشده (در خروج برنامه نیز صدا زده می‌شود)"""
+        with self._lock:
+            if not self._dirty:
+                return
+            try:
+                self.save_config()
+            except Exception:
+                # خطا در save_config ثبت شده است؛ تغییرات در حافظه باقی می‌مانند
+                pass
             
+    @contextmanager
+    def batch(self) -> Iterator["ConfigManager"]:
+        """
+        اعمال چند تغییر با یک بار ذخیره
+        
+        تغییرات داخل بلوک فقط یک بار (با تأخیر save_delay) ذخیره می‌شوند؛ در صورت
+        بروز استثنا همه تغییرات بلوک برگردانده می‌شوند. بلوک‌های تودرتو مجازند.
+        
+        مثال:
+            with config.batch():
+                config['UI.theme'] = 'dark'
+                config['UI.font_size'] = 12
+        """
+        with self._lock:
+            if self._batch_depth == 0:
+                self._batch_backup = (copy.deepcopy(self.config), self._dirty)
+            self._batch_depth += 1
+        try:
+            yield self
+        except BaseException:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self.config, self._dirty = self._batch_backup
+                    self._batch_backup = None
+                    self._value_cache.clear()
+                    self._pending_sections.clear()
+            raise
+        else:
+            with self._lock:
+                self._batch_depth -= 1
+                if self._batch_depth == 0:
+                    self._batch_backup = None
+                    if self._dirty:
+                        self._schedule_save()
+            self._publish_pending()
+                        
+    @staticmethod
+    @lru_cache(maxsize=256)
+    def _split_key(key: str) -> Tuple[str, ...]:
+        return tuple(key.split('.'))
+        
+    def _resolve(self, key: str) -> Any:
+        """پیمایش کلید نقطه‌دار؛ در نبود کلید _MISSING برمی‌گرداند"""
+        value = self.config
+        try:
+            for k in self._split_key(key):
+                value = value[k]
+        except (KeyError, TypeError):
+            return _MISSING
+        return value
+        
+    def get(self, key: str, default: Any = None) -> Any:
+        """
+        دریافت مقدار تنظیمات
+        
+        مقدار هر کلید نقطه‌دار پس از اولین پیمایش در حافظه نهان نگه داشته می‌شود
+        و با هر set یا batch ناموفق باطل می‌شود. تغییر مستقیم دیکشنری‌های
+        برگشتی (بدون set) در حافظه نهان دیده نمی‌شود.
+        """
+        value = self._value_cache.get(key, _MISSING)
+        if value is _MISSING:
+            value = self._resolve(key)
+            if value is _MISSING:
+                return default
+            self._value_cache[key] = value
+        return value
+        
     def set(self, key: str, value: Any) -> None:
-        """تنظیم مقدار تنظیمات"""
+        """تنظیم مقدار تنظیمات و زمان‌بندی ذخیره"""
         try:
-            keys = key.split('.')
-            config = self.config
-            
-            # پیدا کردن آخرین کلید
-            for k in keys[:-1]:
-                config = config[k]
+            keys = self._split_key(key)
+            with self._lock:
+                config = self.config
                 
-            # تنظیم مقدار
-            config[keys[-1]] = value
-            
-            # ذخیره تغییرات
-            self.save_config()
+                # پیدا کردن آخرین کلید
+                for k in keys[:-1]:
+                    config = config[k]
+                    
+                # تنظیم مقدار
+                config[keys[-1]] = value
+                
+                # مقادیر ذخیره‌شده این کلید، والدها و فرزندانش دیگر معتبر نیستند
+                self._value_cache.clear()
+                self._pending_sections.add(keys[0])
+                
+            # ذخیره تغییرات (با تأخیر)
+            self._schedule_save()
+            self._publish_pending()
             
         except Exception as e:
             logger.error(f"خطا در تنظیم مقدار {key}: {str(e)}")
@@ -149,8 +355,143 @@ class ConfigManager:
         
     def __contains__(self, key: str) -> bool:
         """پشتیبانی از عملگر in"""
+        return self.get(key, _MISSING) is not _MISSING
+        
+    # ------------------------------------------------------------------
+    # اشتراک در تغییرات و بارگذاری مجدد خودکار فایل
+    # ------------------------------------------------------------------
+    
+    def subscribe(self, callback: Callable[[Dict[str, Any]], None],
+                  sections: Optional[Iterable[str]] = None) -> int:
+        """
+        اشتراک در تغییرات تنظیمات
+        
+        Args:
+            callback (Callable[[Dict[str, Any]], None]): دریافت‌کننده {نام بخش: مقدار جدید}؛
+                مقدار بخش حذف‌شده None است
+            sections (Optional[Iterable[str]]): فقط این بخش‌ها (کلیدهای سطح اول)؛ None برای همه
+            
+        Returns:
+            int: شناسه اشتراک برای لغو با unsubscribe
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (callback, frozenset(sections) if sections else None)
+        return token
+        
+    def unsubscribe(self, token: int) -> None:
+        """لغو اشتراک"""
+        with self._lock:
+            self._subscribers.pop(token, None)
+            
+    def _publish_pending(self) -> None:
+        """ارسال بخش‌های تغییریافته با set (خارج از batch)"""
+        with self._lock:
+            if self._batch_depth or not self._pending_sections:
+                return
+            changes = {section: self.config.get(section) for section in self._pending_sections}
+            self._pending_sections.clear()
+        self._publish(changes)
+        
+    def _publish(self, changes: Dict[str, Any]) -> None:
+        """
+        ارسال تغییرات به مشترکین مرتبط
+        
+        فراخوانی‌ها در رشته تغییردهنده (یا رشته پایش فایل) انجام می‌شوند؛
+        شنونده‌های رابط کاربری باید تغییر را با after به رشته Tk منتقل کنند.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+            
+        for callback, sections in subscribers:
+            relevant = changes if sections is None else \
+                {name: value for name, value in changes.items() if name in sections}
+            if not relevant:
+                continue
+            try:
+                callback(relevant)
+            except Exception as e:
+                logger.error(f"خطا در اعمال تغییر تنظیمات {', '.join(relevant)}: {str(e)}")
+                
+    def _stat_file(self) -> Optional[Tuple[int, int]]:
+        """زمان تغییر و اندازه فایل تنظیمات (None در نبود فایل)"""
         try:
-            self.get(key)
-            return True
-        except (KeyError, TypeError):
-            return False 
\ No newline at end of file
+            stat = os.stat(self.config_file)
+        except OSError:
+            return None
+        return stat.st_mtime_ns, stat.st_size
+        
+    def check_for_changes(self) -> Dict[str, Any]:
+        """
+        بارگذاری مجدد فایل در صورت تغییر و اطلاع‌رسانی بخش‌های تغییریافته
+        
+        هزینه حالت بدون تغییر فقط یک os.stat است. فایل نامعتبر (JSON خراب یا
+        تنظیمات پایگاه داده نادرست) نادیده گرفته می‌شود و تنظیمات فعلی باقی می‌ماند.
+        
+        Returns:
+            Dict[str, Any]: بخش‌های تغییریافته و مقادیر جدید آن‌ها
+        """
+        stamp = self._stat_file()
+        if stamp is None or stamp == self._file_stamp:
+            return {}
+            
+        with self._lock:
+            self._file_stamp = stamp
+            try:
+                with open(self.config_file, 'r', encoding='utf-8') as f:
+                    new_config = json.load(f)
+                if not isinstance(new_config, dict):
+                    raise ValueError("ریشه فایل تنظیمات باید شیء JSON باشد")
+                self._validate_config(new_config)
+            except (OSError, ValueError) as e:
+                logger.error(f"فایل تنظیمات تغییرکرده نامعتبر است و نادیده گرفته شد: {str(e)}")
+                return {}
+                
+            if self._dirty:
+                # ویرایش خارجی بر تغییرات ذخیره‌نشده برنامه اولویت دارد
+                logger.warning("تغییرات ذخیره‌نشده تنظیمات با نسخه فایل جایگزین شد")
+                self._cancel_pending_save()
+                self._dirty = False
+                
+            old_config = self.config
+            changes = {
+                section: new_config.get(section)
+                for section in set(old_config) | set(new_config)
+                if old_config.get(section, _MISSING) != new_config.get(section, _MISSING)
+            }
+            self.config = new_config
+            self._value_cache.clear()
+            
+        if changes:
+            logger.info(f"تنظیمات از فایل بارگذاری مجدد شد؛ بخش‌های تغییرکرده: {', '.join(sorted(changes))}")
+            self._publish(changes)
+        return changes
+        
+    def start_watching(self, interval: float = 2.0) -> None:
+        """
+        پایش دوره‌ای فایل تنظیمات در یک رشته daemon
+        
+        Args:
+            interval (float): فاصله بررسی به ثانیه
+        """
+        if self._watch_thread is not None:
+            return
+        self._watch_stop.clear()
+        
+        def watch():
+            while not self._watch_stop.wait(interval):
+                try:
+                    self.check_for_changes()
+                except Exception as e:
+                    logger.error(f"خطا در پایش فایل تنظیمات: {str(e)}")
+                    
+        self._watch_thread = threading.Thread(target=watch, name='config-watcher', daemon=True)
+        self._watch_thread.start()
+        logger.info(f"پایش فایل تنظیمات {self.config_file} هر {interval} ثانیه")
+        
+    def stop_watching(self) -> None:
+        """توقف پایش فایل تنظیمات"""
+        self._watch_stop.set()
+        if self._watch_thread is not None:
+            self._watch_thread.join(timeout=5)
+            self._watch_thread = None
@@ -10,21 +10,32 @@ import sqlite3
 import logging
 import shutil
 from datetime import datetime
-from typing import List, Dict, Any, Optional, Tuple
+from typing import List, Dict, Any, Iterable, Iterator, Optional, Tuple
+
+from database.tuning import validate_storage_settings, apply_connection_pragmas
+from database.events import ChangeEvent, ChangeEventBus, INSERT, UPDATE
+from utils.logging import timed_event
+from utils.metrics import timed, gauge, DB_QUERY_SECONDS, BACKUP_SECONDS, BACKUP_BYTES
 
 logger = logging.getLogger(__name__)
 
 class DatabaseManager:
     """کلاس مدیریت پایگاه داده"""
     
-    def __init__(self, db_name: str = "data/glucose.db"):
+    def __init__(self, db_name: str = "data/glucose.db", storage_settings: Optional[Dict[str, Any]] = None):
         """مقداردهی اولیه مدیر پایگاه داده"""
         self.db_name = db_name
+        self.storage_settings = validate_storage_settings(storage_settings)
         self.conn = None
         self.cursor = None
+        # رویدادهای تغییر داده برای به‌روزرسانی تدریجی تب‌ها؛ نام جداول در رویدادها
+        # همان نام‌های database.db_manager است (خوانش‌ها: readings) تا تب‌ها با هر دو کار کنند
+        self.events = ChangeEventBus()
         
-        # ایجاد پوشه data اگر وجود نداشته باشد
-        os.makedirs(os.path.dirname(db_name), exist_ok=True)
+        # ایجاد پوشه data اگر وجود نداشته باشد (نام فایل بدون پوشه در پوشه جاری است)
+        db_dir = os.path.dirname(db_name)
+        if db_dir:
+            os.makedirs(db_dir, exist_ok=True)
         
         # اتصال به پایگاه داده
         self._connect()
@@ -35,7 +46,10 @@ class DatabaseManager:
     def _connect(self) -> None:
         """اتصال به پایگاه داده"""
         try:
-            self.conn = sqlite3.connect(self.db_name)
+            # اتصال در رشته راه‌اندازی پس‌زمینه باز و پس از آماده شدن به رشته
+            # رابط کاربری سپرده می‌شود؛ دو رشته هم‌زمان از آن استفاده نمی‌کنند
+            self.conn = sqlite3.connect(self.db_name, check_same_thread=False)
+            apply_connection_pragmas(self.conn, self.storage_settings)
             self.conn.row_factory = sqlite3.Row
             self.cursor = self.conn.cursor()
             logger.info(f"اتصال به پایگاه داده {self.db_name} برقرار شد")
@@ -97,6 +111,7 @@ class DatabaseManager:
             logger.error(f"خطا در ایجاد جداول: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='add_glucose_reading')
     def add_glucose_reading(self, value: float, date: str, time: str, note: str = "") -> int:
         """افزودن خوانش قند خون جدید"""
         try:
@@ -108,12 +123,14 @@ class DatabaseManager:
             self.conn.commit()
             reading_id = self.cursor.lastrowid
             logger.info(f"خوانش قند خون جدید با شناسه {reading_id} ثبت شد")
+            self.notify_change('readings', INSERT, reading_id)
             return reading_id
             
         except Exception as e:
             logger.error(f"خطا در ثبت خوانش قند خون: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='get_glucose_readings')
     def get_glucose_readings(
         self,
         start_date: Optional[str] = None,
@@ -153,6 +170,79 @@ class DatabaseManager:
             logger.error(f"خطا در دریافت خوانش‌های قند خون: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='add_glucose_readings')
+    def add_glucose_readings(self, readings: Iterable[Tuple[float, str, str, str]]) -> int:
+        """
+        افزودن دسته‌ای خوانش‌ها در یک تراکنش
+        
+        Args:
+            readings (Iterable[Tuple[float, str, str, str]]): رکوردهای (value, date, time, note)
+            
+        Returns:
+            int: تعداد خوانش‌های ثبت‌شده
+        """
+        try:
+            with timed_event('reading.insert_batch') as event:
+                before = self.conn.total_changes
+                self.cursor.executemany("""
+                    INSERT INTO glucose_readings (value, date, time, note)
+                    VALUES (?, ?, ?, ?)
+                """, readings)
+                self.conn.commit()
+                event['rows'] = self.conn.total_changes - before
+            if event['rows']:
+                # رویداد گروهی؛ شنونده‌ها داده‌ها را کامل بارگذاری می‌کنند
+                self.notify_change('readings', INSERT)
+            return event['rows']
+            
+        except Exception as e:
+            self.conn.rollback()
+            logger.error(f"خطا در ثبت دسته‌ای خوانش‌ها: {str(e)}")
+            raise
+            
+    def iter_glucose_readings(
+        self,
+        start_date: Optional[str] = None,
+        end_date: Optional[str] = None,
+        batch_size: int = 1000
+    ) -> Iterator[Dict[str, Any]]:
+        """
+        پیمایش خوانش‌ها به ترتیب زمانی بدون بارگذاری همه آن‌ها در حافظه
+        
+        Args:
+            start_date (Optional[str]): تاریخ شروع (YYYY-MM-DD)
+            end_date (Optional[str]): تاریخ پایان (YYYY-MM-DD)
+            batch_size (int): تعداد سطرهای خوانده‌شده در هر مرحله
+            
+        Yields:
+            Dict[str, Any]: خوانش
+        """
+        conditions = []
+        params = []
+        if start_date:
+            conditions.append("date >= ?")
+            params.append(start_date)
+        if end_date:
+            conditions.append("date <= ?")
+            params.append(end_date)
+        query = "SELECT * FROM glucose_readings"
+        if conditions:
+            query += " WHERE " + " AND ".join(conditions)
+        query += " ORDER BY date, time"
+        
+        # نشانگر جداگانه تا پیمایش با پرس‌وجوهای دیگر تداخل نداشته باشد
+        cursor = self.conn.execute(query, params)
+        try:
+            while True:
+                rows = cursor.fetchmany(batch_size)
+                if not rows:
+                    break
+                for row in rows:
+                    yield dict(row)
+        finally:
+            cursor.close()
+            
+    @timed(DB_QUERY_SECONDS, method='add_user')
     def add_user(self, name: str) -> int:
         """افزودن کاربر جدید"""
         try:
@@ -164,12 +254,14 @@ class DatabaseManager:
             self.conn.commit()
             user_id = self.cursor.lastrowid
             logger.info(f"کاربر جدید با شناسه {user_id} ایجاد شد")
+            self.notify_change('users', INSERT, user_id, user_id)
             return user_id
             
         except Exception as e:
             logger.error(f"خطا در ایجاد کاربر: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='get_user')
     def get_user(self, user_id: int) -> Optional[Dict[str, Any]]:
         """دریافت اطلاعات کاربر"""
         try:
@@ -185,6 +277,7 @@ class DatabaseManager:
             logger.error(f"خطا در دریافت اطلاعات کاربر: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='add_reminder')
     def add_reminder(self, title: str, time: str, repeat: str) -> int:
         """افزودن یادآوری جدید"""
         try:
@@ -196,12 +289,14 @@ class DatabaseManager:
             self.conn.commit()
             reminder_id = self.cursor.lastrowid
             logger.info(f"یادآوری جدید با شناسه {reminder_id} ایجاد شد")
+            self.notify_change('reminders', INSERT, reminder_id)
             return reminder_id
             
         except Exception as e:
             logger.error(f"خطا در ایجاد یادآوری: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='get_reminders')
     def get_reminders(self, active_only: bool = True) -> List[Dict[str, Any]]:
         """دریافت یادآوری‌ها"""
         try:
@@ -222,6 +317,7 @@ class DatabaseManager:
             logger.error(f"خطا در دریافت یادآوری‌ها: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='update_user_settings')
     def update_user_settings(self, user_id: int, settings: Dict[str, Any]) -> None:
         """به‌روزرسانی تنظیمات کاربر"""
         try:
@@ -243,11 +339,13 @@ class DatabaseManager:
             
             self.conn.commit()
             logger.info(f"تنظیمات کاربر {user_id} به‌روزرسانی شد")
+            self.notify_change('users', UPDATE, user_id, user_id)
             
         except Exception as e:
             logger.error(f"خطا در به‌روزرسانی تنظیمات کاربر: {str(e)}")
             raise
             
+    @timed(DB_QUERY_SECONDS, method='get_user_settings')
     def get_user_settings(self, user_id: int) -> Optional[Dict[str, Any]]:
         """دریافت تنظیمات کاربر"""
         try:
@@ -263,20 +361,24 @@ class DatabaseManager:
             logger.error(f"خطا در دریافت تنظیمات کاربر: {str(e)}")
             raise
             
+    @timed(BACKUP_SECONDS, "مدت پشتیبان‌گیری از پایگاه داده")
     def backup_database(self, backup_dir: str = "data/backups") -> str:
         """پشتیبان‌گیری از پایگاه داده"""
         try:
-            # ایجاد پوشه پشتیبان اگر وجود نداشته باشد
-            os.makedirs(backup_dir, exist_ok=True)
-            
-            # نام فایل پشتیبان
-            backup_file = os.path.join(
-                backup_dir,
-                f"glucose_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
-            )
-            
-            # کپی فایل پایگاه داده
-            shutil.copy2(self.db_name, backup_file)
+            with timed_event('db.backup') as event:
+                # ایجاد پوشه پشتیبان اگر وجود نداشته باشد
+                os.makedirs(backup_dir, exist_ok=True)
+                
+                # نام فایل پشتیبان
+                backup_file = os.path.join(
+                    backup_dir,
+                    f"glucose_backup_{datetime.now().strftime('%Y%m%d_%H%M%S')}.db"
+                )
+                
+                # کپی فایل پایگاه داده
+                shutil.copy2(self.db_name, backup_file)
+                event['bytes'] = os.path.getsize(backup_file)
+                gauge(BACKUP_BYTES, "اندازه آخرین فایل پشتیبان").set(event['bytes'])
             
             logger.info(f"پشتیبان‌گیری از پایگاه داده در {backup_file} انجام شد")
             return backup_file
@@ -285,6 +387,11 @@ class DatabaseManager:
             logger.error(f"خطا در پشتیبان‌گیری از پایگاه داده: {str(e)}")
             raise
             
+    def notify_change(self, table: str, action: str, row_id: Optional[int] = None,
+                      user_id: Optional[int] = None) -> None:
+        """انتشار رویداد تغییر پس از commit (row_id برابر None برای تغییر گروهی)"""
+        self.events.publish(ChangeEvent(table, action, row_id, user_id))
+            
     def close(self) -> None:
         """بستن اتصال به پایگاه داده"""
         try:
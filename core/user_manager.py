@@ -6,15 +6,30 @@
 """
 
 import logging
-from typing import Dict, Any, Optional, List
+import threading
+from typing import Dict, Any, Optional, List, Callable
 from datetime import datetime
 
+from database.models import UserStatistics
+
 logger = logging.getLogger(__name__)
 
 class UserManager:
+    # محدوده استاندارد «زمان در محدوده» (mg/dL)
+    TIME_IN_RANGE_LOW = 70
+    TIME_IN_RANGE_HIGH = 180
+    
     def __init__(self, db_manager):
         """مقداردهی اولیه مدیریت کاربران"""
         self.db = db_manager
+        # آمار هر کاربر همراه با نسخه داده‌هایی که از روی آن محاسبه شده است
+        self._stats_cache = {}
+        self._stats_lock = threading.Lock()
+        self._has_meals_table = None
+        # کارهای پاک‌سازی پس‌زمینه و پیشرفت آن‌ها به ازای هر کاربر
+        self._deletion_jobs = {}
+        self._deletion_progress = {}
+        self._deletion_lock = threading.Lock()
         
     def create_user(self, user_data: Dict[str, Any]) -> bool:
         """ایجاد کاربر جدید"""
@@ -46,7 +61,7 @@ class UserManager:
         try:
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users WHERE id = ?', (user_id,))
+                cursor.execute('SELECT * FROM users WHERE id = ? AND deleted_at IS NULL', (user_id,))
                 user = cursor.fetchone()
                 if user:
                     return {
@@ -85,40 +100,109 @@ class UserManager:
                     WHERE id = ?
                 ''', values)
                 conn.commit()
+                self.invalidate_statistics(user_id)
                 logger.info(f"اطلاعات کاربر {user_id} با موفقیت به‌روزرسانی شد")
                 return True
         except Exception as e:
             logger.error(f"خطا در به‌روزرسانی اطلاعات کاربر: {str(e)}")
             return False
             
-    def delete_user(self, user_id: int) -> bool:
-        """حذف کاربر"""
+    def delete_user(self, user_id: int, background: bool = True,
+                    progress_callback: Optional[Callable[[str, int, int], None]] = None,
+                    chunk_size: Optional[int] = None) -> bool:
+        """
+        حذف کاربر
+        
+        کاربر بلافاصله به عنوان حذف‌شده علامت می‌خورد و از همه پرس‌وجوها پنهان می‌شود؛
+        داده‌های او سپس در دسته‌های محدود (به صورت پیش‌فرض در رشته پس‌زمینه) پاک می‌شوند.
+        
+        Args:
+            user_id (int): شناسه کاربر
+            background (bool): اجرای پاک‌سازی در رشته پس‌زمینه
+            progress_callback (Callable): فراخوانی با (table, deleted, total) پس از هر دسته
+            chunk_size (int): تعداد سطر در هر دسته حذف
+            
+        Returns:
+            bool: موفقیت علامت‌گذاری (و در حالت همگام، موفقیت پاک‌سازی)
+        """
+        if not self.db.mark_user_deleted(user_id):
+            logger.error(f"خطا در حذف کاربر: کاربر {user_id} یافت نشد")
+            return False
+        self.invalidate_statistics(user_id)
+        logger.info(f"کاربر {user_id} به عنوان حذف‌شده علامت خورد")
+        
+        if background:
+            self._start_purge(user_id, progress_callback, chunk_size)
+            return True
+        return self._run_purge(user_id, progress_callback, chunk_size)
+        
+    def _start_purge(self, user_id: int, progress_callback=None, chunk_size=None) -> None:
+        """شروع پاک‌سازی داده‌های کاربر در رشته پس‌زمینه (در صورت نبود کار فعال)"""
+        with self._deletion_lock:
+            job = self._deletion_jobs.get(user_id)
+            if job and job.is_alive():
+                return
+            job = threading.Thread(
+                target=self._run_purge,
+                args=(user_id, progress_callback, chunk_size),
+                name=f"user-purge-{user_id}",
+                daemon=True
+            )
+            self._deletion_jobs[user_id] = job
+            self._deletion_progress[user_id] = {}
+        job.start()
+        
+    def _run_purge(self, user_id: int, progress_callback=None, chunk_size=None) -> bool:
+        """اجرای پاک‌سازی دسته‌ای و ثبت پیشرفت"""
+        def report(table, deleted, total):
+            with self._deletion_lock:
+                self._deletion_progress.setdefault(user_id, {})[table] = (deleted, total)
+            if progress_callback:
+                progress_callback(table, deleted, total)
+                
         try:
-            with self.db.get_connection() as conn:
-                cursor = conn.cursor()
-                # حذف خوانش‌های کاربر
-                cursor.execute('DELETE FROM readings WHERE user_id = ?', (user_id,))
-                # حذف یادآوری‌های کاربر
-                cursor.execute('DELETE FROM reminders WHERE user_id = ?', (user_id,))
-                # حذف پیش‌بینی‌های کاربر
-                cursor.execute('DELETE FROM predictions WHERE user_id = ?', (user_id,))
-                # حذف وعده‌های غذایی کاربر
-                cursor.execute('DELETE FROM meals WHERE user_id = ?', (user_id,))
-                # حذف کاربر
-                cursor.execute('DELETE FROM users WHERE id = ?', (user_id,))
-                conn.commit()
-                logger.info(f"کاربر {user_id} و تمام داده‌های مرتبط با موفقیت حذف شد")
-                return True
+            self.db.purge_user_data(user_id, chunk_size=chunk_size, progress_callback=report)
+            self.invalidate_statistics(user_id)
+            logger.info(f"کاربر {user_id} و تمام داده‌های مرتبط با موفقیت حذف شد")
+            return True
         except Exception as e:
-            logger.error(f"خطا در حذف کاربر: {str(e)}")
+            logger.error(f"خطا در پاک‌سازی داده‌های کاربر {user_id}: {str(e)}")
             return False
+        finally:
+            with self._deletion_lock:
+                self._deletion_jobs.pop(user_id, None)
+                
+    def get_deletion_progress(self, user_id: int) -> Dict[str, Any]:
+        """
+        دریافت وضعیت پاک‌سازی داده‌های کاربر
+        
+        Returns:
+            Dict[str, Any]: running، pending و پیشرفت هر جدول به صورت (deleted, total)
+        """
+        with self._deletion_lock:
+            job = self._deletion_jobs.get(user_id)
+            tables = dict(self._deletion_progress.get(user_id, {}))
+        return {
+            'running': bool(job and job.is_alive()),
+            'pending': self.db.is_user_deleted(user_id),
+            'tables': tables
+        }
+        
+    def resume_pending_deletions(self, progress_callback=None) -> List[int]:
+        """ادامه پاک‌سازی کاربرانی که حذفشان پیش از بسته شدن برنامه کامل نشده است"""
+        pending = self.db.get_deleted_users()
+        for user_id in pending:
+            self._start_purge(user_id, progress_callback)
+        if pending:
+            logger.info(f"ادامه پاک‌سازی کاربران حذف‌شده: {pending}")
+        return pending
             
     def get_all_users(self) -> List[Dict[str, Any]]:
         """دریافت لیست تمام کاربران"""
         try:
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
-                cursor.execute('SELECT * FROM users ORDER BY name')
+                cursor.execute('SELECT * FROM users WHERE deleted_at IS NULL ORDER BY name')
                 users = []
                 for user in cursor.fetchall():
                     users.append({
@@ -138,39 +222,77 @@ class UserManager:
             logger.error(f"خطا در دریافت لیست کاربران: {str(e)}")
             return []
             
+    def _has_table(self, cursor, table: str) -> bool:
+        """بررسی وجود جدول در پایگاه داده"""
+        cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+        return cursor.fetchone() is not None
+        
+    def invalidate_statistics(self, user_id: Optional[int] = None) -> None:
+        """بی‌اعتبار کردن آمار ذخیره‌شده یک کاربر (None برای همه)"""
+        with self._stats_lock:
+            if user_id is None:
+                self._stats_cache.clear()
+            else:
+                self._stats_cache.pop(user_id, None)
+                
     def get_user_statistics(self, user_id: int) -> Dict[str, Any]:
-        """دریافت آمار کاربر"""
+        """
+        دریافت آمار کاربر با یک پرس‌وجوی تجمیعی و حافظه نهان به ازای هر کاربر
+        
+        Returns:
+            Dict[str, Any]: UserStatistics.to_dict()؛ هر فراخوانی نسخه جداگانه‌ای از حافظه نهان می‌گیرد
+        """
+        if self.db.is_user_deleted(user_id):
+            return UserStatistics(user_id=user_id).to_dict()
+        version = self.db.get_user_version(user_id)
+        with self._stats_lock:
+            cached = self._stats_cache.get(user_id)
+        if cached and cached[0] == version:
+            return cached[1].to_dict()
+            
         try:
             with self.db.get_connection() as conn:
                 cursor = conn.cursor()
                 
-                # تعداد خوانش‌ها
-                cursor.execute('SELECT COUNT(*) FROM readings WHERE user_id = ?', (user_id,))
-                total_readings = cursor.fetchone()[0]
-                
-                # میانگین قند خون
-                cursor.execute('SELECT AVG(glucose_level) FROM readings WHERE user_id = ?', (user_id,))
-                avg_glucose = cursor.fetchone()[0] or 0
+                if self._has_meals_table is None:
+                    self._has_meals_table = self._has_table(cursor, 'meals')
+                meals_query = ('(SELECT COUNT(*) FROM meals WHERE user_id = :user_id)'
+                               if self._has_meals_table else '0')
                 
-                # تعداد یادآوری‌های فعال
-                cursor.execute('SELECT COUNT(*) FROM reminders WHERE user_id = ? AND is_active = 1', (user_id,))
-                active_reminders = cursor.fetchone()[0]
-                
-                # تعداد وعده‌های غذایی
-                cursor.execute('SELECT COUNT(*) FROM meals WHERE user_id = ?', (user_id,))
-                total_meals = cursor.fetchone()[0]
+                cursor.execute(f'''
+                    SELECT
+                        COUNT(glucose_level),
+                        AVG(glucose_level),
+                        MIN(glucose_level),
+                        MAX(glucose_level),
+                        SUM(glucose_level BETWEEN :range_low AND :range_high),
+                        MAX(gregorian_date || ' ' || time),
+                        (SELECT COUNT(*) FROM reminders WHERE user_id = :user_id AND is_active = 1),
+                        {meals_query}
+                    FROM readings
+                    WHERE user_id = :user_id
+                ''', {
+                    'user_id': user_id,
+                    'range_low': self.TIME_IN_RANGE_LOW,
+                    'range_high': self.TIME_IN_RANGE_HIGH
+                })
+                (total_readings, avg_glucose, min_glucose, max_glucose,
+                 in_range, last_reading_at, active_reminders, total_meals) = cursor.fetchone()
                 
-                return {
-                    'total_readings': total_readings,
-                    'avg_glucose': round(avg_glucose, 1),
-                    'active_reminders': active_reminders,
-                    'total_meals': total_meals
-                }
+            stats = UserStatistics(
+                user_id=user_id,
+                total_readings=total_readings,
+                avg_glucose=round(avg_glucose or 0, 1),
+                min_glucose=min_glucose,
+                max_glucose=max_glucose,
+                time_in_range=round(100.0 * (in_range or 0) / total_readings, 1) if total_readings else 0.0,
+                last_reading_at=last_reading_at,
+                active_reminders=active_reminders,
+                total_meals=total_meals
+            )
+            with self._stats_lock:
+                self._stats_cache[user_id] = (version, stats)
+            return stats.to_dict()
         except Exception as e:
             logger.error(f"خطا در دریافت آمار کاربر: {str(e)}")
-            return {
-                'total_readings': 0,
-                'avg_glucose': 0,
-                'active_reminders': 0,
-                'total_meals': 0
-            } 
\ No newline at end of file
+            return UserStatistics(user_id=user_id).to_dict()
\ No newline at end of file
@@ -1,6 +1,12 @@
 # این فایل برای شناسایی پوشه database به عنوان یک پکیج پایتون است
 
 from .db_manager import DatabaseManager
-from .models import User, Reading, Reminder, Prediction
+from .models import User, Reading, Reminder, Prediction, UserStatistics
+from .events import ChangeEvent, ChangeEventBus
+from .columnar import export_readings_columnar, load_readings_columnar, import_readings_columnar
 
-__all__ = ['DatabaseManager', 'User', 'Reading', 'Reminder', 'Prediction']
\ No newline at end of file
+__all__ = [
+    'DatabaseManager', 'User', 'Reading', 'Reminder', 'Prediction', 'UserStatistics',
+    'ChangeEvent', 'ChangeEventBus',
+    'export_readings_columnar', 'load_readings_columnar', 'import_readings_columnar'
+]
\ No newline at end of file
@@ -0,0 +1,257 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+صادرات و ورود ستونی خوانش‌های قند خون (Parquet یا NumPy)
+"""
+
+import os
+import logging
+from importlib.util import find_spec
+
+from utils.reading_schema import READING_SCHEMA
+from utils.date_utils import date_strings_to_ordinals
+from utils.lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# pyarrow و pandas اختیاری و سنگین‌اند: در اینجا فقط وجودشان بررسی می‌شود و
+# بارگذاری در اولین صادرات/ورود انجام می‌شود. در نبود pyarrow از قالب npz استفاده می‌شود.
+pa = lazy_import('pyarrow') if find_spec('pyarrow') else None
+pq = lazy_import('pyarrow.parquet') if pa is not None else None
+pd = lazy_import('pandas') if find_spec('pandas') else None
+
+# تعداد سطرهای هر row group هنگام خواندن از جدول readings
+DEFAULT_ROW_GROUP_SIZE = 50000
+
+# ستون‌های جدول readings: (نام، نوع، مقدار پیش‌فرض برای NULL)
+READING_COLUMNS = [
+    ('id', 'int64', 0),
+    ('user_id', 'int32', 1),
+    ('gregorian_date', 'str', ''),
+    ('jalali_date', 'str', ''),
+    ('time', 'str', ''),
+    ('glucose_level', 'int32', 0),
+    ('description', 'str', ''),
+    ('meal_status', 'category', 'نامعلوم'),
+    ('mood', 'category', 'متوسط'),
+    ('stress_level', 'int16', 5),
+    ('exercise_minutes', 'int32', 0),
+    ('sleep_hours', 'float64', 8.0),
+    ('created_at', 'str', ''),
+]
+
+COLUMN_NAMES = [name for name, _, _ in READING_COLUMNS]
+
+
+def _arrow_schema():
+    """ساخت schema پیکان (Arrow) متناظر با ستون‌های readings"""
+    types = {
+        'int64': pa.int64(),
+        'int32': pa.int32(),
+        'int16': pa.int16(),
+        'float64': pa.float64(),
+        'str': pa.string(),
+        'category': pa.dictionary(pa.int32(), pa.string()),
+    }
+    return pa.schema([(name, types[kind]) for name, kind, _ in READING_COLUMNS])
+
+
+def _iter_row_groups(conn, user_id, row_group_size):
+    """خواندن جریانی خوانش‌ها به صورت دسته‌های ستونی"""
+    cursor = conn.cursor()
+    query = f"SELECT {', '.join(COLUMN_NAMES)} FROM readings"
+    params = ()
+    if user_id is not None:
+        query += " WHERE user_id = ?"
+        params = (user_id,)
+    query += " ORDER BY id"
+    cursor.execute(query, params)
+
+    while True:
+        rows = cursor.fetchmany(row_group_size)
+        if not rows:
+            break
+        columns = list(zip(*rows))
+        yield [
+            [default if value is None else value for value in column]
+            for column, (_, _, default) in zip(columns, READING_COLUMNS)
+        ]
+
+
+def _resolve_format(path):
+    """تعیین قالب خروجی بر اساس پسوند فایل و وجود pyarrow"""
+    root, ext = os.path.splitext(path)
+    if ext.lower() == '.npz':
+        return path, 'npz'
+    if pa is None:
+        logging.warning("pyarrow نصب نیست؛ خروجی به قالب npz ذخیره می‌شود")
+        return root + '.npz', 'npz'
+    return path, 'parquet'
+
+
+def export_readings_columnar(db_manager, path, user_id=None, row_group_size=DEFAULT_ROW_GROUP_SIZE):
+    """
+    صادرات جدول readings به فایل ستونی
+
+    Args:
+        db_manager: مدیر پایگاه داده دارای متد get_connection
+        path (str): مسیر فایل خروجی (.parquet یا .npz)
+        user_id (Optional[int]): فقط خوانش‌های این کاربر؛ None برای همه
+        row_group_size (int): تعداد سطر در هر row group
+
+    Returns:
+        Tuple[str, int]: (مسیر واقعی فایل ذخیره‌شده، تعداد سطرها)
+    """
+    path, fmt = _resolve_format(path)
+    total = 0
+
+    with db_manager.get_connection() as conn:
+        if fmt == 'parquet':
+            schema = _arrow_schema()
+            with pq.ParquetWriter(path, schema) as writer:
+                for columns in _iter_row_groups(conn, user_id, row_group_size):
+                    arrays = []
+                    for values, (name, kind, _) in zip(columns, READING_COLUMNS):
+                        if kind == 'category':
+                            arrays.append(pa.array(values, type=pa.string()).dictionary_encode())
+                        else:
+                            arrays.append(pa.array(values, type=schema.field(name).type))
+                    writer.write_table(pa.Table.from_arrays(arrays, schema=schema))
+                    total += len(columns[0])
+        else:
+            chunks = {name: [] for name in COLUMN_NAMES}
+            categories = {name: {} for name, kind, _ in READING_COLUMNS if kind == 'category'}
+            for columns in _iter_row_groups(conn, user_id, row_group_size):
+                for values, (name, kind, _) in zip(columns, READING_COLUMNS):
+                    if kind == 'category':
+                        lookup = categories[name]
+                        codes = [lookup.setdefault(v, len(lookup)) for v in values]
+                        chunks[name].append(np.asarray(codes, dtype=np.int32))
+                    else:
+                        chunks[name].append(np.asarray(values, dtype=kind))
+                total += len(columns[0])
+
+            arrays = {}
+            for name, kind, _ in READING_COLUMNS:
+                empty = np.empty(0, dtype=np.int32 if kind == 'category' else kind)
+                arrays[name] = np.concatenate(chunks[name]) if chunks[name] else empty
+            for name, lookup in categories.items():
+                arrays[f'{name}__categories'] = np.asarray(list(lookup), dtype=str)
+            np.savez_compressed(path, **arrays)
+
+    logging.info(f"{total} خوانش به فایل {path} صادر شد")
+    return path, total
+
+
+def load_readings_columnar(path, as_frame=True):
+    """
+    بارگذاری فایل ستونی برای تحلیل آفلاین
+
+    Args:
+        path (str): مسیر فایل .parquet یا .npz
+        as_frame (bool): بازگرداندن DataFrame در صورت نصب بودن pandas
+
+    Returns:
+        DataFrame یا Dict[str, np.ndarray]: داده‌های ستونی با ستون‌های دسته‌ای برای mood و meal_status
+    """
+    if path.lower().endswith('.npz'):
+        with np.load(path, allow_pickle=False) as data:
+            result = {}
+            for name, kind, _ in READING_COLUMNS:
+                values = data[name]
+                if kind == 'category':
+                    categories = data[f'{name}__categories']
+                    if as_frame and pd is not None:
+                        values = pd.Categorical.from_codes(values, categories=categories)
+                    else:
+                        values = categories[values] if len(categories) else values.astype(str)
+                result[name] = values
+        if as_frame and pd is not None:
+            return pd.DataFrame(result, columns=COLUMN_NAMES)
+        return result
+
+    if pq is None:
+        raise ImportError("برای خواندن فایل Parquet نصب pyarrow لازم است")
+    table = pq.read_table(path)
+    if as_frame and pd is not None:
+        return table.to_pandas()
+    return {name: table.column(name).to_numpy() for name in table.column_names}
+
+
+def _iter_file_batches(path, batch_size):
+    """خواندن جریانی فایل ستونی به صورت دسته‌هایی از ستون‌ها"""
+    if path.lower().endswith('.npz'):
+        data = load_readings_columnar(path, as_frame=False)
+        count = len(data['id'])
+        for start in range(0, count, batch_size):
+            yield {name: data[name][start:start + batch_size].tolist() for name in COLUMN_NAMES}
+        return
+
+    if pq is None:
+        raise ImportError("برای خواندن فایل Parquet نصب pyarrow لازم است")
+    for batch in pq.ParquetFile(path).iter_batches(batch_size=batch_size):
+        yield batch.to_pydict()
+
+
+def import_readings_columnar(db_manager, path, user_id=None, batch_size=DEFAULT_ROW_GROUP_SIZE,
+                             validate=False, choices=None):
+    """
+    ورود خوانش‌ها از فایل ستونی به جدول readings در یک تراکنش
+
+    Args:
+        db_manager: مدیر پایگاه داده دارای متد get_connection
+        path (str): مسیر فایل .parquet یا .npz
+        user_id (Optional[int]): نسبت دادن همه خوانش‌ها به این کاربر؛ None برای حفظ مقدار فایل
+        batch_size (int): تعداد سطر در هر دسته درج
+        validate (bool): کنار گذاشتن سطرهای ناقض قواعد طرح‌واره خوانش
+        choices (Optional[Dict[str, Iterable[str]]]): مقادیر مجاز meal_status و mood در اعتبارسنجی
+
+    Returns:
+        int: تعداد خوانش‌های واردشده
+    """
+    total = 0
+    rejected = 0
+
+    with db_manager.get_connection() as conn:
+        # day_ordinal فقط در طرح‌واره database.db_manager وجود دارد (نه ghand2)؛ در آنجا
+        # همراه هر دسته محاسبه می‌شود تا trigger درج برای هر سطر UPDATE دوم اجرا نکند
+        table_columns = {row[1] for row in conn.execute("PRAGMA table_info(readings)")}
+        with_ordinal = 'day_ordinal' in table_columns
+        insert_columns = [name for name in COLUMN_NAMES if name != 'id']
+        if with_ordinal:
+            insert_columns.append('day_ordinal')
+        query = (
+            f"INSERT INTO readings ({', '.join(insert_columns)}) "
+            f"VALUES ({', '.join('?' for _ in insert_columns)})"
+        )
+        for batch in _iter_file_batches(path, batch_size):
+            if user_id is not None:
+                batch['user_id'] = [user_id] * len(batch['id'])
+            if with_ordinal:
+                batch['day_ordinal'] = [None if ordinal < 0 else ordinal
+                                        for ordinal in date_strings_to_ordinals(batch['gregorian_date']).tolist()]
+            rows = zip(*(batch[name] for name in insert_columns))
+            count = len(batch['id'])
+            if validate:
+                result = READING_SCHEMA.validate_columns(batch, choices)
+                valid_rows = result.valid_rows
+                for row, name, message in result.row_errors(limit=5):
+                    logging.warning(f"سطر {total + rejected + row} ({name}): {message}")
+                rows = (row for row, ok in zip(rows, valid_rows) if ok)
+                rejected += count - int(valid_rows.sum())
+                count = int(valid_rows.sum())
+            conn.executemany(query, rows)
+            total += count
+        conn.commit()
+
+    if rejected:
+        logging.warning(f"{rejected} خوانش نامعتبر از فایل {path} وارد نشد")
+
+    # رویداد تغییر گروهی؛ شنونده‌ها داده‌های جدول را کامل بارگذاری می‌کنند
+    notify_change = getattr(db_manager, 'notify_change', None)
+    if notify_change is not None:
+        notify_change('readings', 'insert', None, user_id)
+
+    logging.info(f"{total} خوانش از فایل {path} وارد شد")
+    return total
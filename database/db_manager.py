@@ -5,28 +5,68 @@
 مدیریت پایگاه داده برای سیستم مدیریت قند خون
 """
 
+import re
 import sqlite3
 import logging
-from datetime import datetime, timedelta
+import threading
+from datetime import date, datetime, timedelta
 import os
 from .models import User, Reading, Reminder, Prediction
+from .tuning import validate_storage_settings, apply_connection_pragmas
+from .events import ChangeEvent, ChangeEventBus, INSERT, UPDATE, DELETE
+from .sql_functions import register_sql_functions
+from utils.date_utils import gregorian_to_jalali_ymd, jalali_to_gregorian_ymd, jalali_day_of_year, date_to_ordinal
+from utils.reading_schema import READING_SCHEMA
+from utils.logging import timed_event
+from utils.metrics import timed, DB_QUERY_SECONDS
 
 class DatabaseManager:
-    def __init__(self, db_name="glucose_readings.db"):
+    # تعداد اجراهای پیش‌بینی نگه‌داشته‌شده برای هر کاربر و تاریخ هدف
+    PREDICTION_RUNS_TO_KEEP = 3
+    # نسخه schema ذخیره‌شده در PRAGMA user_version
+    SCHEMA_VERSION = 2
+    # شماره روز میلادی (date.toordinal) از روی gregorian_date در خود SQLite
+    DAY_ORDINAL_SQL = "CAST(julianday({column}) - 1721424.5 AS INTEGER)"
+    # حاشیه روزهای تقویم شمسی پیش‌ساخته در دو سوی امروز
+    CALENDAR_MARGIN_DAYS = 400
+    # تعداد سطرهای حذف‌شده در هر تراکنش هنگام پاک‌سازی داده‌های کاربر
+    DELETE_CHUNK_SIZE = 5000
+    # جداول وابسته به کاربر به ترتیب پاک‌سازی (predictions پیش از prediction_runs)
+    USER_DATA_TABLES = ('predictions', 'prediction_runs', 'readings', 'reminders', 'meals')
+
+    def __init__(self, db_name="glucose_readings.db", storage_settings=None, glucose_levels=None):
         self.db_name = db_name
+        self.storage_settings = validate_storage_settings(storage_settings)
+        # بخش GLUCOSE_LEVELS تنظیمات؛ آستانه‌های خطر تابع SQL glucose_class از آن خوانده می‌شود
+        self.glucose_levels = dict(glucose_levels or {})
+        # هر رشته یک اتصال ماندگار دارد تا حافظه نهان صفحات بین فراخوانی‌ها حفظ شود
+        self._local = threading.local()
+        # همه اتصال‌های باز (رشته، اتصال) تا اتصال رشته‌های پایان‌یافته بسته شود؛ close با
+        # افزایش _generation از رشته‌های فعال می‌خواهد اتصال قدیمی خود را در استفاده بعدی ببندند
+        self._connections = []
+        self._connections_lock = threading.Lock()
+        self._generation = 0
+        # نسخه داده‌های هر کاربر؛ با هر نوشتن افزایش می‌یابد تا حافظه‌های نهان بی‌اعتبار شوند
+        self._versions_lock = threading.Lock()
+        self._user_versions = {}
+        self._global_version = 0
+        # کاربرانی که حذف شده‌اند ولی داده‌هایشان هنوز در حال پاک‌سازی است
+        self._deleted_users = set()
+        # رویدادهای تغییر داده برای به‌روزرسانی تدریجی رابط کاربری
+        self.events = ChangeEventBus()
         self.init_database()
 
     def init_database(self):
         """ایجاد پایگاه داده و جداول"""
         try:
-            with sqlite3.connect(self.db_name) as conn:
+            with self.get_connection() as conn:
                 cursor = conn.cursor()
                 
                 # بررسی وجود جدول users و اعمال تغییرات schema در صورت نیاز
                 cursor.execute("PRAGMA table_info(users)")
                 columns = [col[1] for col in cursor.fetchall()]
 
-                if 'users' not in columns: # اگر جدول وجود ندارد، آن را ایجاد کن
+                if not columns: # اگر جدول وجود ندارد، آن را ایجاد کن
                     cursor.execute('''
                         CREATE TABLE users (
                             id INTEGER PRIMARY KEY AUTOINCREMENT,
@@ -35,7 +75,8 @@ class DatabaseManager:
                             gender TEXT DEFAULT 'نامشخص',
                             target_glucose_min INTEGER DEFAULT 80,
                             target_glucose_max INTEGER DEFAULT 140,
-                            created_at TEXT DEFAULT CURRENT_TIMESTAMP
+                            created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                            deleted_at TEXT
                         )
                     ''')
                 else: # اگر جدول وجود دارد، schema را بررسی و به‌روزرسانی کن
@@ -48,6 +89,8 @@ class DatabaseManager:
                         cursor.execute("ALTER TABLE users ADD COLUMN target_glucose_min INTEGER DEFAULT 80")
                     if 'target_glucose_max' not in columns:
                         cursor.execute("ALTER TABLE users ADD COLUMN target_glucose_max INTEGER DEFAULT 140")
+                    if 'deleted_at' not in columns:
+                        cursor.execute("ALTER TABLE users ADD COLUMN deleted_at TEXT")
                     
                     # حذف ستون‌های قدیمی در صورت وجود (اگر قبلاً وجود داشته‌اند)
                     # SQLite از DROP COLUMN مستقیم پشتیبانی نمی‌کند، باید جدول را بازسازی کرد.
@@ -83,7 +126,26 @@ class DatabaseManager:
                         exercise_minutes INTEGER DEFAULT 0,
                         sleep_hours REAL DEFAULT 8.0,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users (id)
+                        day_ordinal INTEGER,
+                        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                    )
+                ''')
+                
+                cursor.execute("PRAGMA table_info(readings)")
+                if 'day_ordinal' not in [col[1] for col in cursor.fetchall()]:
+                    cursor.execute("ALTER TABLE readings ADD COLUMN day_ordinal INTEGER")
+                
+                # تقویم شمسی: هر روز میلادی (با شماره ترتیبی) و سال، ماه، هفته و روز سال شمسی آن
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS jalali_calendar (
+                        day_ordinal INTEGER PRIMARY KEY,
+                        gregorian_date TEXT NOT NULL,
+                        jalali_date TEXT NOT NULL,
+                        jalali_year INTEGER NOT NULL,
+                        jalali_month INTEGER NOT NULL,
+                        jalali_day INTEGER NOT NULL,
+                        jalali_week INTEGER NOT NULL,
+                        day_of_year INTEGER NOT NULL
                     )
                 ''')
                 
@@ -99,7 +161,7 @@ class DatabaseManager:
                         frequency TEXT DEFAULT 'روزانه',
                         is_active INTEGER DEFAULT 1,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users (id)
+                        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
                     )
                 ''')
                 
@@ -112,46 +174,432 @@ class DatabaseManager:
                         predicted_glucose REAL,
                         confidence_score REAL DEFAULT 0.5,
                         created_at TEXT DEFAULT CURRENT_TIMESTAMP,
-                        FOREIGN KEY (user_id) REFERENCES users (id)
+                        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
                     )
                 ''')
                 
+                # جدول اجراهای پیش‌بینی (هر اجرا یک افق کامل پیش‌بینی است)
+                cursor.execute('''
+                    CREATE TABLE IF NOT EXISTS prediction_runs (
+                        id INTEGER PRIMARY KEY AUTOINCREMENT,
+                        user_id INTEGER DEFAULT 1,
+                        prediction_date TEXT NOT NULL,
+                        horizon INTEGER NOT NULL,
+                        model_version TEXT,
+                        created_at TEXT DEFAULT CURRENT_TIMESTAMP,
+                        FOREIGN KEY (user_id) REFERENCES users (id) ON DELETE CASCADE
+                    )
+                ''')
+                
+                cursor.execute("PRAGMA table_info(predictions)")
+                prediction_columns = [col[1] for col in cursor.fetchall()]
+                if 'run_id' not in prediction_columns:
+                    cursor.execute("ALTER TABLE predictions ADD COLUMN run_id INTEGER "
+                                   "REFERENCES prediction_runs (id) ON DELETE CASCADE")
+                if 'prediction_hour' not in prediction_columns:
+                    cursor.execute("ALTER TABLE predictions ADD COLUMN prediction_hour INTEGER")
+                
+                cursor.execute("PRAGMA user_version")
+                schema_version = cursor.fetchone()[0]
+                # مهاجرت پایگاه داده‌های قدیمی به کلیدهای خارجی با ON DELETE CASCADE
+                if schema_version < 1:
+                    self._migrate_cascade_foreign_keys(cursor)
+                # پر کردن day_ordinal خوانش‌های موجود
+                if schema_version < 2:
+                    cursor.execute(f'''
+                        UPDATE readings SET day_ordinal = {self.DAY_ORDINAL_SQL.format(column='gregorian_date')}
+                        WHERE day_ordinal IS NULL
+                    ''')
+                if schema_version < self.SCHEMA_VERSION:
+                    cursor.execute(f"PRAGMA user_version = {self.SCHEMA_VERSION}")
+                
+                # مسیرهای درج این ماژول day_ordinal را خودشان محاسبه می‌کنند؛ این trigger فقط
+                # درج‌های بیرونی (مانند ghand2) را که day_ordinal را خالی می‌گذارند پوشش می‌دهد
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_readings_day_ordinal_insert
+                    AFTER INSERT ON readings WHEN NEW.day_ordinal IS NULL
+                    BEGIN
+                        UPDATE readings SET day_ordinal = {self.DAY_ORDINAL_SQL.format(column='NEW.gregorian_date')}
+                        WHERE id = NEW.id;
+                    END
+                ''')
+                cursor.execute(f'''
+                    CREATE TRIGGER IF NOT EXISTS trg_readings_day_ordinal_update
+                    AFTER UPDATE OF gregorian_date ON readings
+                    BEGIN
+                        UPDATE readings SET day_ordinal = {self.DAY_ORDINAL_SQL.format(column='NEW.gregorian_date')}
+                        WHERE id = NEW.id;
+                    END
+                ''')
+                
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_readings_user_date
+                    ON readings (user_id, gregorian_date, time, glucose_level)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_readings_user_day
+                    ON readings (user_id, day_ordinal, time)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_jalali_calendar_month
+                    ON jalali_calendar (jalali_year, jalali_month, day_ordinal)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_jalali_calendar_week
+                    ON jalali_calendar (jalali_year, jalali_week, day_ordinal)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_prediction_runs_user_date
+                    ON prediction_runs (user_id, prediction_date)
+                ''')
+                cursor.execute('''
+                    CREATE INDEX IF NOT EXISTS idx_predictions_run
+                    ON predictions (run_id, prediction_hour)
+                ''')
+                
                 conn.commit()
                 
                 # ایجاد کاربر پیش‌فرض
                 cursor.execute("SELECT COUNT(*) FROM users")
                 if cursor.fetchone()[0] == 0:
-                    cursor.execute("INSERT INTO users (name) VALUES ('کاربر پیش‌فرض')")
+                    cursor.execute("INSERT INTO users DEFAULT VALUES")
                     conn.commit()
+                
+                cursor.execute("SELECT id FROM users WHERE deleted_at IS NOT NULL")
+                self._deleted_users = {row[0] for row in cursor.fetchall()}
+                
+                # تقویم برای بازه داده‌های موجود و حاشیه‌ای در دو سوی امروز
+                today = datetime.now().date().toordinal()
+                # تاریخ‌های نامعتبر خارج از بازه معقول در ساخت اولیه تقویم نادیده گرفته می‌شوند
+                cursor.execute('''
+                    SELECT MIN(day_ordinal), MAX(day_ordinal) FROM readings
+                    WHERE day_ordinal BETWEEN ? AND ?
+                ''', (date(1950, 1, 1).toordinal(), date(2100, 12, 31).toordinal()))
+                first, last = cursor.fetchone()
+                self._ensure_calendar(conn,
+                                      min(first or today, today - self.CALENDAR_MARGIN_DAYS),
+                                      max(last or today, today + self.CALENDAR_MARGIN_DAYS))
                     
         except Exception as e:
             logging.error(f"خطا در ایجاد پایگاه داده: {e}")
 
+    def _migrate_cascade_foreign_keys(self, cursor):
+        """
+        بازسازی جداول وابسته برای افزودن ON DELETE CASCADE به کلیدهای خارجی
+
+        SQLite تغییر قید کلید خارجی را با ALTER پشتیبانی نمی‌کند؛ هر جدول با schema
+        اصلاح‌شده به نام موقت ساخته، داده‌ها منتقل و سپس جایگزین می‌شود.
+        """
+        pattern = re.compile(r'REFERENCES\s+(users|prediction_runs)\s*\(\s*id\s*\)(?!\s+ON\s+DELETE)',
+                             re.IGNORECASE)
+        for table in ('prediction_runs', 'predictions', 'readings', 'reminders'):
+            cursor.execute("SELECT sql FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+            row = cursor.fetchone()
+            if not row:
+                continue
+            new_sql = pattern.sub(r'\g<0> ON DELETE CASCADE', row[0])
+            if new_sql == row[0]:
+                continue
+
+            new_sql = re.sub(rf'^CREATE TABLE\s+"?{table}"?', f'CREATE TABLE {table}_new', new_sql,
+                             count=1, flags=re.IGNORECASE)
+            cursor.execute(new_sql)
+            # انتقال با نام ستون‌ها تا ستون‌های افزوده‌شده با ALTER TABLE جابه‌جا نشوند
+            cursor.execute(f"PRAGMA table_info({table})")
+            columns = ', '.join(f'"{col[1]}"' for col in cursor.fetchall())
+            cursor.execute(f"INSERT INTO {table}_new ({columns}) SELECT {columns} FROM {table}")
+            cursor.execute(f"DROP TABLE {table}")
+            cursor.execute(f"ALTER TABLE {table}_new RENAME TO {table}")
+            logging.info(f"کلیدهای خارجی جدول {table} به ON DELETE CASCADE مهاجرت داده شد")
+
+    def _ensure_calendar(self, conn, first_ordinal, last_ordinal):
+        """افزودن روزهای ناموجود بازه [first_ordinal, last_ordinal] به جدول jalali_calendar"""
+        existing = conn.execute(
+            "SELECT COUNT(*) FROM jalali_calendar WHERE day_ordinal BETWEEN ? AND ?",
+            (first_ordinal, last_ordinal)
+        ).fetchone()[0]
+        if existing == last_ordinal - first_ordinal + 1:
+            return
+
+        rows = []
+        for ordinal in range(first_ordinal, last_ordinal + 1):
+            day = date.fromordinal(ordinal)
+            jy, jm, jd = gregorian_to_jalali_ymd(day.year, day.month, day.day)
+            day_of_year = jalali_day_of_year(jm, jd)
+            # هفته‌ها از شنبه شروع می‌شوند و هفته 1 شامل اول فروردین است
+            new_year_weekday = (date.fromordinal(ordinal - day_of_year + 1).weekday() + 2) % 7
+            rows.append((ordinal, day.isoformat(), f"{jy:04d}/{jm:02d}/{jd:02d}", jy, jm, jd,
+                         (day_of_year - 1 + new_year_weekday) // 7 + 1, day_of_year))
+        conn.executemany("INSERT OR IGNORE INTO jalali_calendar VALUES (?, ?, ?, ?, ?, ?, ?, ?)", rows)
+        conn.commit()
+
+    def get_jalali_period_bounds(self, year, month=None, week=None):
+        """
+        دریافت بازه شماره روزهای یک دوره شمسی از جدول تقویم
+        
+        Args:
+            year (int): سال شمسی
+            month (int): ماه شمسی (1 تا 12)؛ None برای کل سال
+            week (int): هفته سال شمسی (شروع از شنبه)؛ در صورت تعیین، month نادیده گرفته می‌شود
+            
+        Returns:
+            Optional[Tuple[int, int]]: (اولین، آخرین) شماره روز یا None برای دوره نامعتبر
+        """
+        if week is not None:
+            condition, params = "jalali_year = ? AND jalali_week = ?", (year, week)
+        elif month is not None:
+            condition, params = "jalali_year = ? AND jalali_month = ?", (year, month)
+        else:
+            condition, params = "jalali_year = ?", (year,)
+
+        with self.get_connection() as conn:
+            # تقویم سال درخواستی در صورت نبود ساخته می‌شود
+            first = date(*jalali_to_gregorian_ymd(year, 1, 1)).toordinal()
+            last = date(*jalali_to_gregorian_ymd(year + 1, 1, 1)).toordinal() - 1
+            self._ensure_calendar(conn, first, last)
+            bounds = conn.execute(
+                f"SELECT MIN(day_ordinal), MAX(day_ordinal) FROM jalali_calendar WHERE {condition}", params
+            ).fetchone()
+        return bounds if bounds[0] is not None else None
+
+    def _fetch_readings_by_ordinal_range(self, first_ordinal, last_ordinal, user_id):
+        """اسکن بازه‌ای شاخص (user_id, day_ordinal, time)"""
+        with self.get_connection() as conn:
+            return conn.execute('''
+                SELECT * FROM readings WHERE user_id = ? AND day_ordinal BETWEEN ? AND ?
+                ORDER BY day_ordinal DESC, time DESC
+            ''', (user_id, first_ordinal, last_ordinal)).fetchall()
+
+    @timed(DB_QUERY_SECONDS, method='fetch_readings_by_jalali_period')
+    def fetch_readings_by_jalali_period(self, year, month=None, week=None, user_id=1):
+        """دریافت خوانش‌های یک سال، ماه یا هفته شمسی (مثلاً مهر 1403 یا هفته 12)"""
+        if self.is_user_deleted(user_id):
+            return []
+        try:
+            bounds = self.get_jalali_period_bounds(year, month, week)
+            if bounds is None:
+                return []
+            return self._fetch_readings_by_ordinal_range(bounds[0], bounds[1], user_id)
+        except Exception as e:
+            logging.error(f"خطا در دریافت خوانش‌های دوره شمسی: {e}")
+            return []
+
+    def _open_connection(self):
+        """ایجاد اتصال جدید با تنظیمات ذخیره‌سازی"""
+        # هر اتصال فقط در رشته سازنده‌اش استفاده می‌شود؛ check_same_thread غیرفعال است
+        # تا اتصال رشته‌های پایان‌یافته از رشته دیگری بسته شود
+        conn = sqlite3.connect(self.db_name, check_same_thread=False)
+        apply_connection_pragmas(conn, self.storage_settings)
+        register_sql_functions(conn, self.glucose_levels)
+        return conn
+
     def get_connection(self):
-        """دریافت اتصال به پایگاه داده"""
-        return sqlite3.connect(self.db_name)
+        """دریافت اتصال رشته فعلی به پایگاه داده"""
+        conn = getattr(self._local, 'conn', None)
+        if conn is not None and self._local.generation != self._generation:
+            # اتصال پیش از close باز شده است؛ رشته صاحب آن، خودش آن را می‌بندد
+            with self._connections_lock:
+                self._connections = [(thread, c) for thread, c in self._connections if c is not conn]
+            conn.close()
+            conn = None
+        if conn is None:
+            conn = self._open_connection()
+            self._local.conn = conn
+            self._local.generation = self._generation
+            self._register_connection(conn)
+        return conn
+
+    def _register_connection(self, conn):
+        """ثبت اتصال رشته فعلی و بستن اتصال رشته‌هایی که به پایان رسیده‌اند"""
+        with self._connections_lock:
+            finished = [c for thread, c in self._connections if not thread.is_alive()]
+            self._connections = [(thread, c) for thread, c in self._connections if thread.is_alive()]
+            self._connections.append((threading.current_thread(), conn))
+        for c in finished:
+            c.close()
+
+    def is_user_deleted(self, user_id):
+        """بررسی حذف‌شدن کاربر (داده‌های کاربر حذف‌شده در هیچ پرس‌وجویی بازگردانده نمی‌شود)"""
+        return user_id in self._deleted_users
+
+    def get_deleted_users(self):
+        """دریافت شناسه کاربرانی که حذف شده‌اند و پاک‌سازی داده‌هایشان تمام نشده است"""
+        return sorted(self._deleted_users)
+
+    def mark_user_deleted(self, user_id):
+        """علامت‌گذاری فوری کاربر به عنوان حذف‌شده؛ پاک‌سازی داده‌ها با purge_user_data انجام می‌شود"""
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.execute('''
+                    UPDATE users SET deleted_at = COALESCE(deleted_at, CURRENT_TIMESTAMP)
+                    WHERE id = ?
+                ''', (user_id,))
+                conn.commit()
+                if cursor.rowcount == 0:
+                    return False
+                self._deleted_users.add(user_id)
+                self.notify_change('users', DELETE, user_id, user_id)
+                return True
+        except Exception as e:
+            logging.error(f"خطا در علامت‌گذاری حذف کاربر: {e}")
+            return False
+
+    @timed(DB_QUERY_SECONDS, method='purge_user_data')
+    def purge_user_data(self, user_id, chunk_size=None, progress_callback=None):
+        """
+        حذف تدریجی داده‌های کاربر در دسته‌های محدود و سپس حذف خود کاربر
+
+        هر دسته در تراکنش جداگانه حذف می‌شود تا قفل پایگاه داده و رشد WAL محدود بماند.
+        این متد اتصال اختصاصی خود را باز می‌کند و برای اجرا در رشته پس‌زمینه مناسب است.
+
+        Args:
+            user_id (int): شناسه کاربر حذف‌شده
+            chunk_size (int): تعداد سطر در هر دسته؛ پیش‌فرض DELETE_CHUNK_SIZE
+            progress_callback (callable): فراخوانی با (table, deleted, total) پس از هر دسته
+
+        Returns:
+            Dict[str, int]: تعداد سطرهای حذف‌شده از هر جدول
+        """
+        chunk_size = chunk_size or self.DELETE_CHUNK_SIZE
+        deleted = {}
+        conn = self._open_connection()
+        try:
+            # قیدهای CASCADE فقط روی اتصال پاک‌سازی اجرا می‌شوند
+            conn.execute("PRAGMA foreign_keys = ON")
+            cursor = conn.cursor()
+            for table in self.USER_DATA_TABLES:
+                cursor.execute("SELECT 1 FROM sqlite_master WHERE type = 'table' AND name = ?", (table,))
+                if cursor.fetchone() is None:
+                    continue
+                cursor.execute(f"SELECT COUNT(*) FROM {table} WHERE user_id = ?", (user_id,))
+                total = cursor.fetchone()[0]
+                deleted[table] = 0
+                while deleted[table] < total:
+                    cursor.execute(f'''
+                        DELETE FROM {table} WHERE rowid IN (
+                            SELECT rowid FROM {table} WHERE user_id = ? LIMIT ?
+                        )
+                    ''', (user_id, chunk_size))
+                    conn.commit()
+                    if cursor.rowcount <= 0:
+                        break
+                    deleted[table] += cursor.rowcount
+                    if progress_callback:
+                        progress_callback(table, deleted[table], total)
 
+            cursor.execute("DELETE FROM users WHERE id = ?", (user_id,))
+            conn.commit()
+            self._deleted_users.discard(user_id)
+            self.mark_user_changed(user_id)
+            logging.info(f"داده‌های کاربر {user_id} پاک‌سازی شد: {deleted}")
+            return deleted
+        finally:
+            conn.close()
+
+    def mark_user_changed(self, user_id=None):
+        """ثبت تغییر داده‌های یک کاربر (None برای همه کاربران)"""
+        with self._versions_lock:
+            if user_id is None:
+                self._global_version += 1
+            else:
+                self._user_versions[user_id] = self._user_versions.get(user_id, 0) + 1
+
+    def notify_change(self, table, action, row_id=None, user_id=None):
+        """ثبت تغییر داده‌های کاربر و انتشار رویداد تغییر پس از commit"""
+        self.mark_user_changed(user_id)
+        self.events.publish(ChangeEvent(table, action, row_id, user_id))
+
+    def get_user_version(self, user_id):
+        """دریافت نسخه فعلی داده‌های کاربر برای اعتبارسنجی حافظه نهان"""
+        with self._versions_lock:
+            return self._global_version, self._user_versions.get(user_id, 0)
+
+    def _reminder_owner(self, conn, reminder_id):
+        """دریافت شناسه کاربر صاحب یادآوری"""
+        row = conn.execute("SELECT user_id FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+        return row[0] if row else None
+
+    @timed(DB_QUERY_SECONDS, method='insert_reading')
     def insert_reading(self, gregorian_date, jalali_date, time, glucose_level, description="", 
                       user_id=1, meal_status="نامعلوم", mood="متوسط", stress_level=5, 
                       exercise_minutes=0, sleep_hours=8.0):
         """درج خوانش جدید"""
+        if self.is_user_deleted(user_id):
+            return False
+        # رویداد پرتکرار؛ طبق EVENT_SAMPLE_RATES نمونه‌برداری می‌شود
+        with timed_event('reading.insert', user_id=user_id, rows=1) as event:
+            try:
+                with self.get_connection() as conn:
+                    cursor = conn.execute('''
+                        INSERT INTO readings 
+                        (user_id, gregorian_date, jalali_date, time, glucose_level, description,
+                         meal_status, mood, stress_level, exercise_minutes, sleep_hours, day_ordinal)
+                        VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                    ''', (user_id, gregorian_date, jalali_date, time, glucose_level, description,
+                         meal_status, mood, stress_level, exercise_minutes, sleep_hours,
+                         date_to_ordinal(gregorian_date)))
+                    conn.commit()
+                    self.notify_change('readings', INSERT, cursor.lastrowid, user_id)
+                    return True
+            except Exception as e:
+                logging.error(f"خطا در درج خوانش: {e}")
+                event['outcome'] = 'error'
+                return False
+
+    @timed(DB_QUERY_SECONDS, method='insert_readings')
+    def insert_readings(self, records, user_id=1, schema=None):
+        """
+        درج گروهی خوانش‌ها (ورود انبوه یا دریافت از دستگاه) در یک تراکنش
+
+        هر رکورد با طرح‌واره خوانش اعتبارسنجی و نرمال‌سازی می‌شود؛ رکوردهای
+        نامعتبر درج نمی‌شوند.
+
+        Args:
+            records (Iterable[dict]): رکوردهای خام با کلیدهای هم‌نام ستون‌های readings
+            user_id (int): شناسه کاربر
+            schema (Optional[CompiledReadingSchema]): طرح‌واره جایگزین؛ None برای READING_SCHEMA
+
+        Returns:
+            Tuple[int, List[Tuple[int, List[str]]]]: (تعداد درج‌شده، (شماره رکورد، خطاها) برای ردشده‌ها)
+        """
+        if self.is_user_deleted(user_id):
+            return 0, []
+        with timed_event('reading.insert_batch', user_id=user_id) as event:
+            return self._insert_readings(records, user_id, schema, event)
+
+    def _insert_readings(self, records, user_id, schema, event):
+        """بدنه insert_readings؛ event فیلدهای رویداد زمان‌دار را دریافت می‌کند"""
+        valid, rejected = (schema or READING_SCHEMA).normalize_many(records)
+        event['rows'] = len(valid)
+        event['rejected'] = len(rejected)
+        for index, errors in rejected[:5]:
+            logging.warning(f"رکورد {index} درج نشد: {'، '.join(errors)}")
+        if not valid:
+            return 0, rejected
         try:
             with self.get_connection() as conn:
-                conn.execute('''
+                conn.executemany('''
                     INSERT INTO readings 
                     (user_id, gregorian_date, jalali_date, time, glucose_level, description,
-                     meal_status, mood, stress_level, exercise_minutes, sleep_hours)
-                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
-                ''', (user_id, gregorian_date, jalali_date, time, glucose_level, description,
-                     meal_status, mood, stress_level, exercise_minutes, sleep_hours))
+                     meal_status, mood, stress_level, exercise_minutes, sleep_hours, day_ordinal)
+                    VALUES (?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?, ?)
+                ''', [(user_id, r['gregorian_date'], r['jalali_date'], r['time'], r['glucose_level'],
+                       r['description'], r['meal_status'], r['mood'], r['stress_level'],
+                       r['exercise_minutes'], r['sleep_hours'], date_to_ordinal(r['gregorian_date']))
+                      for r in valid])
                 conn.commit()
-                return True
+            self.notify_change('readings', INSERT, None, user_id)
+            return len(valid), rejected
         except Exception as e:
-            logging.error(f"خطا در درج خوانش: {e}")
-            return False
+            logging.error(f"خطا در درج گروهی خوانش‌ها: {e}")
+            event['outcome'] = 'error'
+            return 0, rejected
 
+    @timed(DB_QUERY_SECONDS, method='fetch_all_readings')
     def fetch_all_readings(self, user_id=1):
         """دریافت تمام خوانش‌ها"""
+        if self.is_user_deleted(user_id):
+            return []
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -164,8 +612,24 @@ class DatabaseManager:
             logging.error(f"خطا در دریافت خوانش‌ها: {e}")
             return []
 
+    @timed(DB_QUERY_SECONDS, method='fetch_reading')
+    def fetch_reading(self, reading_id):
+        """دریافت یک خوانش با شناسه آن (برای اعمال رویدادهای تغییر)"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT * FROM readings WHERE id = ?", (reading_id,)).fetchone()
+                if row and self.is_user_deleted(row[1]):
+                    return None
+                return row
+        except Exception as e:
+            logging.error(f"خطا در دریافت خوانش: {e}")
+            return None
+
+    @timed(DB_QUERY_SECONDS, method='fetch_recent_readings')
     def fetch_recent_readings(self, days=30, user_id=1):
         """دریافت خوانش‌های اخیر"""
+        if self.is_user_deleted(user_id):
+            return []
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
             with self.get_connection() as conn:
@@ -179,22 +643,95 @@ class DatabaseManager:
             logging.error(f"خطا در دریافت خوانش‌های اخیر: {e}")
             return []
 
+    @timed(DB_QUERY_SECONDS, method='fetch_readings_by_date_range')
     def fetch_readings_by_date_range(self, start_date, end_date, user_id=1):
-        """دریافت خوانش‌ها بر اساس محدوده تاریخ شمسی"""
+        """دریافت خوانش‌ها بر اساس محدوده تاریخ (شمسی YYYY/MM/DD یا میلادی YYYY-MM-DD)"""
+        if self.is_user_deleted(user_id):
+            return []
         try:
-            with self.get_connection() as conn:
-                cursor = conn.cursor()
-                cursor.execute('''
-                    SELECT * FROM readings WHERE user_id = ? AND jalali_date BETWEEN ? AND ?
-                    ORDER BY jalali_date DESC, time DESC
-                ''', (user_id, start_date, end_date))
-                return cursor.fetchall()
+            first, last = date_to_ordinal(start_date), date_to_ordinal(end_date)
+            if first is None or last is None:
+                logging.error(f"محدوده تاریخ نامعتبر: {start_date} تا {end_date}")
+                return []
+            return self._fetch_readings_by_ordinal_range(first, last, user_id)
         except Exception as e:
             logging.error(f"خطا در دریافت خوانش‌ها بر اساس محدوده تاریخ: {e}")
             return []
 
+    @timed(DB_QUERY_SECONDS, method='fetch_report')
+    def fetch_report(self, start_date, end_date, user_id=1, jalali_month=None, status=None, reading_id=None):
+        """
+        دریافت سطرهای گزارش با تاریخ شمسی و وضعیت قند محاسبه‌شده در خود پرس‌وجو
+        
+        Args:
+            start_date (str): تاریخ میلادی شروع (YYYY-MM-DD)
+            end_date (str): تاریخ میلادی پایان (YYYY-MM-DD)
+            user_id (int): شناسه کاربر
+            jalali_month (str): فقط ماه شمسی مشخص (YYYY/MM)
+            status (str): فقط خوانش‌های با این وضعیت (یکی از GLUCOSE_CLASSES)
+            reading_id (int): فقط یک خوانش (برای اعمال رویدادهای تغییر)
+            
+        Returns:
+            list: سطرهای (id, jalali_date, gregorian_date, time, glucose_level, meal_status, mood,
+                  stress_level, exercise_minutes, sleep_hours, description, status)
+                  به ترتیب نزولی تاریخ و زمان
+        """
+        if self.is_user_deleted(user_id):
+            return []
+        query = '''
+            SELECT * FROM (
+                SELECT r.id, jalali(r.gregorian_date) AS jalali_date, r.gregorian_date, r.time,
+                       r.glucose_level, r.meal_status, r.mood, r.stress_level, r.exercise_minutes,
+                       r.sleep_hours, r.description,
+                       glucose_class(r.glucose_level, u.target_glucose_min, u.target_glucose_max) AS status
+                FROM readings r JOIN users u ON u.id = r.user_id
+                WHERE r.user_id = :user_id AND r.gregorian_date BETWEEN :start_date AND :end_date
+                  AND (:reading_id IS NULL OR r.id = :reading_id)
+            )
+            WHERE (:jalali_month IS NULL OR substr(jalali_date, 1, 7) = :jalali_month)
+              AND (:status IS NULL OR status = :status)
+            ORDER BY gregorian_date DESC, time DESC
+        '''
+        try:
+            with self.get_connection() as conn:
+                return conn.execute(query, {
+                    'user_id': user_id, 'start_date': start_date, 'end_date': end_date,
+                    'jalali_month': jalali_month, 'status': status, 'reading_id': reading_id
+                }).fetchall()
+        except Exception as e:
+            logging.error(f"خطا در دریافت گزارش: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS, method='fetch_report_summary')
+    def fetch_report_summary(self, start_date, end_date, user_id=1):
+        """
+        تجمیع خوانش‌ها به تفکیک ماه شمسی و وضعیت قند در خود پرس‌وجو
+        
+        Returns:
+            list: سطرهای (jalali_month, status, count, avg_glucose, min_glucose, max_glucose)
+        """
+        if self.is_user_deleted(user_id):
+            return []
+        try:
+            with self.get_connection() as conn:
+                return conn.execute('''
+                    SELECT substr(jalali(r.gregorian_date), 1, 7) AS jalali_month,
+                           glucose_class(r.glucose_level, u.target_glucose_min, u.target_glucose_max) AS status,
+                           COUNT(*), ROUND(AVG(r.glucose_level), 1), MIN(r.glucose_level), MAX(r.glucose_level)
+                    FROM readings r JOIN users u ON u.id = r.user_id
+                    WHERE r.user_id = ? AND r.gregorian_date BETWEEN ? AND ?
+                    GROUP BY jalali_month, status
+                    ORDER BY jalali_month, status
+                ''', (user_id, start_date, end_date)).fetchall()
+        except Exception as e:
+            logging.error(f"خطا در دریافت خلاصه گزارش: {e}")
+            return []
+
+    @timed(DB_QUERY_SECONDS, method='get_user_settings')
     def get_user_settings(self, user_id=1):
         """دریافت تنظیمات کاربر"""
+        if self.is_user_deleted(user_id):
+            return None
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -216,13 +753,17 @@ class DatabaseManager:
             logging.error(f"خطا در دریافت تنظیمات کاربر: {e}")
             return None
 
+    @timed(DB_QUERY_SECONDS, method='save_user_settings')
     def save_user_settings(self, username, age, gender, target_glucose_min, target_glucose_max, user_id=1):
         """ذخیره یا به‌روزرسانی تنظیمات کاربر"""
+        if self.is_user_deleted(user_id):
+            return False
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
                 cursor.execute("SELECT COUNT(*) FROM users WHERE id = ?", (user_id,))
-                if cursor.fetchone()[0] > 0:
+                exists = cursor.fetchone()[0] > 0
+                if exists:
                     # به‌روزرسانی کاربر موجود
                     cursor.execute('''
                         UPDATE users SET 
@@ -237,28 +778,36 @@ class DatabaseManager:
                         VALUES (?, ?, ?, ?, ?, ?)
                     ''', (user_id, username, age, gender, target_glucose_min, target_glucose_max))
                 conn.commit()
+                self.notify_change('users', UPDATE if exists else INSERT, user_id, user_id)
                 return True
         except Exception as e:
             logging.error(f"خطا در ذخیره تنظیمات کاربر: {e}")
             return False
 
+    @timed(DB_QUERY_SECONDS, method='insert_reminder')
     def insert_reminder(self, title, scheduled_time, message="", user_id=1, reminder_type="اندازه‌گیری", frequency="روزانه"):
         """درج یادآوری جدید"""
+        if self.is_user_deleted(user_id):
+            return False
         try:
             with self.get_connection() as conn:
-                conn.execute('''
+                cursor = conn.execute('''
                     INSERT INTO reminders 
                     (user_id, title, message, reminder_type, scheduled_time, frequency)
                     VALUES (?, ?, ?, ?, ?, ?)
                 ''', (user_id, title, message, reminder_type, scheduled_time, frequency))
                 conn.commit()
+                self.notify_change('reminders', INSERT, cursor.lastrowid, user_id)
                 return True
         except Exception as e:
             logging.error(f"خطا در درج یادآوری: {e}")
             return False
 
+    @timed(DB_QUERY_SECONDS, method='fetch_all_reminders')
     def fetch_all_reminders(self, user_id=1):
         """دریافت تمام یادآوری‌ها"""
+        if self.is_user_deleted(user_id):
+            return []
         try:
             with self.get_connection() as conn:
                 cursor = conn.cursor()
@@ -271,6 +820,20 @@ class DatabaseManager:
             logging.error(f"خطا در دریافت یادآوری‌ها: {e}")
             return []
 
+    @timed(DB_QUERY_SECONDS, method='fetch_reminder')
+    def fetch_reminder(self, reminder_id):
+        """دریافت یک یادآوری با شناسه آن (برای اعمال رویدادهای تغییر)"""
+        try:
+            with self.get_connection() as conn:
+                row = conn.execute("SELECT * FROM reminders WHERE id = ?", (reminder_id,)).fetchone()
+                if row and self.is_user_deleted(row[1]):
+                    return None
+                return row
+        except Exception as e:
+            logging.error(f"خطا در دریافت یادآوری: {e}")
+            return None
+
+    @timed(DB_QUERY_SECONDS, method='toggle_reminder')
     def toggle_reminder(self, reminder_id):
         """تغییر وضعیت فعال/غیرفعال یادآوری"""
         try:
@@ -282,43 +845,123 @@ class DatabaseManager:
                 
                 conn.execute("UPDATE reminders SET is_active = ? WHERE id = ?", (new_status, reminder_id))
                 conn.commit()
+                self.notify_change('reminders', UPDATE, reminder_id, self._reminder_owner(conn, reminder_id))
                 return True
         except Exception as e:
             logging.error(f"خطا در تغییر وضعیت یادآوری: {e}")
             return False
 
+    @timed(DB_QUERY_SECONDS, method='delete_reminder')
     def delete_reminder(self, reminder_id):
         """حذف یادآوری"""
         try:
             with self.get_connection() as conn:
+                owner = self._reminder_owner(conn, reminder_id)
                 conn.execute("DELETE FROM reminders WHERE id = ?", (reminder_id,))
                 conn.commit()
+                self.notify_change('reminders', DELETE, reminder_id, owner)
                 return True
         except Exception as e:
             logging.error(f"خطا در حذف یادآوری: {e}")
             return False
 
+    @timed(DB_QUERY_SECONDS, method='insert_prediction')
     def insert_prediction(self, user_id, prediction_date, predicted_glucose, confidence_score=0.5):
         """درج پیش‌بینی جدید"""
+        if self.is_user_deleted(user_id):
+            return False
         try:
             with self.get_connection() as conn:
-                conn.execute('''
+                cursor = conn.execute('''
                     INSERT INTO predictions 
                     (user_id, prediction_date, predicted_glucose, confidence_score)
                     VALUES (?, ?, ?, ?)
                 ''', (user_id, prediction_date, predicted_glucose, confidence_score))
                 conn.commit()
+                self.notify_change('predictions', INSERT, cursor.lastrowid, user_id)
                 return True
         except Exception as e:
             logging.error(f"خطا در درج پیش‌بینی: {e}")
             return False
 
+    @timed(DB_QUERY_SECONDS, method='insert_predictions_batch')
+    def insert_predictions_batch(self, user_id, prediction_date, predictions, model_version=None,
+                                 keep_runs=None):
+        """
+        درج یک اجرای کامل پیش‌بینی در یک تراکنش
+        
+        Args:
+            user_id (int): شناسه کاربر
+            prediction_date (str): تاریخ هدف پیش‌بینی به فرمت YYYY-MM-DD
+            predictions (list): فهرست دیکشنری‌هایی با کلیدهای hour، glucose و confidence
+            model_version (str): نسخه مدل تولیدکننده پیش‌بینی
+            keep_runs (int): تعداد اجراهای نگه‌داشته‌شده برای هر کاربر و تاریخ هدف
+            
+        Returns:
+            Optional[int]: شناسه اجرا یا None در صورت خطا
+        """
+        if self.is_user_deleted(user_id):
+            return None
+        if keep_runs is None:
+            keep_runs = self.PREDICTION_RUNS_TO_KEEP
+        try:
+            with self.get_connection() as conn:
+                cursor = conn.cursor()
+                cursor.execute('''
+                    INSERT INTO prediction_runs (user_id, prediction_date, horizon, model_version)
+                    VALUES (?, ?, ?, ?)
+                ''', (user_id, prediction_date, len(predictions), model_version))
+                run_id = cursor.lastrowid
+                
+                cursor.executemany('''
+                    INSERT INTO predictions 
+                    (user_id, prediction_date, predicted_glucose, confidence_score, run_id, prediction_hour)
+                    VALUES (?, ?, ?, ?, ?, ?)
+                ''', [(user_id, prediction_date, p['glucose'], p.get('confidence', 0.5), run_id, p.get('hour'))
+                      for p in predictions])
+                
+                self._apply_prediction_retention(cursor, user_id, prediction_date, keep_runs)
+                conn.commit()
+                self.notify_change('prediction_runs', INSERT, run_id, user_id)
+                return run_id
+        except Exception as e:
+            logging.error(f"خطا در درج دسته‌ای پیش‌بینی‌ها: {e}")
+            return None
+
+    def _apply_prediction_retention(self, cursor, user_id, prediction_date, keep_runs):
+        """حذف اجراهای قدیمی‌تر از keep_runs اجرای آخر برای یک کاربر و تاریخ هدف"""
+        cursor.execute('''
+            SELECT id FROM prediction_runs
+            WHERE user_id = ? AND prediction_date = ?
+            ORDER BY id DESC LIMIT -1 OFFSET ?
+        ''', (user_id, prediction_date, keep_runs))
+        stale_runs = [(row[0],) for row in cursor.fetchall()]
+        if stale_runs:
+            cursor.executemany("DELETE FROM predictions WHERE run_id = ?", stale_runs)
+            cursor.executemany("DELETE FROM prediction_runs WHERE id = ?", stale_runs)
+
+    @timed(DB_QUERY_SECONDS, method='fetch_recent_predictions')
     def fetch_recent_predictions(self, days=7, user_id=1):
-        """دریافت پیش‌بینی‌های اخیر"""
+        """دریافت آخرین اجرای پیش‌بینی (یا پیش‌بینی‌های تکی اخیر در نبود اجرا)"""
+        if self.is_user_deleted(user_id):
+            return []
         try:
             cutoff_date = (datetime.now() - timedelta(days=days)).strftime("%Y-%m-%d")
             with self.get_connection() as conn:
                 cursor = conn.cursor()
+                cursor.execute('''
+                    SELECT id FROM prediction_runs
+                    WHERE user_id = ? AND prediction_date >= ?
+                    ORDER BY prediction_date DESC, id DESC LIMIT 1
+                ''', (user_id, cutoff_date))
+                latest_run = cursor.fetchone()
+                if latest_run:
+                    cursor.execute('''
+                        SELECT * FROM predictions WHERE run_id = ?
+                        ORDER BY prediction_hour
+                    ''', (latest_run[0],))
+                    return cursor.fetchall()
+                
                 cursor.execute('''
                     SELECT * FROM predictions 
                     WHERE user_id = ? AND prediction_date >= ?
@@ -330,5 +973,22 @@ class DatabaseManager:
             return []
 
     def close(self):
-        """بستن اتصال"""
-        pass
\ No newline at end of file
+        """
+        بستن اتصال رشته فعلی و اتصال رشته‌های پایان‌یافته
+        
+        اتصال رشته‌های فعال ممکن است در میانه پرس‌وجو باشد و بسته نمی‌شود؛ هر رشته فعال
+        در فراخوانی بعدی get_connection اتصال قدیمی خود را می‌بندد و اتصال تازه‌ای باز می‌کند.
+        """
+        current = threading.current_thread()
+        with self._connections_lock:
+            connections = [conn for thread, conn in self._connections
+                           if thread is current or not thread.is_alive()]
+            self._connections = [(thread, conn) for thread, conn in self._connections
+                                 if thread is not current and thread.is_alive()]
+            self._generation += 1
+        self._local.conn = None
+        for conn in connections:
+            try:
+                conn.close()
+            except sqlite3.Error as e:
+                logging.error(f"خطا در بستن اتصال پایگاه داده: {e}")
\ No newline at end of file
@@ -0,0 +1,100 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+انتشار رویدادهای تغییر داده (درج، به‌روزرسانی و حذف) درون برنامه
+"""
+
+import logging
+import threading
+from itertools import count
+
+logger = logging.getLogger(__name__)
+
+INSERT = 'insert'
+UPDATE = 'update'
+DELETE = 'delete'
+
+
+class ChangeEvent:
+    """
+    رویداد تغییر یک سطر
+
+    row_id برابر None یعنی تغییر گروهی (مثلاً ورود فایل) که شنونده باید
+    داده‌های جدول را کامل بارگذاری کند.
+    """
+    __slots__ = ('table', 'action', 'row_id', 'user_id')
+
+    def __init__(self, table, action, row_id=None, user_id=None):
+        self.table = table
+        self.action = action
+        self.row_id = row_id
+        self.user_id = user_id
+
+    @property
+    def is_bulk(self):
+        """آیا رویداد مربوط به تغییر گروهی است"""
+        return self.row_id is None
+
+    def to_dict(self):
+        """تبدیل رویداد به دیکشنری"""
+        return {
+            'table': self.table,
+            'action': self.action,
+            'row_id': self.row_id,
+            'user_id': self.user_id
+        }
+
+    def __repr__(self):
+        return f"ChangeEvent({self.table}, {self.action}, row_id={self.row_id}, user_id={self.user_id})"
+
+
+class ChangeEventBus:
+    """گذرگاه انتشار/اشتراک رویدادهای تغییر (ایمن در برابر چند رشته)"""
+
+    def __init__(self):
+        self._subscribers = {}
+        self._lock = threading.Lock()
+        self._tokens = count(1)
+
+    def subscribe(self, callback, tables=None, user_id=None):
+        """
+        اشتراک در رویدادهای تغییر
+
+        Args:
+            callback (Callable[[ChangeEvent], None]): تابع دریافت‌کننده رویداد
+            tables (Optional[Iterable[str]]): فقط رویدادهای این جداول؛ None برای همه
+            user_id (Optional[int]): فقط رویدادهای این کاربر (و رویدادهای بدون کاربر)
+
+        Returns:
+            int: شناسه اشتراک برای لغو با unsubscribe
+        """
+        token = next(self._tokens)
+        with self._lock:
+            self._subscribers[token] = (callback, frozenset(tables) if tables else None, user_id)
+        return token
+
+    def unsubscribe(self, token):
+        """لغو اشتراک"""
+        with self._lock:
+            self._subscribers.pop(token, None)
+
+    def publish(self, event):
+        """
+        ارسال رویداد به مشترکین مرتبط
+
+        فراخوانی‌ها در رشته ناشر انجام می‌شوند؛ شنونده‌های رابط کاربری باید
+        رویداد را با after به رشته Tk منتقل کنند.
+        """
+        with self._lock:
+            subscribers = list(self._subscribers.values())
+
+        for callback, tables, user_id in subscribers:
+            if tables is not None and event.table not in tables:
+                continue
+            if user_id is not None and event.user_id not in (None, user_id):
+                continue
+            try:
+                callback(event)
+            except Exception as e:
+                logger.error(f"خطا در پردازش رویداد {event}: {e}")
@@ -134,4 +134,47 @@ class Prediction:
             time=data.get('time'),
             confidence=data.get('confidence'),
             created_at=data.get('created_at')
-        )
\ No newline at end of file
+        )
+
+class UserStatistics:
+    """کلاس آمار تجمیعی کاربر"""
+    def __init__(self, user_id=None, total_readings=0, avg_glucose=0, min_glucose=None, max_glucose=None,
+                 time_in_range=0.0, last_reading_at=None, active_reminders=0, total_meals=0):
+        self.user_id = user_id
+        self.total_readings = total_readings
+        self.avg_glucose = avg_glucose
+        self.min_glucose = min_glucose
+        self.max_glucose = max_glucose
+        self.time_in_range = time_in_range  # درصد خوانش‌ها در محدوده هدف
+        self.last_reading_at = last_reading_at
+        self.active_reminders = active_reminders
+        self.total_meals = total_meals
+
+    def to_dict(self):
+        """تبدیل آمار کاربر به دیکشنری"""
+        return {
+            'user_id': self.user_id,
+            'total_readings': self.total_readings,
+            'avg_glucose': self.avg_glucose,
+            'min_glucose': self.min_glucose,
+            'max_glucose': self.max_glucose,
+            'time_in_range': self.time_in_range,
+            'last_reading_at': self.last_reading_at,
+            'active_reminders': self.active_reminders,
+            'total_meals': self.total_meals
+        }
+
+    @classmethod
+    def from_dict(cls, data):
+        """ساخت شیء آمار از دیکشنری"""
+        return cls(
+            user_id=data.get('user_id'),
+            total_readings=data.get('total_readings', 0),
+            avg_glucose=data.get('avg_glucose', 0),
+            min_glucose=data.get('min_glucose'),
+            max_glucose=data.get('max_glucose'),
+            time_in_range=data.get('time_in_range', 0.0),
+            last_reading_at=data.get('last_reading_at'),
+            active_reminders=data.get('active_reminders', 0),
+            total_meals=data.get('total_meals', 0)
+        )
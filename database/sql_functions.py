@@ -0,0 +1,116 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+توابع تعریف‌شده کاربر (UDF) برای SQLite: تبدیل تاریخ شمسی و دسته‌بندی قند خون
+"""
+
+import sqlite3
+import logging
+
+from utils.date_utils import gregorian_to_jalali_display
+
+# آستانه‌های پیش‌فرض خطر (mg/dL) در نبود GLUCOSE_LEVELS تنظیمات؛ محدوده هدف از
+# تنظیمات هر کاربر خوانده می‌شود
+DANGEROUS_LOW = 54
+DANGEROUS_HIGH = 250
+
+# برچسب‌ها هم‌نام خروجی ui.utils.get_glucose_status هستند
+GLUCOSE_CLASSES = ('خطرناک پایین', 'پایین', 'نرمال', 'بالا', 'خطرناک بالا')
+
+
+def jalali(ts):
+    """
+    تبدیل تاریخ میلادی به شمسی در قالب YYYY/MM/DD
+
+    Args:
+        ts (str): تاریخ یا زمان میلادی که با YYYY-MM-DD شروع می‌شود
+
+    Returns:
+        Optional[str]: تاریخ شمسی یا None برای ورودی نامعتبر
+    """
+    if not ts or len(ts) < 10:
+        return None
+    # فقط بخش تاریخ کلید حافظه نهان است تا زمان‌های مختلف یک روز مشترک شوند
+    return gregorian_to_jalali_display(ts[:10])
+
+
+def make_glucose_class(dangerous_low=DANGEROUS_LOW, dangerous_high=DANGEROUS_HIGH):
+    """
+    ساخت تابع دسته‌بندی قند خون با آستانه‌های خطر مشخص
+
+    Args:
+        dangerous_low (float): زیر این مقدار «خطرناک پایین»
+        dangerous_high (float): بالای این مقدار «خطرناک بالا»
+
+    Returns:
+        Callable[[float, float, float], Optional[str]]: تابع glucose_class(level, user_min, user_max)
+    """
+    def glucose_class(level, user_min, user_max):
+        """
+        دسته‌بندی سطح قند خون نسبت به محدوده هدف کاربر
+
+        Args:
+            level (float): سطح قند خون
+            user_min (float): حد پایین محدوده هدف کاربر
+            user_max (float): حد بالای محدوده هدف کاربر
+
+        Returns:
+            Optional[str]: یکی از GLUCOSE_CLASSES یا None در نبود مقدار
+        """
+        if level is None:
+            return None
+        if level < dangerous_low:
+            return GLUCOSE_CLASSES[0]
+        if user_min is not None and level < user_min:
+            return GLUCOSE_CLASSES[1]
+        if user_max is None or level <= user_max:
+            return GLUCOSE_CLASSES[2]
+        if level <= dangerous_high:
+            return GLUCOSE_CLASSES[3]
+        return GLUCOSE_CLASSES[4]
+
+    return glucose_class
+
+
+# دسته‌بندی با آستانه‌های پیش‌فرض
+glucose_class = make_glucose_class()
+
+
+def build_sql_functions(glucose_levels=None):
+    """
+    فهرست توابع قابل ثبت (نام، تعداد پارامتر، تابع)
+
+    Args:
+        glucose_levels (Optional[dict]): بخش GLUCOSE_LEVELS تنظیمات؛ کلیدهای DANGEROUS_LOW و
+            DANGEROUS_HIGH همان آستانه‌های ui.utils.get_glucose_status هستند
+
+    Returns:
+        Tuple[Tuple[str, int, Callable], ...]: توابع SQL
+    """
+    levels = glucose_levels or {}
+    return (
+        ('jalali', 1, jalali),
+        ('glucose_class', 3, make_glucose_class(levels.get('DANGEROUS_LOW', DANGEROUS_LOW),
+                                                levels.get('DANGEROUS_HIGH', DANGEROUS_HIGH))),
+    )
+
+
+def register_sql_functions(conn, glucose_levels=None):
+    """
+    ثبت توابع روی یک اتصال
+
+    توابع قطعی (deterministic) ثبت می‌شوند تا SQLite بتواند آن‌ها را در شاخص‌های
+    عبارتی و بهینه‌سازی پرس‌وجو به کار ببرد.
+
+    Args:
+        conn (sqlite3.Connection): اتصال پایگاه داده
+        glucose_levels (Optional[dict]): بخش GLUCOSE_LEVELS تنظیمات برای آستانه‌های glucose_class
+    """
+    for name, num_params, func in build_sql_functions(glucose_levels):
+        try:
+            conn.create_function(name, num_params, func, deterministic=True)
+        except sqlite3.NotSupportedError:
+            # نسخه‌های قدیمی SQLite (پیش از 3.8.3) پرچم deterministic را پشتیبانی نمی‌کنند
+            logging.warning(f"ثبت تابع {name} بدون پرچم deterministic")
+            conn.create_function(name, num_params, func)
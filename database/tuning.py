@@ -0,0 +1,122 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+تنظیمات ذخیره‌سازی SQLite (mmap، حافظه نهان و اندازه صفحه)
+"""
+
+import sqlite3
+import logging
+from typing import Any, Dict, Optional
+
+logger = logging.getLogger(__name__)
+
+# مقادیر پیش‌فرض معادل پیش‌فرض‌های خود SQLite
+DEFAULT_STORAGE_SETTINGS = {
+    'mmap_size': 0,         # بایت؛ 0 یعنی غیرفعال
+    'cache_size': -2000,    # مثبت: تعداد صفحه، منفی: کیلوبایت
+    'page_size': 4096,      # بایت؛ توانی از 2 بین 512 تا 65536
+}
+
+MAX_MMAP_SIZE = 1 << 40
+
+
+def validate_storage_settings(settings: Optional[Dict[str, Any]]) -> Dict[str, int]:
+    """
+    اعتبارسنجی و تکمیل تنظیمات ذخیره‌سازی
+
+    Args:
+        settings (Optional[Dict[str, Any]]): بخش DATABASE تنظیمات یا هر دیکشنری شامل کلیدهای ذخیره‌سازی
+
+    Returns:
+        Dict[str, int]: تنظیمات معتبر با مقادیر پیش‌فرض برای کلیدهای ناموجود
+
+    Raises:
+        ValueError: در صورت نامعتبر بودن یکی از مقادیر
+    """
+    settings = settings or {}
+    result = {}
+
+    for key, default in DEFAULT_STORAGE_SETTINGS.items():
+        value = settings.get(key, default)
+        if isinstance(value, bool) or not isinstance(value, int):
+            raise ValueError(f"مقدار {key} باید عدد صحیح باشد: {value!r}")
+        result[key] = value
+
+    if not 0 <= result['mmap_size'] <= MAX_MMAP_SIZE:
+        raise ValueError(f"mmap_size باید بین 0 تا {MAX_MMAP_SIZE} بایت باشد")
+
+    if result['cache_size'] == 0:
+        raise ValueError("cache_size نمی‌تواند صفر باشد")
+
+    page_size = result['page_size']
+    if not 512 <= page_size <= 65536 or page_size & (page_size - 1):
+        raise ValueError("page_size باید توانی از 2 بین 512 تا 65536 باشد")
+
+    return result
+
+
+def apply_connection_pragmas(conn: sqlite3.Connection, settings: Dict[str, int]) -> None:
+    """
+    اعمال تنظیمات ذخیره‌سازی روی یک اتصال
+
+    page_size فقط روی فایل جدید یا پس از VACUUM اثر دارد؛ برای فایل‌های موجود از
+    rebuild_page_size استفاده کنید.
+
+    Args:
+        conn (sqlite3.Connection): اتصال پایگاه داده
+        settings (Dict[str, int]): تنظیمات معتبرشده با validate_storage_settings
+    """
+    conn.execute(f"PRAGMA page_size = {int(settings['page_size'])}")
+    conn.execute(f"PRAGMA cache_size = {int(settings['cache_size'])}")
+    conn.execute(f"PRAGMA mmap_size = {int(settings['mmap_size'])}")
+
+
+def rebuild_page_size(db_path: str, page_size: int) -> int:
+    """
+    بازسازی یک‌باره فایل پایگاه داده با اندازه صفحه جدید
+
+    Args:
+        db_path (str): مسیر فایل پایگاه داده
+        page_size (int): اندازه صفحه جدید
+
+    Returns:
+        int: اندازه صفحه پس از بازسازی
+    """
+    validate_storage_settings({'page_size': page_size})
+
+    conn = sqlite3.connect(db_path)
+    try:
+        current = conn.execute("PRAGMA page_size").fetchone()[0]
+        if current == page_size:
+            logger.info(f"اندازه صفحه {db_path} از قبل {page_size} است")
+            return current
+
+        # در حالت WAL تغییر اندازه صفحه ممکن نیست
+        journal_mode = conn.execute("PRAGMA journal_mode").fetchone()[0]
+        if journal_mode.lower() == 'wal':
+            conn.execute("PRAGMA journal_mode = DELETE")
+
+        conn.execute(f"PRAGMA page_size = {int(page_size)}")
+        conn.execute("VACUUM")
+
+        if journal_mode.lower() == 'wal':
+            conn.execute("PRAGMA journal_mode = WAL")
+
+        new_size = conn.execute("PRAGMA page_size").fetchone()[0]
+        logger.info(f"اندازه صفحه {db_path} از {current} به {new_size} تغییر کرد")
+        return new_size
+    finally:
+        conn.close()
+
+
+if __name__ == "__main__":
+    import argparse
+
+    parser = argparse.ArgumentParser(description="بازسازی فایل پایگاه داده با اندازه صفحه جدید")
+    parser.add_argument("db_path", help="مسیر فایل پایگاه داده")
+    parser.add_argument("page_size", type=int, help="اندازه صفحه جدید (بایت)")
+    args = parser.parse_args()
+
+    logging.basicConfig(level=logging.INFO)
+    print(rebuild_page_size(args.db_path, args.page_size))
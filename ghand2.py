@@ -6,31 +6,48 @@
 نویسنده: محسن - mahsen81.ir
 """
 
+from utils.startup import STARTUP
+
 import tkinter as tk
 from tkinter import ttk, messagebox, filedialog
 import sqlite3
 import jdatetime
 from datetime import datetime, timedelta
-import matplotlib.pyplot as plt
-from matplotlib.backends.backend_tkagg import FigureCanvasTkAgg
-import pandas as pd
-import numpy as np
 import json
 import os
 import threading
 import time
 import logging
+from bisect import bisect_left
+
+from database.columnar import export_readings_columnar, import_readings_columnar
+from database.events import ChangeEvent, ChangeEventBus
+from utils.date_utils import gregorian_to_jalali_display, parse_datetime_columns
+from utils.reading_schema import READING_SCHEMA
+from utils.lazy import lazy_import
+
+# زمان import ماژول‌ها از مبدأ تا اینجا
+STARTUP.phases['imports'] = STARTUP.elapsed()
 
 # تنظیم لاگ
 logging.basicConfig(level=logging.INFO, format='%(asctime)s - %(levelname)s - %(message)s')
 
-# تنظیم matplotlib برای فارسی
-plt.rcParams['font.family'] = 'DejaVu Sans'
-plt.rcParams['axes.unicode_minus'] = False
+def _configure_matplotlib(pyplot):
+    """تنظیم matplotlib برای فارسی"""
+    pyplot.rcParams['font.family'] = 'DejaVu Sans'
+    pyplot.rcParams['axes.unicode_minus'] = False
+
+# کتابخانه‌های سنگین در اولین استفاده (نمودار، خروجی اکسل) بارگذاری می‌شوند
+plt = lazy_import('matplotlib.pyplot', on_load=_configure_matplotlib)
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
+pd = lazy_import('pandas')
+np = lazy_import('numpy')
 
 class DatabaseManager:
     def __init__(self, db_name="glucose_readings.db"):
         self.db_name = db_name
+        # رویدادهای تغییر داده برای به‌روزرسانی تدریجی جدول‌ها
+        self.events = ChangeEventBus()
         self.init_database()
 
     def init_database(self):
@@ -124,7 +141,7 @@ class DatabaseManager:
         """درج خوانش جدید"""
         try:
             with self.get_connection() as conn:
-                conn.execute('''
+                cursor = conn.execute('''
                     INSERT INTO readings 
                     (user_id, gregorian_date, jalali_date, time, glucose_level, description,
                      meal_status, mood, stress_level, exercise_minutes, sleep_hours)
@@ -132,11 +149,55 @@ class DatabaseManager:
                 ''', (user_id, gregorian_date, jalali_date, time, glucose_level, description,
                      meal_status, mood, stress_level, exercise_minutes, sleep_hours))
                 conn.commit()
-                return True
+            self.notify_change('readings', 'insert', cursor.lastrowid, user_id)
+            return True
         except Exception as e:
             logging.error(f"خطا در درج خوانش: {e}")
             return False
 
+    def update_reading(self, reading_id, jalali_date, time, glucose_level, description=""):
+        """ویرایش خوانش موجود"""
+        try:
+            gregorian_date = jdatetime.datetime.strptime(jalali_date, "%Y/%m/%d").togregorian().strftime("%Y-%m-%d")
+            with self.get_connection() as conn:
+                conn.execute('''
+                    UPDATE readings SET gregorian_date=?, jalali_date=?, time=?, glucose_level=?, description=?
+                    WHERE id=?
+                ''', (gregorian_date, jalali_date, time, glucose_level, description, reading_id))
+                conn.commit()
+                user_id = conn.execute("SELECT user_id FROM readings WHERE id=?", (reading_id,)).fetchone()
+            self.notify_change('readings', 'update', reading_id, user_id[0] if user_id else None)
+            return True
+        except Exception as e:
+            logging.error(f"خطا در ویرایش خوانش: {e}")
+            return False
+
+    def delete_reading(self, reading_id):
+        """حذف خوانش"""
+        try:
+            with self.get_connection() as conn:
+                user_id = conn.execute("SELECT user_id FROM readings WHERE id=?", (reading_id,)).fetchone()
+                conn.execute("DELETE FROM readings WHERE id=?", (reading_id,))
+                conn.commit()
+            self.notify_change('readings', 'delete', reading_id, user_id[0] if user_id else None)
+            return True
+        except Exception as e:
+            logging.error(f"خطا در حذف خوانش: {e}")
+            return False
+
+    def fetch_reading(self, reading_id):
+        """دریافت یک خوانش با شناسه آن"""
+        try:
+            with self.get_connection() as conn:
+                return conn.execute("SELECT * FROM readings WHERE id=?", (reading_id,)).fetchone()
+        except Exception as e:
+            logging.error(f"خطا در دریافت خوانش: {e}")
+            return None
+
+    def notify_change(self, table, action, row_id=None, user_id=None):
+        """انتشار رویداد تغییر پس از commit"""
+        self.events.publish(ChangeEvent(table, action, row_id, user_id))
+
     def fetch_all_readings(self, user_id=1):
         """دریافت تمام خوانش‌ها"""
         try:
@@ -250,20 +311,30 @@ class GlucoseTracker:
         self.default_font = ('Tahoma', 10)
         
         # مدیریت پایگاه داده
-        self.db = DatabaseManager()
+        with STARTUP.phase('database_init'):
+            self.db = DatabaseManager()
         self.current_user_id = 1
         
         # سیستم هوش مصنوعی
-        self.ai_analyzer = AIAnalyzer()
+        with STARTUP.phase('model_load'):
+            self.ai_analyzer = AIAnalyzer()
         
         # پایگاه داده غذا
         self.food_db = FoodDatabase()
         
         # ایجاد رابط کاربری
-        self.create_widgets()
+        with STARTUP.phase('create_widgets'):
+            self.create_widgets()
         
         # بارگذاری اولیه
-        self.load_data()
+        self.tree_keys = []
+        with STARTUP.phase('load_data'):
+            self.load_data()
+        STARTUP.track_window(self.root)
+        
+        # اعمال تدریجی تغییرات خوانش‌ها روی جدول (در رشته Tk)
+        self.db.events.subscribe(lambda event: self.root.after(0, self.apply_reading_change, event),
+                                 tables=('readings',))
 
         # افزودن دکمه امکانات پزشکی پیشرفته به فرم اصلی
         medical_btn = ttk.Button(self.root, text="امکانات پزشکی پیشرفته", command=self.show_medical_features)
@@ -279,11 +350,10 @@ class GlucoseTracker:
         self.notebook.pack(fill="both", expand=True, padx=10, pady=10)
         
         # تب‌ها
-        self.create_main_tab()
-        self.create_report_tab()
-        self.create_chart_tab()
-        self.create_ai_tab()
-        self.create_reminder_tab()
+        for create_tab in (self.create_main_tab, self.create_report_tab, self.create_chart_tab,
+                           self.create_ai_tab, self.create_reminder_tab):
+            with STARTUP.phase(f"tab_{create_tab.__name__[len('create_'):]}"):
+                create_tab()
 
     def create_main_tab(self):
         """تب اصلی ثبت اطلاعات"""
@@ -374,6 +444,8 @@ class GlucoseTracker:
         ttk.Button(action_frame, text="ویرایش", command=self.edit_selected_reading).pack(side="left", padx=5)
         ttk.Button(action_frame, text="حذف", command=self.delete_selected_reading).pack(side="left", padx=5)
         ttk.Button(action_frame, text="صادرات Excel", command=self.export_to_excel).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="صادرات Parquet", command=self.export_to_columnar).pack(side="left", padx=5)
+        ttk.Button(action_frame, text="ورود Parquet", command=self.import_from_columnar).pack(side="left", padx=5)
 
     def create_chart_tab(self):
         """تب نمودارها"""
@@ -502,18 +574,6 @@ class GlucoseTracker:
         self.meal_status.set("نامعلوم")
         self.update_datetime()
 
-    def validate_jalali_date(self, date_str):
-        """اعتبارسنجی تاریخ شمسی"""
-        try:
-            parts = date_str.split('/')
-            if len(parts) != 3:
-                return False
-            year, month, day = map(int, parts)
-            jdatetime.date(year, month, day)
-            return True
-        except:
-            return False
-
     def validate_time(self, time_str):
         """اعتبارسنجی زمان"""
         try:
@@ -525,58 +585,28 @@ class GlucoseTracker:
         except:
             return False
 
-    def jalali_to_gregorian(self, jalali_date_str):
-        """تبدیل تاریخ شمسی به میلادی"""
-        try:
-            parts = jalali_date_str.split('/')
-            year, month, day = map(int, parts)
-            j_date = jdatetime.date(year, month, day)
-            g_date = j_date.togregorian()
-            return g_date.strftime("%Y-%m-%d")
-        except:
-            return datetime.now().strftime("%Y-%m-%d")
-
     def submit_data(self):
         """ثبت اطلاعات"""
         try:
-            # دریافت داده‌ها
-            jalali_date = self.date_entry.get().strip()
-            time_str = self.time_entry.get().strip()
-            glucose_str = self.glucose_entry.get().strip()
-            description = self.description_entry.get().strip()
-            meal_status = self.meal_status.get()
-            
-            # اعتبارسنجی
-            if not self.validate_jalali_date(jalali_date):
-                messagebox.showerror("خطا", "فرمت تاریخ نادرست است (مثال: 1402/08/01)")
-                return
-            
-            if not self.validate_time(time_str):
-                messagebox.showerror("خطا", "فرمت زمان نادرست است (مثال: 14:30)")
-                return
-            
-            if not glucose_str.isdigit():
-                messagebox.showerror("خطا", "قند خون باید عدد باشد")
-                return
-            
-            glucose_level = int(glucose_str)
-            if not (30 <= glucose_level <= 800):
-                messagebox.showerror("خطا", "قند خون باید بین 30 تا 800 باشد")
+            # دریافت، اعتبارسنجی و نرمال‌سازی داده‌ها با طرح‌واره خوانش
+            reading, errors = READING_SCHEMA.normalize({
+                'jalali_date': self.date_entry.get().strip(),
+                'time': self.time_entry.get().strip(),
+                'glucose_level': self.glucose_entry.get().strip(),
+                'description': self.description_entry.get().strip(),
+                'meal_status': self.meal_status.get(),
+            })
+            if errors:
+                messagebox.showerror("خطا", "\n".join(errors))
                 return
-            
-            # تبدیل تاریخ
-            gregorian_date = self.jalali_to_gregorian(jalali_date)
+            glucose_level = reading['glucose_level']
             
             # ثبت در پایگاه داده
-            success = self.db.insert_reading(
-                gregorian_date, jalali_date, time_str, glucose_level, description,
-                self.current_user_id, meal_status
-            )
+            success = self.db.insert_reading(user_id=self.current_user_id, **reading)
             
             if success:
                 messagebox.showinfo("موفقیت", "اطلاعات با موفقیت ثبت شد")
                 self.clear_fields()
-                self.load_data()
                 
                 # نمایش وضعیت قند خون
                 status, color = self.get_glucose_status(glucose_level)
@@ -601,28 +631,29 @@ class GlucoseTracker:
         else:
             return "خطرناک بالا", "red"
 
+    def reading_tag(self, glucose_level):
+        """تعیین رنگ سطر بر اساس سطح قند خون"""
+        if glucose_level < 70 or glucose_level > 200:
+            return "critical"
+        elif glucose_level < 80 or glucose_level > 180:
+            return "warning"
+        return "normal"
+
     def load_data(self):
         """بارگذاری داده‌ها در جدول"""
         try:
             # پاک کردن جدول
-            for item in self.tree.get_children():
-                self.tree.delete(item)
+            self.tree.delete(*self.tree.get_children())
             
-            # دریافت داده‌ها
+            # دریافت داده‌ها (مرتب به صورت نزولی تاریخ و زمان)
             readings = self.db.fetch_all_readings(self.current_user_id)
             
             for reading in readings:
-                # تعیین رنگ بر اساس سطح قند خون
-                glucose_level = reading[5]
-                if glucose_level < 70 or glucose_level > 200:
-                    tag = "critical"
-                elif glucose_level < 80 or glucose_level > 180:
-                    tag = "warning"
-                else:
-                    tag = "normal"
-                
-                # اضافه کردن به جدول
-                self.tree.insert("", "end", values=(reading[3], reading[4], reading[5], reading[6]), tags=(tag,))
+                # شناسه خوانش به عنوان iid تا تغییرات بعدی مستقیماً روی همین سطر اعمال شوند
+                self.tree.insert("", "end", iid=str(reading[0]),
+                                 values=(reading[3], reading[4], reading[5], reading[6]),
+                                 tags=(self.reading_tag(reading[5]),))
+            self.tree_keys = sorted((reading[2], reading[4], reading[0]) for reading in readings)
             
             # تنظیم رنگ‌ها
             self.tree.tag_configure("critical", background="#ffcccc")
@@ -632,6 +663,34 @@ class GlucoseTracker:
         except Exception as e:
             logging.error(f"خطا در بارگذاری داده‌ها: {e}")
 
+    def apply_reading_change(self, event):
+        """اعمال یک رویداد تغییر خوانش روی جدول بدون بارگذاری مجدد کل تاریخچه"""
+        try:
+            if event.is_bulk:
+                self.load_data()
+                return
+            if event.user_id not in (None, self.current_user_id):
+                return
+            
+            iid = str(event.row_id)
+            if event.action != 'insert' and self.tree.exists(iid):
+                self.tree.delete(iid)
+                self.tree_keys = [key for key in self.tree_keys if key[2] != event.row_id]
+            if event.action == 'delete':
+                return
+            
+            reading = self.db.fetch_reading(event.row_id)
+            if not reading:
+                return
+            key = (reading[2], reading[4], reading[0])
+            position = bisect_left(self.tree_keys, key)
+            self.tree_keys.insert(position, key)
+            self.tree.insert("", len(self.tree_keys) - 1 - position, iid=iid,
+                             values=(reading[3], reading[4], reading[5], reading[6]),
+                             tags=(self.reading_tag(reading[5]),))
+        except Exception as e:
+            logging.error(f"خطا در اعمال تغییر خوانش: {e}")
+
     def train_ai_model(self):
         """آموزش مدل هوش مصنوعی"""
         try:
@@ -878,10 +937,22 @@ class GlucoseTracker:
             
             def save_changes():
                 # اعتبارسنجی و ذخیره تغییرات
-                # این قسمت را می‌توانید بر اساس نیاز تکمیل کنید
-                messagebox.showinfo("موفقیت", "تغییرات ذخیره شد")
-                edit_window.destroy()
-                self.load_data()
+                reading, errors = READING_SCHEMA.normalize({
+                    'jalali_date': edit_date.get().strip(),
+                    'time': edit_time.get().strip(),
+                    'glucose_level': edit_glucose.get().strip(),
+                    'description': edit_desc.get().strip(),
+                })
+                if errors:
+                    messagebox.showerror("خطا", "\n".join(errors))
+                    return
+                # جدول با رویداد تغییر به‌روز می‌شود
+                if self.db.update_reading(int(selected_item[0]), reading['jalali_date'], reading['time'],
+                                          reading['glucose_level'], reading['description']):
+                    messagebox.showinfo("موفقیت", "تغییرات ذخیره شد")
+                    edit_window.destroy()
+                else:
+                    messagebox.showerror("خطا", "خطا در ذخیره تغییرات")
             
             ttk.Button(edit_window, text="ذخیره", command=save_changes).grid(row=4, column=0, pady=20)
             ttk.Button(edit_window, text="انصراف", command=edit_window.destroy).grid(row=4, column=1, pady=20)
@@ -903,9 +974,11 @@ class GlucoseTracker:
             if not result:
                 return
             
-            # حذف از پایگاه داده (نیاز به شناسه دقیق دارد)
-            messagebox.showinfo("موفقیت", "خوانش با موفقیت حذف شد")
-            self.load_data()
+            # حذف از پایگاه داده؛ iid هر سطر همان شناسه خوانش است
+            if self.db.delete_reading(int(selected_item[0])):
+                messagebox.showinfo("موفقیت", "خوانش با موفقیت حذف شد")
+            else:
+                messagebox.showerror("خطا", "خطا در حذف خوانش")
             
         except Exception as e:
             logging.error(f"خطا در حذف: {e}")
@@ -932,12 +1005,16 @@ class GlucoseTracker:
                 return
             
             # ایجاد DataFrame
-            df = pd.DataFrame(readings, columns=[
+            # ستون‌های افزوده بعدی (مانند day_ordinal) در خروجی نمی‌آیند
+            df = pd.DataFrame([reading[:13] for reading in readings], columns=[
                 'شناسه', 'کاربر', 'تاریخ میلادی', 'تاریخ شمسی', 'زمان', 
                 'قند خون', 'توضیحات', 'وضعیت غذا', 'حالت روحی', 
                 'سطح استرس', 'دقایق ورزش', 'ساعات خواب', 'تاریخ ایجاد'
             ])
             
+            # یکسان‌سازی تاریخ شمسی (قالب‌های قدیمی با - ذخیره شده‌اند)؛ تاریخ‌های تکراری از حافظه نهان خوانده می‌شوند
+            df['تاریخ شمسی'] = df['تاریخ میلادی'].map(gregorian_to_jalali_display).fillna(df['تاریخ شمسی'])
+            
             # ذخیره در Excel
             df.to_excel(file_path, index=False, engine='openpyxl')
             
@@ -947,6 +1024,48 @@ class GlucoseTracker:
             logging.error(f"خطا در صادرات Excel: {e}")
             messagebox.showerror("خطا", f"خطا در صادرات: {e}")
 
+    def export_to_columnar(self):
+        """صادرات ستونی داده‌ها (Parquet یا npz) برای تحلیل آفلاین"""
+        try:
+            file_path = filedialog.asksaveasfilename(
+                defaultextension=".parquet",
+                filetypes=[("Parquet files", "*.parquet"), ("NumPy files", "*.npz"), ("All files", "*.*")],
+                title="ذخیره فایل ستونی"
+            )
+            
+            if not file_path:
+                return
+            
+            saved_path, count = export_readings_columnar(self.db, file_path, self.current_user_id)
+            
+            if count == 0:
+                messagebox.showwarning("هشدار", "داده‌ای برای صادرات وجود ندارد")
+                return
+            
+            messagebox.showinfo("موفقیت", f"{count} خوانش با موفقیت در {saved_path} ذخیره شد")
+            
+        except Exception as e:
+            logging.error(f"خطا در صادرات ستونی: {e}")
+            messagebox.showerror("خطا", f"خطا در صادرات: {e}")
+
+    def import_from_columnar(self):
+        """ورود خوانش‌ها از فایل ستونی (Parquet یا npz)"""
+        try:
+            file_path = filedialog.askopenfilename(
+                filetypes=[("Columnar files", "*.parquet *.npz"), ("All files", "*.*")],
+                title="انتخاب فایل ستونی"
+            )
+            
+            if not file_path:
+                return
+            
+            count = import_readings_columnar(self.db, file_path, self.current_user_id)
+            messagebox.showinfo("موفقیت", f"{count} خوانش با موفقیت وارد شد")
+            
+        except Exception as e:
+            logging.error(f"خطا در ورود ستونی: {e}")
+            messagebox.showerror("خطا", f"خطا در ورود داده‌ها: {e}")
+
     def show_glucose_trend(self):
         """نمایش نمودار روند قند خون"""
         try:
@@ -961,19 +1080,13 @@ class GlucoseTracker:
                 messagebox.showwarning("هشدار", "حداقل 2 خوانش برای نمایش نمودار نیاز است")
                 return
             
-            # آماده‌سازی داده‌ها
-            dates = []
-            glucose_levels = []
-            
-            for reading in reversed(readings):  # معکوس کردن برای ترتیب زمانی
-                try:
-                    date_obj = datetime.strptime(reading[2], "%Y-%m-%d")
-                    dates.append(date_obj)
-                    glucose_levels.append(reading[5])
-                except:
-                    continue
+            # آماده‌سازی داده‌ها (معکوس کردن برای ترتیب زمانی)
+            readings = readings[::-1]
+            parsed, valid = parse_datetime_columns([r[2] for r in readings], [r[4] for r in readings])
+            dates = parsed[valid]
+            glucose_levels = np.asarray([r[5] for r in readings])[valid]
             
-            if not dates:
+            if not len(dates):
                 messagebox.showwarning("هشدار", "داده معتبری برای نمایش وجود ندارد")
                 return
             
@@ -997,7 +1110,7 @@ class GlucoseTracker:
             fig.autofmt_xdate()
             
             # نمایش در رابط کاربری
-            canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, self.chart_frame)
             canvas.draw()
             canvas.get_tk_widget().pack(fill="both", expand=True)
             
@@ -1019,23 +1132,11 @@ class GlucoseTracker:
                 messagebox.showwarning("هشدار", "داده‌ای برای نمایش وجود ندارد")
                 return
             
-            # گروه‌بندی بر اساس تاریخ
-            daily_data = {}
-            for reading in readings:
-                date = reading[2]  # تاریخ میلادی
-                glucose = reading[5]
-                
-                if date not in daily_data:
-                    daily_data[date] = []
-                daily_data[date].append(glucose)
-            
-            # محاسبه میانگین روزانه
-            dates = []
-            averages = []
-            
-            for date, glucose_list in sorted(daily_data.items()):
-                dates.append(datetime.strptime(date, "%Y-%m-%d"))
-                averages.append(sum(glucose_list) / len(glucose_list))
+            # گروه‌بندی بر اساس تاریخ میلادی و محاسبه میانگین روزانه
+            days, valid = parse_datetime_columns([r[2] for r in readings])
+            levels = np.asarray([r[5] for r in readings], dtype=float)[valid]
+            dates, day_index = np.unique(days[valid].astype('datetime64[D]'), return_inverse=True)
+            averages = np.bincount(day_index, weights=levels) / np.bincount(day_index)
             
             # ایجاد نمودار
             fig, ax = plt.subplots(figsize=(10, 6))
@@ -1055,7 +1156,7 @@ class GlucoseTracker:
             fig.autofmt_xdate()
             
             # نمایش در رابط کاربری
-            canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, self.chart_frame)
             canvas.draw()
             canvas.get_tk_widget().pack(fill="both", expand=True)
             
@@ -1096,7 +1197,7 @@ class GlucoseTracker:
             ax.legend()
             
             # نمایش در رابط کاربری
-            canvas = FigureCanvasTkAgg(fig, self.chart_frame)
+            canvas = backend_tkagg.FigureCanvasTkAgg(fig, self.chart_frame)
             canvas.draw()
             canvas.get_tk_widget().pack(fill="both", expand=True)
             
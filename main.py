@@ -9,30 +9,57 @@
 import os
 import sys
 import logging
-from datetime import datetime
+import argparse
 
 # اضافه کردن مسیرهای مورد نیاز
 sys.path.append(os.path.dirname(os.path.abspath(__file__)))
 
-# تنظیمات لاگینگ
-logging.basicConfig(
-    level=logging.INFO,
-    format='%(asctime)s - %(name)s - %(levelname)s - %(message)s',
-    handlers=[
-        logging.FileHandler(f'logs/app_{datetime.now().strftime("%Y%m%d")}.log', encoding='utf-8'),
-        logging.StreamHandler(sys.stdout)
-    ]
+# زمان‌سنج راه‌اندازی پیش از بقیه ماژول‌ها وارد می‌شود تا مبدأ زمان، شروع برنامه باشد
+from utils.startup import STARTUP
+
+with STARTUP.phase('imports'):
+    from utils.logging import setup_logging, LOG_STRUCTURED_ENV
+    from utils.profiling import Profiler, PROFILE_MODES, DEFAULT_PROFILE_DIR, start_profiling
+    from cli import add_commands, run_command
+
+# تنظیمات لاگینگ: نوشتن در رشته جداگانه؛ سطح ماژول‌ها با متغیر GLUCOSE_LOG_LEVELS
+# و لاگ ساخت‌یافته JSON (رویدادهای زمان‌دار) با GLUCOSE_LOG_STRUCTURED=1
+setup_logging(
+    log_dir='logs',
+    log_level=logging.INFO,
+    structured=os.environ.get(LOG_STRUCTURED_ENV, '') == '1'
 )
 
 logger = logging.getLogger(__name__)
 
+def parse_args(argv=None):
+    """خواندن آرگومان‌های خط فرمان"""
+    parser = argparse.ArgumentParser(description="سیستم مدیریت قند خون")
+    parser.add_argument('--profile', choices=PROFILE_MODES,
+                        help="اجرای برنامه با پروفایل‌گیری پردازنده (cProfile)، حافظه (tracemalloc) یا هر دو")
+    parser.add_argument('--profile-out', default=DEFAULT_PROFILE_DIR, metavar='DIR',
+                        help="پوشه گزارش‌های پروفایل")
+    parser.add_argument('--profile-interval', type=float, default=60, metavar='SECONDS',
+                        help="فاصله تصاویر دوره‌ای حافظه (0 = فقط در پایان)")
+    # دستورهای بدون رابط گرافیکی (import، export، train، ...)؛ بدون دستور، برنامه گرافیکی اجرا می‌شود
+    add_commands(parser)
+    return parser.parse_args(argv)
+
 class GlucoseManagementSystem:
-    def __init__(self):
-        """مقداردهی اولیه سیستم مدیریت قند خون"""
+    def __init__(self, profiler=None):
+        """
+        مقداردهی اولیه سیستم مدیریت قند خون
+        
+        Args:
+            profiler (Optional[Profiler]): پروفایلر فعال از خط فرمان؛ در غیر این صورت
+                پروفایلر غیرفعالی ساخته می‌شود که از منوی ابزارها روشن می‌شود
+        """
         logger.info("در حال راه‌اندازی سیستم مدیریت قند خون...")
+        self.profiler = profiler or Profiler()
         
         # ایجاد پوشه‌های مورد نیاز
-        self._create_directories()
+        with STARTUP.phase('create_directories'):
+            self._create_directories()
         
         # راه‌اندازی ماژول‌های اصلی
         self._init_modules()
@@ -58,30 +85,47 @@ class GlucoseManagementSystem:
                 logger.info(f"پوشه {directory} ایجاد شد")
                 
     def _init_modules(self):
-        """راه‌اندازی ماژول‌های اصلی"""
+        """
+        راه‌اندازی ماژول‌های اصلی
+        
+        فقط تنظیمات و پنجره اصلی در رشته اصلی ساخته می‌شوند تا پنجره بلافاصله
+        نمایش داده شود؛ پایگاه داده، مدل هوش مصنوعی و حافظه‌های نهان در رشته‌های
+        پس‌زمینه آماده می‌شوند و تب‌های وابسته به آن‌ها پس از آماده شدن فعال می‌شوند.
+        """
         try:
             # در اینجا ماژول‌های اصلی را import و مقداردهی اولیه می‌کنیم
-            from core.config_manager import ConfigManager
-            from core.database_manager import DatabaseManager
-            from ui.main_window import MainWindow
+            with STARTUP.phase('imports'):
+                from core.config_manager import ConfigManager
+                from ui.main_window import MainWindow
+                from utils.metrics_exporter import start_metrics_exporter
+                from utils.startup import StagedStartup
             
-            # ایجاد تنظیمات
-            self.config = ConfigManager()
+            # ایجاد تنظیمات و پایش تغییرات فایل آن
+            with STARTUP.phase('config_load'):
+                self.config = ConfigManager()
+                self.config.start_watching()
             
-            # ایجاد پایگاه داده
-            self.db_manager = DatabaseManager(self.config['DATABASE']['name'])
+            # مراحل پس‌زمینه؛ تا آماده شدن آن‌ها این ویژگی‌ها None هستند
+            self.db_manager = None
+            self.ai_analyzer = None
+            self.user_manager = None
+            self.startup = StagedStartup(STARTUP)
+            self.startup.add('database', self._init_database, label="پایگاه داده")
+            self.startup.add('model', self._init_ai, requires=('database',), label="مدل هوش مصنوعی")
+            self.startup.add('caches', self._warm_caches, requires=('database',), label="حافظه‌های نهان")
+            self.startup.add('deletions', self._resume_deletions, requires=('database',),
+                             label="پاک‌سازی کاربران حذف‌شده")
             
-            # ایجاد کاربر پیش‌فرض اگر وجود نداشته باشد
-            if not self.db_manager.get_user(1):
-                self.db_manager.add_user("کاربر پیش‌فرض")
-                self.db_manager.update_user_settings(1, {
-                    'language': 'fa',
-                    'theme': 'default',
-                    'notification_enabled': True
-                })
+            # ارائه متریک‌ها (شنونده محلی یا فایل textfile collector)
+            self.metrics_exporter = start_metrics_exporter(self.config['MONITORING'])
             
             # ایجاد پنجره اصلی
-            self.main_window = MainWindow(self)
+            with STARTUP.phase('main_window'):
+                self.main_window = MainWindow(self)
+            STARTUP.track_window(self.main_window.root)
+            
+            # اجرای مراحل پس‌زمینه و اعلام پیشرفت در رشته رابط کاربری
+            self.startup.attach(self.main_window.root)
             
             logger.info("ماژول‌های اصلی با موفقیت راه‌اندازی شدند")
             
@@ -89,6 +133,76 @@ class GlucoseManagementSystem:
             logger.error(f"خطا در راه‌اندازی ماژول‌ها: {str(e)}")
             raise
             
+    def _init_database(self):
+        """باز کردن پایگاه داده، ایجاد جداول و کاربر پیش‌فرض (رشته پس‌زمینه)"""
+        from core.database_manager import DatabaseManager
+        
+        with STARTUP.phase('database_init'):
+            db_manager = DatabaseManager(
+                self.config['DATABASE']['name'],
+                self.config['DATABASE']
+            )
+        
+        # ایجاد کاربر پیش‌فرض اگر وجود نداشته باشد
+        with STARTUP.phase('default_user_check'):
+            if not db_manager.get_user(1):
+                db_manager.add_user("کاربر پیش‌فرض")
+                db_manager.update_user_settings(1, {
+                    'language': 'fa',
+                    'theme': 'default',
+                    'notification_enabled': True
+                })
+        
+        self.db_manager = db_manager
+        return db_manager
+        
+    def _init_ai(self):
+        """ایجاد تحلیلگر و بارگذاری مدل پیش‌بینی از دیسک (رشته پس‌زمینه)"""
+        from ai.analyzer import AIAnalyzer
+        
+        ai_analyzer = AIAnalyzer(self.db_manager, self.config)
+        # دسترسی به model، مدل و مقیاس‌کننده را بارگذاری یا ایجاد می‌کند
+        ai_analyzer.model
+        self.ai_analyzer = ai_analyzer
+        return ai_analyzer
+        
+    def _resume_deletions(self):
+        """
+        ادامه پاک‌سازی کاربرانی که حذفشان پیش از بسته شدن برنامه کامل نشده است (رشته پس‌زمینه)
+        
+        پاک‌سازی در رشته‌های جداگانه UserManager ادامه می‌یابد و این مرحله منتظر آن نمی‌ماند.
+        
+        Returns:
+            List[int]: شناسه کاربرانی که پاک‌سازی‌شان از سر گرفته شد
+        """
+        from core.user_manager import UserManager
+        
+        self.user_manager = UserManager(self.db_manager)
+        # فقط مدیر پایگاه داده‌ای که حذف نرم کاربران را ثبت می‌کند (database.db_manager) کار معوق دارد
+        if not hasattr(self.db_manager, 'get_deleted_users'):
+            return []
+        return self.user_manager.resume_pending_deletions()
+        
+    def _warm_caches(self, days=365):
+        """
+        پر کردن حافظه نهان تبدیل تاریخ برای خوانش‌های اخیر (رشته پس‌زمینه)
+        
+        از اتصال جداگانه فقط‌خواندنی استفاده می‌شود تا با اتصال رشته رابط کاربری تداخلی نداشته باشد.
+        """
+        import sqlite3
+        from utils.date_utils import gregorian_to_jalali_display
+        
+        conn = sqlite3.connect(f"file:{self.config['DATABASE']['name']}?mode=ro", uri=True)
+        try:
+            rows = conn.execute(
+                "SELECT DISTINCT date FROM glucose_readings ORDER BY date DESC LIMIT ?", (days,)
+            ).fetchall()
+        finally:
+            conn.close()
+        for (date,) in rows:
+            gregorian_to_jalali_display(date)
+        return len(rows)
+            
     def run(self):
         """اجرای برنامه"""
         try:
@@ -98,12 +212,23 @@ class GlucoseManagementSystem:
             logger.error(f"خطا در اجرای برنامه: {str(e)}")
             raise
         finally:
-            if hasattr(self, 'db_manager'):
+            if hasattr(self, 'config'):
+                self.config.stop_watching()
+            if hasattr(self, 'metrics_exporter'):
+                self.metrics_exporter.stop()
+            if getattr(self, 'db_manager', None) is not None:
                 self.db_manager.close()
 
 if __name__ == "__main__":
+    args = parse_args()
+    # پروفایل‌گیری پیش از راه‌اندازی ماژول‌ها شروع می‌شود تا زمان راه‌اندازی هم ثبت شود
+    profiler = None
+    if args.profile:
+        profiler = start_profiling(args.profile, args.profile_out, args.profile_interval)
+    if args.command:
+        sys.exit(run_command(args))
     try:
-        app = GlucoseManagementSystem()
+        app = GlucoseManagementSystem(profiler)
         app.run()
     except Exception as e:
         logger.critical(f"خطای بحرانی در اجرای برنامه: {str(e)}")
@@ -0,0 +1,114 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بررسی بودجه زمان import در راه‌اندازی برنامه
+
+ماژول‌های مسیر راه‌اندازی در یک مفسر تازه با `python -X importtime` وارد
+می‌شوند و مجموع زمان تجمعی importهای سطح اول با بودجه مقایسه می‌شود. همچنین
+بارگذاری کتابخانه‌های سنگینی که باید تأخیری باشند (matplotlib، pandas و ...)
+خطا محسوب می‌شود. در صورت تجاوز از بودجه کد خروج 1 برگردانده می‌شود.
+
+اجرا:
+    python tools/check_import_time.py
+    python tools/check_import_time.py --budget-ms 400 --repeat 5 --top 15
+    python tools/check_import_time.py --module ghand2
+"""
+
+import os
+import re
+import sys
+import argparse
+import subprocess
+
+ROOT = os.path.dirname(os.path.dirname(os.path.abspath(__file__)))
+
+# ماژول‌هایی که main.py پیش از نمایش پنجره وارد می‌کند
+STARTUP_MODULES = (
+    'utils.startup',
+    'utils.logging',
+    'utils.profiling',
+    'cli',
+    'utils.metrics_exporter',
+    'core.config_manager',
+    'core.database_manager',
+    'database.db_manager',
+    'ai',
+)
+
+# کتابخانه‌هایی که نباید در راه‌اندازی بارگذاری شوند
+DEFERRED_PACKAGES = ('matplotlib', 'pandas', 'sklearn', 'joblib', 'pyarrow')
+
+# بودجه پیش‌فرض (میلی‌ثانیه)؛ با متغیر محیطی قابل تغییر است
+BUDGET_ENV = 'GLUCOSE_IMPORT_BUDGET_MS'
+DEFAULT_BUDGET_MS = 300.0
+
+_LINE = re.compile(r'^import time:\s+(\d+)\s+\|\s+(\d+)\s+\|(\s*)(\S+)')
+
+
+def measure(modules):
+    """
+    اجرای یک مفسر تازه و خواندن خروجی importtime
+
+    Returns:
+        list: رکوردهای (نام ماژول، زمان خود میکروثانیه، زمان تجمعی میکروثانیه، عمق)
+    """
+    code = '; '.join(f"import {name}" for name in modules)
+    result = subprocess.run(
+        [sys.executable, '-X', 'importtime', '-c', code],
+        cwd=ROOT, capture_output=True, text=True
+    )
+    if result.returncode != 0:
+        raise RuntimeError(f"import ناموفق بود:\n{result.stderr[-2000:]}")
+    records = []
+    for line in result.stderr.splitlines():
+        match = _LINE.match(line)
+        if match:
+            self_us, cumulative_us, indent, name = match.groups()
+            # هر سطح تودرتویی دو فاصله تورفتگی اضافه دارد
+            depth = (len(indent) - 1) // 2
+            records.append((name, int(self_us), int(cumulative_us), depth))
+    return records
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='بررسی بودجه زمان import راه‌اندازی')
+    parser.add_argument('--module', action='append', dest='modules',
+                        help='ماژول‌های مورد بررسی (پیش‌فرض: مسیر راه‌اندازی main.py)')
+    parser.add_argument('--budget-ms', type=float,
+                        default=float(os.environ.get(BUDGET_ENV, DEFAULT_BUDGET_MS)))
+    parser.add_argument('--repeat', type=int, default=3, help='کمترین زمان در چند اجرا')
+    parser.add_argument('--top', type=int, default=10, help='تعداد پرهزینه‌ترین importها در گزارش')
+    args = parser.parse_args(argv)
+
+    modules = args.modules or list(STARTUP_MODULES)
+    best = None
+    for _ in range(max(1, args.repeat)):
+        records = measure(modules)
+        total_us = sum(cumulative for _, _, cumulative, depth in records if depth == 0)
+        if best is None or total_us < best[0]:
+            best = (total_us, records)
+    total_us, records = best
+
+    print(f"modules: {', '.join(modules)}")
+    print(f"total import time: {total_us / 1000:.1f} ms (budget {args.budget_ms:.0f} ms, best of {args.repeat})")
+    print(f"\ntop {args.top} top-level imports by cumulative time:")
+    top_level = sorted((r for r in records if r[3] == 0), key=lambda r: r[2], reverse=True)
+    for name, _, cumulative, _ in top_level[:args.top]:
+        print(f"  {cumulative / 1000:8.1f} ms  {name}")
+
+    failed = False
+    loaded = sorted({name.split('.')[0] for name, _, _, _ in records} & set(DEFERRED_PACKAGES))
+    if loaded:
+        print(f"\nFAIL: deferred packages imported at startup: {', '.join(loaded)}")
+        failed = True
+    if total_us / 1000 > args.budget_ms:
+        print(f"\nFAIL: import time exceeds budget by {total_us / 1000 - args.budget_ms:.1f} ms")
+        failed = True
+    if not failed:
+        print("\nOK")
+    return 1 if failed else 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -0,0 +1,134 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+خلاصه تأخیر رویدادها از لاگ‌های ساخت‌یافته (JSON lines)
+
+برای هر رویداد تعداد، تعداد تخمینی (با احتساب نرخ نمونه‌برداری)، خطاها و
+صدک‌های p50/p90/p95/p99 و بیشینه duration_ms را چاپ می‌کند.
+فقط به کتابخانه استاندارد وابسته است.
+
+اجرا:
+    python tools/summarize_latency.py logs/
+    python tools/summarize_latency.py logs/app_20240101.jsonl --event report.load --since 2024-01-01
+"""
+
+import os
+import sys
+import json
+import math
+import argparse
+from collections import defaultdict
+
+PERCENTILES = (50, 90, 95, 99)
+
+
+def iter_log_files(paths):
+    """فهرست فایل‌های لاگ؛ برای پوشه‌ها فایل‌های .jsonl (و نسخه‌های چرخشی آن‌ها) برگردانده می‌شوند"""
+    for path in paths:
+        if os.path.isdir(path):
+            for name in sorted(os.listdir(path)):
+                if '.jsonl' in name:
+                    yield os.path.join(path, name)
+        else:
+            yield path
+
+
+def iter_events(files, event=None, since=None):
+    """خواندن رکوردهای رویداد؛ خطوط غیر JSON و رکوردهای بدون event نادیده گرفته می‌شوند"""
+    for file_path in files:
+        with open(file_path, encoding='utf-8', errors='replace') as f:
+            for line in f:
+                line = line.strip()
+                if not line.startswith('{'):
+                    continue
+                try:
+                    record = json.loads(line)
+                except ValueError:
+                    continue
+                name = record.get('event')
+                if name is None or (event and name != event):
+                    continue
+                # ts به صورت ISO است و مقایسه رشته‌ای کافی است
+                if since and record.get('ts', '') < since:
+                    continue
+                yield record
+
+
+def percentile(sorted_values, p):
+    """صدک به روش nearest-rank روی مقادیر مرتب‌شده"""
+    if not sorted_values:
+        return None
+    rank = max(1, math.ceil(p / 100 * len(sorted_values)))
+    return sorted_values[rank - 1]
+
+
+def summarize(records):
+    """
+    گروه‌بندی رویدادها بر اساس نام
+
+    Returns:
+        dict: نام رویداد -> {'count', 'estimated', 'errors', 'durations'}
+    """
+    groups = defaultdict(lambda: {'count': 0, 'estimated': 0.0, 'errors': 0, 'durations': []})
+    for record in records:
+        group = groups[record['event']]
+        group['count'] += 1
+        rate = record.get('sample_rate') or 1.0
+        group['estimated'] += 1.0 / rate
+        if record.get('outcome') == 'error':
+            group['errors'] += 1
+        duration = record.get('duration_ms')
+        if isinstance(duration, (int, float)):
+            group['durations'].append(float(duration))
+    return groups
+
+
+def format_table(groups):
+    """جدول متنی خلاصه، مرتب‌شده بر اساس نام رویداد"""
+    header = (f"{'event':<24}{'count':>8}{'est.':>10}{'errors':>8}"
+              + ''.join(f"{'p' + str(p):>10}" for p in PERCENTILES) + f"{'max':>10}")
+    lines = [header, '-' * len(header)]
+    for name in sorted(groups):
+        group = groups[name]
+        durations = sorted(group['durations'])
+        cells = [percentile(durations, p) for p in PERCENTILES] + [durations[-1] if durations else None]
+        lines.append(
+            f"{name:<24}{group['count']:>8}{group['estimated']:>10.0f}{group['errors']:>8}"
+            + ''.join(f"{value:>10.1f}" if value is not None else f"{'-':>10}" for value in cells)
+        )
+    return '\n'.join(lines)
+
+
+def main(argv=None):
+    parser = argparse.ArgumentParser(description='خلاصه صدک‌های تأخیر رویدادها از لاگ‌های JSON')
+    parser.add_argument('paths', nargs='*', default=['logs'], help='فایل‌ها یا پوشه‌های لاگ')
+    parser.add_argument('--event', help='فقط یک رویداد (مثلاً reading.insert)')
+    parser.add_argument('--since', help='فقط رویدادهای پس از این زمان (ISO، مثلاً 2024-01-01)')
+    parser.add_argument('--json', action='store_true', help='خروجی JSON به جای جدول')
+    args = parser.parse_args(argv)
+
+    groups = summarize(iter_events(iter_log_files(args.paths), args.event, args.since))
+    if not groups:
+        print("رویدادی یافت نشد (آیا برنامه با GLUCOSE_LOG_STRUCTURED=1 اجرا شده است؟)", file=sys.stderr)
+        return 1
+
+    if args.json:
+        output = {}
+        for name, group in groups.items():
+            durations = sorted(group['durations'])
+            output[name] = {
+                'count': group['count'],
+                'estimated': round(group['estimated']),
+                'errors': group['errors'],
+                **{f"p{p}": percentile(durations, p) for p in PERCENTILES},
+                'max': durations[-1] if durations else None,
+            }
+        print(json.dumps(output, ensure_ascii=False, indent=2))
+    else:
+        print(format_table(groups))
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
@@ -7,10 +7,16 @@
 
 import tkinter as tk
 from tkinter import ttk
+import time
 import logging
 
 from .tabs import MainTab, ReportTab, ChartTab, AITab, ReminderTab, UserSettingsTab
 from .utils import create_persian_style, show_message
+from utils.metrics import histogram, gauge, time_block, UI_TAB_LOAD_SECONDS
+from utils.startup import STARTUP
+
+# سطل‌های تأخیر حلقه رویداد (ثانیه)؛ تأخیر کمتر از 5ms قابل چشم‌پوشی است
+UI_LAG_BUCKETS = (0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0)
 
 logger = logging.getLogger(__name__)
 
@@ -37,6 +43,17 @@ class MainWindow:
         # ایجاد تب‌ها
         self._create_tabs()
         
+        # نمایش پیشرفت مراحل راه‌اندازی پس‌زمینه
+        self._track_startup()
+        
+        # پایش تأخیر حلقه رویداد
+        self._start_lag_monitor()
+        
+        # اعمال تغییرات بخش UI تنظیمات بدون راه‌اندازی مجدد
+        subscribe = getattr(self.config, 'subscribe', None)
+        if subscribe is not None:
+            subscribe(lambda changes: self.root.after(0, self._apply_ui_config, changes), sections=('UI',))
+        
         logger.info("پنجره اصلی ایجاد شد")
         
     def _create_menu(self):
@@ -53,6 +70,12 @@ class MainWindow:
         settings_menu.add_command(label="تنظیمات کاربر", command=self._show_user_settings)
         menubar.add_cascade(label="تنظیمات", menu=settings_menu)
         
+        # منوی ابزارها: پروفایل‌گیری در زمان اجرا
+        tools_menu = tk.Menu(menubar, tearoff=0)
+        tools_menu.add_command(label="شروع/توقف پروفایل پردازنده", command=self._toggle_profiling)
+        tools_menu.add_command(label="پروفایل ۶۰ ثانیه‌ای (پردازنده و حافظه)", command=self._profile_window)
+        menubar.add_cascade(label="ابزارها", menu=tools_menu)
+        
         # منوی راهنما
         help_menu = tk.Menu(menubar, tearoff=0)
         help_menu.add_command(label="درباره", command=self._show_about)
@@ -62,85 +85,161 @@ class MainWindow:
         
     def _create_status_bar(self):
         """ایجاد نوار وضعیت"""
+        status_frame = ttk.Frame(self.root, relief=tk.SUNKEN)
+        status_frame.pack(side=tk.BOTTOM, fill=tk.X)
         self.status_bar = ttk.Label(
-            self.root,
-            text="آماده",
-            relief=tk.SUNKEN,
+            status_frame,
+            text="در حال آماده‌سازی...",
             anchor=tk.W
         )
-        self.status_bar.pack(side=tk.BOTTOM, fill=tk.X)
+        self.status_bar.pack(side=tk.LEFT, fill=tk.X, expand=True)
+        # پیشرفت راه‌اندازی پس‌زمینه؛ پس از پایان همه مراحل حذف می‌شود
+        self.startup_progress = ttk.Progressbar(status_frame, mode='determinate', length=160)
+        self.startup_progress.pack(side=tk.RIGHT, padx=4, pady=2)
         
     def _create_tabs(self):
-        """ایجاد تب‌ها"""
+        """
+        ایجاد تب‌ها به صورت تأخیری
+        
+        برای هر تب فقط یک فریم جانشین با پیام «در حال بارگذاری» به Notebook
+        افزوده می‌شود و خود تب (و پرس‌وجوها، نمودار و پیش‌بینی‌های آن) در اولین
+        انتخاب ساخته می‌شود؛ بنابراین نمایش اولیه پنجره به حجم داده‌ها وابسته نیست.
+        
+        تب‌ها تا آماده شدن مراحل راه‌اندازی مورد نیازشان (app.startup) غیرفعال هستند.
+        """
         self.notebook = ttk.Notebook(self.root)
+        colors = self.config['UI']['colors']
+        fonts = self.config['UI']['fonts']
+        app = self.app
         
-        # تب اصلی
-        self.main_tab = MainTab(
-            self.notebook,
-            self.app.db_manager,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
-        )
-        self.notebook.add(self.main_tab, text="ثبت قند خون")
-        
-        # تب گزارش‌ها
-        self.report_tab = ReportTab(
-            self.notebook,
-            self.app.db_manager,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
-        )
-        self.notebook.add(self.report_tab, text="گزارش‌ها")
-        
-        # تب نمودارها
-        self.chart_tab = ChartTab(
-            self.notebook,
-            self.app.db_manager,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
-        )
-        self.notebook.add(self.chart_tab, text="نمودارها")
-        
-        # تب هوش مصنوعی
-        self.ai_tab = AITab(
-            self.notebook,
-            self.app.db_manager,
-            self.app.ai_analyzer,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
+        # (نام ویژگی، عنوان، مراحل راه‌اندازی مورد نیاز، سازنده تب با فریم والد)
+        tab_specs = (
+            ('main_tab', "ثبت قند خون", ('database',),
+             lambda parent: MainTab(parent, app.db_manager, self.config, colors, fonts)),
+            ('report_tab', "گزارش‌ها", ('database',),
+             lambda parent: ReportTab(parent, app.db_manager, self.config, colors, fonts)),
+            ('chart_tab', "نمودارها", ('database',),
+             lambda parent: ChartTab(parent, app.db_manager, self.config, colors, fonts)),
+            ('ai_tab', "هوش مصنوعی", ('database', 'model'),
+             lambda parent: AITab(parent, app.db_manager, app.ai_analyzer, self.config, colors, fonts)),
+            ('reminder_tab', "یادآوری‌ها", ('database',),
+             lambda parent: ReminderTab(parent, app.db_manager, self.config, colors, fonts)),
+            ('settings_tab', "تنظیمات", ('database',),
+             lambda parent: UserSettingsTab(parent, app.db_manager, self.config, colors, fonts)),
         )
-        self.notebook.add(self.ai_tab, text="هوش مصنوعی")
-        
-        # تب یادآوری‌ها
-        self.reminder_tab = ReminderTab(
-            self.notebook,
-            self.app.db_manager,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
-        )
-        self.notebook.add(self.reminder_tab, text="یادآوری‌ها")
-        
-        # تب تنظیمات کاربر
-        self.settings_tab = UserSettingsTab(
-            self.notebook,
-            self.app.db_manager,
-            self.config,
-            self.config['UI']['colors'],
-            self.config['UI']['fonts']
-        )
-        self.notebook.add(self.settings_tab, text="تنظیمات")
         
+        self.tab_frames = {}
+        self._pending_tabs = {}
+        for name, title, requires, factory in tab_specs:
+            placeholder = ttk.Frame(self.notebook)
+            ttk.Label(placeholder, text="در حال بارگذاری...").pack(expand=True)
+            self.notebook.add(placeholder, text=title)
+            self.tab_frames[name] = placeholder
+            self._pending_tabs[str(placeholder)] = (name, factory)
+            setattr(self, name, None)
+            if not self.app.startup.is_ready(*requires):
+                self.notebook.tab(placeholder, state='disabled')
+                self.app.startup.on_ready(
+                    requires,
+                    lambda *results, placeholder=placeholder: self._enable_tab(placeholder),
+                    lambda failed, error, title=title: self.update_status(
+                        f"{title} در دسترس نیست: {self.app.startup.label(failed)} آماده نشد")
+                )
+            
+        self.notebook.bind('<<NotebookTabChanged>>', self._on_tab_changed)
         self.notebook.pack(expand=True, fill=tk.BOTH)
+        # تب اول پس از نمایش پنجره ساخته می‌شود (ساخت تکراری با _pending_tabs نادیده گرفته می‌شود)
+        self.root.after_idle(self._on_tab_changed)
+        
+    def _on_tab_changed(self, event=None):
+        """ساخت تب انتخاب‌شده در اولین نمایش"""
+        self._build_tab(self.notebook.select())
+        
+    def _enable_tab(self, placeholder):
+        """فعال کردن تب پس از آماده شدن مراحل مورد نیاز و ساخت آن اگر انتخاب شده باشد"""
+        self.notebook.tab(placeholder, state='normal')
+        current = str(self.notebook.select())
+        if not current:
+            # تا اینجا همه تب‌ها غیرفعال بوده‌اند و ttk هیچ تبی را انتخاب نکرده است؛
+            # انتخاب، رویداد NotebookTabChanged و در نتیجه ساخت تب را در پی دارد
+            self.notebook.select(placeholder)
+        elif current == str(placeholder):
+            self._build_tab(placeholder)
+        
+    def _build_tab(self, tab_id):
+        """ساخت تب مربوط به یک فریم جانشین (در صورت ساخته نشدن قبلی)"""
+        if str(tab_id) not in self._pending_tabs or str(self.notebook.tab(tab_id, 'state')) == 'disabled':
+            return
+        pending = self._pending_tabs.pop(str(tab_id))
+        name, factory = pending
+        placeholder = self.notebook.nametowidget(tab_id)
+        # فقط پیام بارگذاری حذف می‌شود؛ فریم خود تب هم فرزند جانشین است
+        loading_widgets = placeholder.winfo_children()
+        # نمایش پیام بارگذاری پیش از شروع ساخت تب
+        placeholder.update_idletasks()
+        try:
+            with time_block(UI_TAB_LOAD_SECONDS, method=f'build_{name}'), STARTUP.phase(f'tab_{name}'):
+                tab = factory(placeholder)
+        except Exception as e:
+            logger.error(f"خطا در ساخت تب {name}: {str(e)}")
+            # تلاش دوباره در انتخاب بعدی
+            self._pending_tabs[str(tab_id)] = pending
+            self.update_status("خطا در بارگذاری تب")
+            return
+        for child in loading_widgets:
+            child.destroy()
+        tab.frame.pack(expand=True, fill=tk.BOTH)
+        setattr(self, name, tab)
+        logger.debug(f"تب {name} ساخته شد")
+        
+    def _track_startup(self):
+        """نمایش پیشرفت مراحل راه‌اندازی در نوار وضعیت"""
+        def on_progress(name, label, state, done, total):
+            self.startup_progress.configure(maximum=total, value=done)
+            if state == self.app.startup.RUNNING:
+                self.update_status(f"در حال آماده‌سازی {label}...")
+            elif state == self.app.startup.FAILED:
+                self.update_status(f"خطا در آماده‌سازی {label}")
+            if done == total:
+                self.startup_progress.pack_forget()
+                if not self.app.startup.errors:
+                    self.update_status("آماده")
+                    
+        self.app.startup.on_progress(on_progress)
+        
+    def _apply_ui_config(self, changes):
+        """به‌روزرسانی عنوان و اندازه پنجره پس از تغییر تنظیمات"""
+        ui_config = changes.get('UI') or {}
+        if ui_config.get('title'):
+            self.root.title(ui_config['title'])
+        if ui_config.get('window_size'):
+            self.root.geometry(ui_config['window_size'])
+        self.update_status("تنظیمات جدید اعمال شد")
         
     def _show_user_settings(self):
         """نمایش تنظیمات کاربر"""
-        self.notebook.select(self.settings_tab)
+        placeholder = self.tab_frames['settings_tab']
+        if str(self.notebook.tab(placeholder, 'state')) == 'disabled':
+            self.update_status("تنظیمات کاربر پس از آماده شدن پایگاه داده در دسترس است")
+            return
+        self.notebook.select(placeholder)
         
+    def _toggle_profiling(self):
+        """روشن یا خاموش کردن پروفایل پردازنده"""
+        profiler = self.app.profiler
+        if profiler.toggle('cpu'):
+            self.update_status("پروفایل‌گیری فعال است")
+        else:
+            self.update_status(f"گزارش پروفایل در {profiler.out_dir} ذخیره شد")
+            
+    def _profile_window(self, seconds=60):
+        """پروفایل‌گیری برای یک بازه؛ توقف با after در همین رشته انجام می‌شود"""
+        profiler = self.app.profiler
+        if profiler.start_window(seconds, 'both', schedule=self.root.after):
+            self.update_status(f"پروفایل‌گیری به مدت {seconds} ثانیه...")
+        else:
+            self.update_status("پروفایل‌گیری از قبل فعال است")
+            
     def _show_about(self):
         """نمایش اطلاعات برنامه"""
         show_message(
@@ -149,6 +248,32 @@ class MainWindow:
             "سیستم مدیریت قند خون\nنسخه 2.0\n\nتوسعه‌دهنده: تیم توسعه"
         )
         
+    def _start_lag_monitor(self):
+        """
+        اندازه‌گیری تأخیر حلقه رویداد Tk
+
+        یک callback دوره‌ای با after زمان‌بندی می‌شود و فاصله اجرای واقعی آن با
+        زمان مورد انتظار، مدت مسدود بودن رابط کاربری را نشان می‌دهد.
+        """
+        interval_ms = int(self.config.get('MONITORING.ui_lag_interval_ms', 500) or 0)
+        if interval_ms <= 0:
+            return
+        self._lag_interval = interval_ms / 1000
+        self._lag_histogram = histogram('ui_event_loop_lag_seconds', "تأخیر حلقه رویداد رابط کاربری",
+                                        UI_LAG_BUCKETS)
+        self._lag_gauge = gauge('ui_event_loop_lag_last_seconds', "آخرین تأخیر اندازه‌گیری‌شده حلقه رویداد")
+        self._lag_expected = time.perf_counter() + self._lag_interval
+        self.root.after(interval_ms, self._check_lag, interval_ms)
+        
+    def _check_lag(self, interval_ms):
+        """ثبت تأخیر و زمان‌بندی اندازه‌گیری بعدی"""
+        now = time.perf_counter()
+        lag = max(0.0, now - self._lag_expected)
+        self._lag_histogram.observe(lag)
+        self._lag_gauge.set(lag)
+        self._lag_expected = now + self._lag_interval
+        self.root.after(interval_ms, self._check_lag, interval_ms)
+        
     def update_status(self, message):
         """به‌روزرسانی نوار وضعیت"""
         self.status_bar.config(text=message)
@@ -11,18 +11,42 @@ from tkcalendar import DateEntry # type: ignore
 import logging
 import os
 import sys
+from bisect import bisect_left
 from datetime import datetime
 
 # افزودن مسیر پروژه به sys.path
 sys.path.append(os.path.dirname(os.path.dirname(os.path.abspath(__file__))))
 
-from database.models import Reading, Reminder
-from .utils import show_message, validate_persian_date, validate_persian_time, get_glucose_status
+from database.models import Reminder
+from database.sql_functions import GLUCOSE_CLASSES
+from utils.date_utils import gregorian_to_jalali_display, jalali_to_gregorian, get_date_cache_stats, parse_datetime_columns
+from utils.reading_schema import READING_SCHEMA
+from utils.logging import timed_event
+from utils.metrics import timed, UI_TAB_LOAD_SECONDS
+from utils.lazy import lazy_import
+from .utils import show_message, get_glucose_status
 
 logger = logging.getLogger(__name__)
 
+# matplotlib فقط هنگام ساخت تب نمودارها بارگذاری می‌شود
+plt = lazy_import('matplotlib.pyplot')
+backend_tkagg = lazy_import('matplotlib.backends.backend_tkagg')
+
+
+def format_jalali_timestamp(timestamp):
+    """نمایش زمان میلادی YYYY-MM-DD HH:MM:SS به صورت «YYYY/MM/DD ساعت HH:MM» شمسی"""
+    jalali_date = gregorian_to_jalali_display(timestamp[:10]) if timestamp else None
+    if not jalali_date:
+        return timestamp # اگر تبدیل ناموفق بود، همان تاریخ میلادی را نمایش بده
+    return f"{jalali_date} ساعت {timestamp[11:16]}"
+
 class BaseTab:
     """کلاس پایه برای تب‌های مختلف"""
+    # جداولی که تب به رویدادهای تغییر آن‌ها گوش می‌دهد
+    CHANGE_TABLES = ()
+    # بخش‌های تنظیمات که تب به تغییرات آن‌ها گوش می‌دهد
+    CONFIG_SECTIONS = ()
+
     def __init__(self, parent, db_manager, config, colors, fonts):
         self.parent = parent
         self.db_manager = db_manager
@@ -31,6 +55,33 @@ class BaseTab:
         self.fonts = fonts
         self.frame = ttk.Frame(parent, style='TFrame')
         self.create_widgets()
+        self.change_subscription = self.subscribe_changes()
+        self.config_subscription = self.subscribe_config()
+
+    def subscribe_changes(self):
+        """اشتراک در رویدادهای تغییر پایگاه داده برای جداول CHANGE_TABLES"""
+        events = getattr(self.db_manager, 'events', None)
+        if events is None or not self.CHANGE_TABLES:
+            return None
+        # رویدادها ممکن است از رشته‌های دیگر منتشر شوند؛ اعمال آن‌ها در رشته Tk انجام می‌شود
+        return events.subscribe(lambda event: self.frame.after(0, self.apply_change, event),
+                                tables=self.CHANGE_TABLES)
+
+    def subscribe_config(self):
+        """اشتراک در تغییرات بخش‌های CONFIG_SECTIONS تنظیمات (بارگذاری مجدد فایل یا set)"""
+        subscribe = getattr(self.config, 'subscribe', None)
+        if subscribe is None or not self.CONFIG_SECTIONS:
+            return None
+        return subscribe(lambda changes: self.frame.after(0, self.apply_config, changes),
+                         sections=self.CONFIG_SECTIONS)
+
+    def apply_config(self, changes):
+        """اعمال تغییر تنظیمات روی ویجت‌ها بدون بارگذاری مجدد داده‌ها. پیش‌فرض: بدون عمل."""
+        pass
+
+    def apply_change(self, event):
+        """اعمال یک رویداد تغییر روی ویجت‌ها. پیش‌فرض: بارگذاری مجدد کامل."""
+        self.refresh_data()
 
     def create_widgets(self):
         """ایجاد ویجت‌های تب. باید در کلاس‌های فرزند پیاده‌سازی شود."""
@@ -132,48 +183,25 @@ class MainTab(BaseTab):
     def save_reading(self):
         """ذخیره اطلاعات خوانش قند خون در پایگاه داده"""
         try:
-            jalali_date_str = self.date_entry.get_date().strftime("%Y/%m/%d")
-            time_str = self.time_var.get()
-            glucose_level = self.glucose_var.get()
-            description = self.desc_entry.get()
-            meal_status = self.meal_status_var.get()
-            mood = self.mood_var.get()
-            stress_level = self.stress_var.get()
-            exercise_minutes = self.exercise_var.get()
-            sleep_hours = self.sleep_var.get()
-
-            if not validate_persian_date(jalali_date_str):
-                show_message(self.frame, title="خطا", message="فرمت تاریخ نامعتبر است. (مثال: 1402/01/15)", message_type="error")
-                return
-            
-            if not validate_persian_time(time_str):
-                show_message(self.frame, title="خطا", message="فرمت زمان نامعتبر است. (مثال: 14:30)", message_type="error")
+            # DateEntry تاریخ میلادی برمی‌گرداند؛ تاریخ شمسی در طرح‌واره محاسبه می‌شود
+            gregorian_date_str = self.date_entry.get_date().strftime("%Y-%m-%d")
+            reading, errors = READING_SCHEMA.normalize({
+                'gregorian_date': gregorian_date_str,
+                'time': self.time_var.get(),
+                'glucose_level': self.glucose_entry.get(),
+                'description': self.desc_entry.get(),
+                'meal_status': self.meal_status_var.get(),
+                'mood': self.mood_var.get(),
+                'stress_level': self.stress_spinbox.get(),
+                'exercise_minutes': self.exercise_entry.get(),
+                'sleep_hours': self.sleep_entry.get(),
+            })
+            if errors:
+                show_message(self.frame, title="خطا", message="\n".join(errors), message_type="error")
                 return
 
-            if not (0 < glucose_level < 1000): # اعتبارسنجی ساده برای سطح قند
-                show_message(self.frame, title="خطا", message="سطح قند خون نامعتبر است.", message_type="error")
-                return
-            
-            # تبدیل تاریخ شمسی به میلادی برای ذخیره در دیتابیس
-            # DateEntry به طور پیش‌فرض تاریخ میلادی برمی‌گرداند، پس نیازی به تبدیل دستی نیست اگر از get_date() استفاده شود.
-            gregorian_date_obj = self.date_entry.get_date()
-            gregorian_date_str = gregorian_date_obj.strftime("%Y-%m-%d")
-
-            reading = Reading(
-                user_id=1, # در آینده باید از کاربر فعلی گرفته شود
-                gregorian_date=gregorian_date_str,
-                jalali_date=jalali_date_str,
-                time=time_str,
-                glucose_level=glucose_level,
-                description=description,
-                meal_status=meal_status,
-                mood=mood,
-                stress_level=stress_level,
-                exercise_minutes=exercise_minutes,
-                sleep_hours=sleep_hours
-            )
-            
-            self.db_manager.insert_reading(reading)
+            jalali_date_str, time_str = reading['jalali_date'], reading['time']
+            self.db_manager.insert_reading(user_id=1, **reading) # در آینده باید از کاربر فعلی گرفته شود
             show_message(self.frame, title="موفقیت", message="اطلاعات با موفقیت ذخیره شد.", message_type="info")
             self.status_label.config(text=f"آخرین رکورد در {jalali_date_str} - {time_str} ذخیره شد.")
             self.clear_entries()
@@ -207,6 +235,9 @@ class MainTab(BaseTab):
 
 class ReportTab(BaseTab):
     """تب گزارش‌ها"""
+    CHANGE_TABLES = ('readings',)
+    ALL_STATUSES = "همه"
+
     def create_widgets(self):
         """ایجاد ویجت‌های تب گزارش‌ها"""
         # فریم اصلی برای محتوا
@@ -227,9 +258,18 @@ class ReportTab(BaseTab):
         self.end_date_entry.pack(side=tk.RIGHT, padx=5)
         self.end_date_entry.set_date(datetime.now()) # پیش‌فرض: امروز
 
+        ttk.Label(filter_frame, text="وضعیت:", style='TLabel').pack(side=tk.RIGHT, padx=5)
+        self.status_filter_var = tk.StringVar(value=self.ALL_STATUSES)
+        self.status_filter_combo = ttk.Combobox(filter_frame, textvariable=self.status_filter_var, values=(self.ALL_STATUSES,) + GLUCOSE_CLASSES, state="readonly", style='TCombobox', width=12)
+        self.status_filter_combo.pack(side=tk.RIGHT, padx=5)
+
         filter_button = ttk.Button(filter_frame, text="اعمال فیلتر", command=self.load_report_data, style='TButton')
         filter_button.pack(side=tk.RIGHT, padx=10)
 
+        # خلاصه تجمیعی (محاسبه‌شده در خود پرس‌وجو)
+        self.summary_label = ttk.Label(content_frame, text="", style='TLabel', anchor=tk.E, justify=tk.RIGHT)
+        self.summary_label.pack(fill=tk.X, pady=5)
+
         # Treeview برای نمایش گزارش
         self.report_tree = ttk.Treeview(content_frame, style='Treeview')
         self.report_tree.pack(fill=tk.BOTH, expand=True, pady=10)
@@ -248,56 +288,105 @@ class ReportTab(BaseTab):
         self.report_tree.configure(yscrollcommand=scrollbar.set)
         scrollbar.pack(side=tk.LEFT, fill=tk.Y)
 
+        # کلیدهای مرتب‌سازی سطرهای نمایش داده‌شده (صعودی) برای درج تدریجی
+        self._report_keys = []
+        self._report_filter = None
+
         # بارگذاری اولیه داده‌ها
         self.load_report_data()
 
+    def _insert_report_row(self, row):
+        """درج سطر در جایگاه مرتب خود (تاریخ و زمان نزولی) با شناسه خوانش به عنوان iid"""
+        key = (row[2], row[3], row[0])
+        position = bisect_left(self._report_keys, key)
+        self._report_keys.insert(position, key)
+        # ترتیب ستون‌های fetch_report پس از id با REPORT_TAB_COLUMNS یکسان است
+        self.report_tree.insert("", len(self._report_keys) - 1 - position, iid=str(row[0]), values=row[1:])
+
+    def _remove_report_row(self, reading_id):
+        """حذف سطر خوانش از Treeview در صورت نمایش"""
+        iid = str(reading_id)
+        if not self.report_tree.exists(iid):
+            return
+        gregorian_date, time_str = self.report_tree.item(iid, "values")[1:3]
+        key = (gregorian_date, time_str, reading_id)
+        position = bisect_left(self._report_keys, key)
+        if position < len(self._report_keys) and self._report_keys[position] == key:
+            del self._report_keys[position]
+        self.report_tree.delete(iid)
+
+    def apply_change(self, event):
+        """اعمال تغییر یک خوانش بدون بارگذاری مجدد کل گزارش"""
+        if event.is_bulk or self._report_filter is None:
+            self.load_report_data()
+            return
+        if event.action != 'insert':
+            self._remove_report_row(event.row_id)
+        if event.action != 'delete':
+            # فیلتر تاریخ و وضعیت برای همین یک سطر در پایگاه داده اعمال می‌شود
+            for row in self.db_manager.fetch_report(*self._report_filter, reading_id=event.row_id):
+                self._insert_report_row(row)
+        self.load_report_summary()
+
+    @timed(UI_TAB_LOAD_SECONDS, method='load_report_summary')
+    def load_report_summary(self):
+        """نمایش تعداد و میانگین خوانش‌ها به تفکیک ماه شمسی و وضعیت"""
+        start_date_str, end_date_str = self._report_filter[:2]
+        lines = [
+            f"{month} - {status}: {count} خوانش، میانگین {avg}"
+            for month, status, count, avg, _, _ in self.db_manager.fetch_report_summary(start_date_str, end_date_str)
+        ]
+        self.summary_label.config(text="\n".join(lines))
+
+    @timed(UI_TAB_LOAD_SECONDS, method='load_report_data')
     def load_report_data(self):
-        """بارگذاری و نمایش داده‌های گزارش بر اساس فیلتر تاریخ"""
-        try:
-            start_date_obj = self.start_date_entry.get_date()
-            end_date_obj = self.end_date_entry.get_date()
+        """بارگذاری و نمایش داده‌های گزارش بر اساس فیلتر تاریخ و وضعیت"""
+        with timed_event('report.load', user_id=1) as event:
+            try:
+                start_date_obj = self.start_date_entry.get_date()
+                end_date_obj = self.end_date_entry.get_date()
 
-            if not start_date_obj or not end_date_obj:
-                show_message(self.frame, title="توجه", message="لطفا تاریخ شروع و پایان را انتخاب کنید.", message_type="warning")
-                return
+                if not start_date_obj or not end_date_obj:
+                    show_message(self.frame, title="توجه", message="لطفا تاریخ شروع و پایان را انتخاب کنید.", message_type="warning")
+                    return
 
-            start_date_str = start_date_obj.strftime("%Y-%m-%d")
-            end_date_str = end_date_obj.strftime("%Y-%m-%d")
+                start_date_str = start_date_obj.strftime("%Y-%m-%d")
+                end_date_str = end_date_obj.strftime("%Y-%m-%d")
 
-            if start_date_obj > end_date_obj:
-                show_message(self.frame, title="خطا", message="تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد.", message_type="error")
-                return
+                if start_date_obj > end_date_obj:
+                    show_message(self.frame, title="خطا", message="تاریخ شروع نمی‌تواند بعد از تاریخ پایان باشد.", message_type="error")
+                    return
 
-            # پاک کردن داده‌های قبلی
-            for item in self.report_tree.get_children():
-                self.report_tree.delete(item)
+                status = self.status_filter_var.get()
+                if status == self.ALL_STATUSES:
+                    status = None
+
+                # پاک کردن داده‌های قبلی
+                self.report_tree.delete(*self.report_tree.get_children())
+                self._report_keys = []
+                self._report_filter = (start_date_str, end_date_str, 1, None, status)
+                self.load_report_summary()
             
-            readings = self.db_manager.fetch_readings_by_date_range(start_date_str, end_date_str)
+                # تبدیل تاریخ شمسی، تعیین وضعیت و فیلتر در خود SQLite انجام می‌شود
+                readings = self.db_manager.fetch_report(*self._report_filter)
+                event['rows'] = len(readings)
             
-            if not readings:
-                show_message(self.frame, title="اطلاعات", message="هیچ داده‌ای برای محدوده تاریخ انتخاب شده یافت نشد.", message_type="info")
-                return
+                if not readings:
+                    show_message(self.frame, title="اطلاعات", message="هیچ داده‌ای برای محدوده تاریخ انتخاب شده یافت نشد.", message_type="info")
+                    return
 
-            for reading_obj in readings:
-                # تبدیل reading_obj (که یک شی Reading است) به یک تاپل از مقادیر برای Treeview
-                # ترتیب مقادیر باید با ترتیب ستون‌ها در self.config['REPORT_TAB_COLUMNS'] مطابقت داشته باشد
-                values = (
-                    reading_obj.jalali_date,
-                    reading_obj.time,
-                    reading_obj.glucose_level,
-                    get_glucose_status(reading_obj.glucose_level, self.config['GLUCOSE_LEVELS'])['status'],
-                    reading_obj.meal_status,
-                    reading_obj.mood,
-                    reading_obj.stress_level,
-                    reading_obj.exercise_minutes,
-                    reading_obj.sleep_hours,
-                    reading_obj.description
-                )
-                self.report_tree.insert("", tk.END, values=values)
+                # سطرها به ترتیب نزولی تاریخ و زمان برگردانده می‌شوند
+                for row in readings:
+                    self.report_tree.insert("", tk.END, iid=str(row[0]), values=row[1:])
+                self._report_keys = sorted((row[2], row[3], row[0]) for row in readings)
 
-        except Exception as e:
-            show_message(self.frame, title="خطا", message=f"خطایی در بارگذاری گزارش رخ داد: {e}", message_type="error")
-            logging.error(f"خطا در بارگذاری گزارش: {e}", exc_info=True)
+                cache = get_date_cache_stats()['gregorian_to_jalali_display']
+                logger.debug(f"حافظه نهان تاریخ شمسی: {cache['size']} تاریخ، نرخ برخورد {cache['hit_rate']:.1%}")
+
+            except Exception as e:
+                show_message(self.frame, title="خطا", message=f"خطایی در بارگذاری گزارش رخ داد: {e}", message_type="error")
+                logging.error(f"خطا در بارگذاری گزارش: {e}", exc_info=True)
+                event['outcome'] = 'error'
 
     def refresh_data(self):
         """بارگذاری مجدد داده‌های گزارش"""
@@ -305,6 +394,9 @@ class ReportTab(BaseTab):
 
 class ChartTab(BaseTab):
     """تب نمودارها"""
+    CHANGE_TABLES = ('readings',)
+    CONFIG_SECTIONS = ('UI',)
+
     def create_widgets(self):
         """ایجاد ویجت‌های تب نمودارها"""
         # فریم اصلی برای محتوا
@@ -340,23 +432,14 @@ class ChartTab(BaseTab):
         self.chart_frame.pack(fill=tk.BOTH, expand=True, pady=10)
 
         self.fig, self.ax = plt.subplots(figsize=self.config.get('CHART_SIZE', (8, 4)), dpi=self.config.get('CHART_DPI', 100))
-        self.fig.patch.set_facecolor(self.colors['bg'])
-        self.ax.set_facecolor(self.colors['bg'])
-        self.ax.tick_params(colors=self.colors['fg'], which='both')
-        self.ax.spines['bottom'].set_color(self.colors['fg'])
-        self.ax.spines['top'].set_color(self.colors['fg'])
-        self.ax.spines['left'].set_color(self.colors['fg'])
-        self.ax.spines['right'].set_color(self.colors['fg'])
-        self.ax.xaxis.label.set_color(self.colors['fg'])
-        self.ax.yaxis.label.set_color(self.colors['fg'])
-        self.ax.title.set_color(self.colors['fg'])
+        self.style_axes()
 
-        self.canvas = FigureCanvasTkAgg(self.fig, master=self.chart_frame)
+        self.canvas = backend_tkagg.FigureCanvasTkAgg(self.fig, master=self.chart_frame)
         self.canvas_widget = self.canvas.get_tk_widget()
         self.canvas_widget.pack(fill=tk.BOTH, expand=True)
         self.canvas.draw()
 
-        self.toolbar = NavigationToolbar2Tk(self.canvas, self.chart_frame, pack_toolbar=False)
+        self.toolbar = backend_tkagg.NavigationToolbar2Tk(self.canvas, self.chart_frame, pack_toolbar=False)
         self.toolbar.update()
         self.toolbar.pack(side=tk.BOTTOM, fill=tk.X)
         # تغییر رنگ دکمه‌های تولبار
@@ -372,6 +455,30 @@ class ChartTab(BaseTab):
 
         self.plot_chart() # بارگذاری اولیه نمودار
 
+    def style_axes(self):
+        """اعمال رنگ‌های self.colors روی شکل و محورهای نمودار"""
+        self.fig.patch.set_facecolor(self.colors['bg'])
+        self.ax.set_facecolor(self.colors['bg'])
+        self.ax.tick_params(colors=self.colors['fg'], which='both')
+        self.ax.spines['bottom'].set_color(self.colors['fg'])
+        self.ax.spines['top'].set_color(self.colors['fg'])
+        self.ax.spines['left'].set_color(self.colors['fg'])
+        self.ax.spines['right'].set_color(self.colors['fg'])
+        self.ax.xaxis.label.set_color(self.colors['fg'])
+        self.ax.yaxis.label.set_color(self.colors['fg'])
+        self.ax.title.set_color(self.colors['fg'])
+
+    def apply_config(self, changes):
+        """تغییر رنگ‌ها روی نمودار فعلی اعمال می‌شود؛ داده‌ها دوباره خوانده نمی‌شوند"""
+        colors = (changes.get('UI') or {}).get('colors')
+        if not colors:
+            return
+        # به‌روزرسانی درجا تا سایر دارندگان همین دیکشنری هم رنگ‌های جدید را ببینند
+        self.colors.update(colors)
+        self.style_axes()
+        self.canvas.draw_idle()
+
+    @timed(UI_TAB_LOAD_SECONDS, method='load_chart_data')
     def load_chart_data(self):
         """بارگذاری داده‌ها برای نمودار بر اساس فیلتر تاریخ"""
         try:
@@ -406,20 +513,16 @@ class ChartTab(BaseTab):
             self.canvas.draw()
             return
 
-        dates = []
-        glucose_levels = []
-        for r_obj in readings:
-            try:
-                # ترکیب تاریخ و زمان برای رسم دقیق‌تر روی محور زمان
-                datetime_str = f"{r_obj.date} {r_obj.time}"
-                dt_obj = datetime.strptime(datetime_str, "%Y-%m-%d %H:%M")
-                dates.append(dt_obj)
-                glucose_levels.append(r_obj.glucose_level)
-            except ValueError as ve:
-                logging.warning(f"خطا در تبدیل تاریخ/زمان برای نمودار: {r_obj.date} {r_obj.time} - {ve}")
-                continue # از این داده صرف نظر کن
+        # ترکیب تاریخ و زمان برای رسم دقیق‌تر روی محور زمان (تجزیه ستونی بدون strptime)
+        raw_dates = [r_obj.date for r_obj in readings]
+        raw_times = [r_obj.time for r_obj in readings]
+        parsed, valid = parse_datetime_columns(raw_dates, raw_times)
+        if not valid.all():
+            logging.warning(f"{int((~valid).sum())} خوانش با تاریخ/زمان نامعتبر از نمودار کنار گذاشته شد")
+        dates = parsed[valid]
+        glucose_levels = [r_obj.glucose_level for r_obj, ok in zip(readings, valid) if ok]
         
-        if not dates or not glucose_levels:
+        if not len(dates) or not glucose_levels:
             self.ax.text(0.5, 0.5, "داده معتبری برای نمایش وجود ندارد", ha='center', va='center', color=self.colors['fg'], fontproperties=get_font(self.fonts['large']['family'], self.fonts['large']['size']))
             self.canvas.draw()
             return
@@ -435,7 +538,10 @@ class ChartTab(BaseTab):
             # برای نمودار میله‌ای، ممکن است نیاز به پردازش بیشتری روی تاریخ‌ها باشد
             # اینجا یک نمایش ساده ارائه می‌شود.
             # تبدیل تاریخ‌ها به رشته برای برچسب‌های محور x
-            str_dates = [d.strftime('%y/%m/%d\n%H:%M') for d in dates]
+            str_dates = [
+                f"{gregorian_to_jalali_display(date_str[:10])}\n{time_str[:5]}"
+                for date_str, time_str, ok in zip(raw_dates, raw_times, valid) if ok
+            ]
             self.ax.bar(str_dates, glucose_levels, color=chart_color, width=0.5)
             self.ax.tick_params(axis='x', rotation=45, labelsize=self.fonts['small']['size']-2)
         else:
@@ -463,7 +569,7 @@ class AITab(BaseTab):
     def __init__(self, parent, db_manager, ai_analyzer, config, colors, fonts):
         self.ai_analyzer = ai_analyzer # آبجکت تحلیلگر هوش مصنوعی
         self.fonts = fonts # اضافه کردن فونت‌ها
-        super().__init__(parent, db_manager, config, colors)
+        super().__init__(parent, db_manager, config, colors, fonts)
 
     def create_widgets(self):
         """ایجاد ویجت‌های تب هوش مصنوعی"""
@@ -547,6 +653,7 @@ class AITab(BaseTab):
             self.results_text.insert(tk.END, f"خطا در اجرای تحلیل: {e}\n", 'error')
             self.results_text.config(state=tk.DISABLED)
 
+    @timed(UI_TAB_LOAD_SECONDS, method='load_recent_predictions')
     def load_recent_predictions(self):
         """بارگذاری و نمایش پیش‌بینی‌های اخیر از دیتابیس"""
         try:
@@ -561,10 +668,7 @@ class AITab(BaseTab):
             if recent_preds:
                 self.results_text.insert(tk.END, "پیش‌بینی‌های اخیر:\n", 'info')
                 for pred in recent_preds:
-                    try:
-                        pred_time_jalali = convert_to_jalali(pred.prediction_time, date_format="%Y-%m-%d %H:%M:%S").strftime("%Y/%m/%d ساعت %H:%M")
-                    except ValueError:
-                        pred_time_jalali = pred.prediction_time # اگر تبدیل ناموفق بود، همان تاریخ میلادی را نمایش بده
+                    pred_time_jalali = format_jalali_timestamp(pred.prediction_time)
                     pred_info = f"- در تاریخ {pred_time_jalali}: {pred.predicted_value} mg/dL (اطمینان: {pred.confidence_score*100:.1f}%) - مدل: {pred.model_version}\n"
                     self.results_text.insert(tk.END, pred_info, 'normal_text')
             else:
@@ -583,9 +687,11 @@ class AITab(BaseTab):
 
 class UserSettingsTab(BaseTab):
     """تب تنظیمات کاربر"""
+    CHANGE_TABLES = ('users',)
+
     def __init__(self, parent, db_manager, config, colors, fonts):
         self.fonts = fonts
-        super().__init__(parent, db_manager, config, colors)
+        super().__init__(parent, db_manager, config, colors, fonts)
 
     def create_widgets(self):
         """ایجاد ویجت‌های تب تنظیمات کاربر"""
@@ -637,6 +743,7 @@ class UserSettingsTab(BaseTab):
 
         self.load_settings()
 
+    @timed(UI_TAB_LOAD_SECONDS, method='load_settings')
     def load_settings(self):
         """بارگذاری تنظیمات فعلی کاربر"""
         try:
@@ -691,12 +798,13 @@ class UserSettingsTab(BaseTab):
 
             self.db_manager.save_user_settings(username, age, gender, min_glucose, max_glucose)
             show_message(self.frame, title="موفقیت", message="تنظیمات با موفقیت ذخیره شد.", message_type="info")
-            # به‌روزرسانی مقادیر در config برای استفاده فوری در برنامه
-            self.config['DEFAULT_USERNAME'] = username
-            self.config['DEFAULT_AGE'] = age
-            self.config['DEFAULT_GENDER'] = gender
-            self.config['GLUCOSE_LEVELS']['NORMAL_MIN'] = min_glucose
-            self.config['GLUCOSE_LEVELS']['NORMAL_MAX'] = max_glucose
+            # به‌روزرسانی مقادیر در config برای استفاده فوری در برنامه (با یک بار ذخیره)
+            with self.config.batch():
+                self.config['DEFAULT_USERNAME'] = username
+                self.config['DEFAULT_AGE'] = age
+                self.config['DEFAULT_GENDER'] = gender
+                self.config['GLUCOSE_LEVELS.NORMAL_MIN'] = min_glucose
+                self.config['GLUCOSE_LEVELS.NORMAL_MAX'] = max_glucose
 
         except ValueError:
             show_message(self.frame, title="خطا", message="لطفاً سن و مقادیر قند خون را به صورت عددی وارد کنید.", message_type="error")
@@ -710,9 +818,11 @@ class UserSettingsTab(BaseTab):
 
 class ReminderTab(BaseTab):
     """تب یادآوری‌ها"""
+    CHANGE_TABLES = ('reminders',)
+
     def __init__(self, parent, db_manager, config, colors, fonts):
         self.fonts = fonts # اضافه کردن فونت‌ها
-        super().__init__(parent, db_manager, config, colors)
+        super().__init__(parent, db_manager, config, colors, fonts)
         self.selected_reminder_id = None # برای ویرایش و حذف
 
     def create_widgets(self):
@@ -832,7 +942,7 @@ class ReminderTab(BaseTab):
                 show_message(self.frame, title="موفقیت", message="یادآوری با موفقیت اضافه شد.", message_type="info")
             
             self.clear_reminder_form()
-            self.load_reminders()
+            self._reload_after_write()
         except Exception as e:
             show_message(self.frame, title="خطا", message=f"خطایی در ذخیره یادآوری رخ داد: {e}", message_type="error")
             logging.error(f"خطا در ذخیره یادآوری: {e}", exc_info=True)
@@ -851,6 +961,7 @@ class ReminderTab(BaseTab):
         self.toggle_active_button.config(state=tk.DISABLED)
         self.reminders_tree.selection_remove(self.reminders_tree.selection()) # پاک کردن انتخاب از Treeview
 
+    @timed(UI_TAB_LOAD_SECONDS, method='load_reminders')
     def load_reminders(self):
         """بارگذاری و نمایش لیست یادآوری‌ها از دیتابیس"""
         for item in self.reminders_tree.get_children():
@@ -859,10 +970,7 @@ class ReminderTab(BaseTab):
         try:
             reminders = self.db_manager.fetch_all_reminders()
             for reminder in reminders:
-                try:
-                    reminder_time_jalali = convert_to_jalali(reminder.reminder_time, date_format="%Y-%m-%d %H:%M:%S").strftime("%Y/%m/%d ساعت %H:%M")
-                except ValueError:
-                     reminder_time_jalali = reminder.reminder_time # اگر تبدیل ناموفق بود
+                reminder_time_jalali = format_jalali_timestamp(reminder.reminder_time)
                 
                 active_status = "فعال" if reminder.is_active else "غیرفعال"
                 self.reminders_tree.insert("", tk.END, values=(
@@ -898,7 +1006,10 @@ class ReminderTab(BaseTab):
             # جدا کردن تاریخ از زمان
             jalali_date_str = jalali_datetime_str.split(' ')[0]
             # تبدیل به میلادی
-            gregorian_date = convert_jalali_to_gregorian(jalali_date_str, date_format_jalali="%Y/%m/%d")
+            gregorian_date_str = jalali_to_gregorian(jalali_date_str.replace('/', '-'))
+            if gregorian_date_str is None:
+                raise ValueError(f"تاریخ شمسی نامعتبر: {jalali_date_str}")
+            gregorian_date = datetime.strptime(gregorian_date_str, "%Y-%m-%d").date()
             self.reminder_date_entry.set_date(gregorian_date)
             # استخراج زمان
             time_str = jalali_datetime_str.split('ساعت ')[1]
@@ -931,7 +1042,7 @@ class ReminderTab(BaseTab):
                 self.db_manager.delete_reminder(self.selected_reminder_id)
                 show_message(self.frame, title="موفقیت", message="یادآوری با موفقیت حذف شد.", message_type="info")
                 self.clear_reminder_form()
-                self.load_reminders()
+                self._reload_after_write()
             except Exception as e:
                 show_message(self.frame, title="خطا", message=f"خطایی در حذف یادآوری رخ داد: {e}", message_type="error")
                 logging.error(f"خطا در حذف یادآوری: {e}", exc_info=True)
@@ -952,7 +1063,7 @@ class ReminderTab(BaseTab):
             self.db_manager.update_reminder_status(self.selected_reminder_id, new_status)
             status_text = "فعال" if new_status else "غیرفعال"
             show_message(self.frame, title="موفقیت", message=f"وضعیت یادآوری به '{status_text}' تغییر یافت.", message_type="info")
-            self.load_reminders()
+            self._reload_after_write()
             # فرم را پاک نمی‌کنیم تا کاربر بتواند ویرایش‌های دیگر را ادامه دهد یا انتخاب را حفظ کند
             # اما دکمه‌ها را به‌روز می‌کنیم
             selected_items = self.reminders_tree.selection()
@@ -965,6 +1076,16 @@ class ReminderTab(BaseTab):
             show_message(self.frame, title="خطا", message=f"خطایی در تغییر وضعیت یادآوری رخ داد: {e}", message_type="error")
             logging.error(f"خطا در تغییر وضعیت یادآوری: {e}", exc_info=True)
 
+    def apply_change(self, event):
+        """بارگذاری مجدد فهرست یادآوری‌ها بدون پاک کردن فرم (فهرست کوتاه است)"""
+        self.load_reminders()
+
+    def _reload_after_write(self):
+        """بارگذاری مجدد فهرست پس از نوشتن، اگر مدیر پایگاه داده رویداد تغییر منتشر نمی‌کند"""
+        # با اشتراک فعال، رویداد تغییر همین کار را از طریق apply_change انجام می‌دهد
+        if self.change_subscription is None:
+            self.load_reminders()
+
     def refresh_data(self):
         """بارگذاری مجدد داده‌های تب یادآوری‌ها"""
         self.clear_reminder_form()
@@ -9,7 +9,19 @@ from .date_utils import (
     validate_jalali_date,
     validate_time,
     get_date_range,
-    format_datetime
+    format_datetime,
+    gregorian_to_jalali_ymd,
+    jalali_to_gregorian_ymd,
+    gregorian_ordinals_to_jalali,
+    jalali_to_gregorian_ordinals,
+    date_strings_to_ordinals,
+    gregorian_dates_to_jalali,
+    jalali_dates_to_gregorian,
+    format_datetimes,
+    parse_datetime_columns,
+    gregorian_to_jalali_display,
+    get_date_cache_stats,
+    clear_date_caches
 )
 
 from .validation import (
@@ -24,11 +36,26 @@ from .validation import (
     validate_mood,
     validate_stress_level,
     validate_exercise_minutes,
-    validate_sleep_hours
+    validate_sleep_hours,
+    validate_reading_columns,
+    BatchValidationResult
+)
+
+from .reading_schema import (
+    FieldSpec,
+    CompiledReadingSchema,
+    READING_FIELDS,
+    READING_SCHEMA
 )
 
 from .logging import (
     setup_logging,
+    shutdown_logging,
+    parse_module_levels,
+    JsonFormatter,
+    EVENT_SAMPLE_RATES,
+    log_event,
+    timed_event,
     get_logger,
     log_error,
     log_info,
@@ -37,6 +64,42 @@ from .logging import (
     log_critical
 )
 
+from .metrics import (
+    MetricsRegistry,
+    Counter,
+    Gauge,
+    Histogram,
+    REGISTRY,
+    LATENCY_BUCKETS,
+    counter,
+    gauge,
+    histogram,
+    timed,
+    time_block,
+    get_metrics_snapshot,
+    render_prometheus,
+    write_textfile
+)
+
+from .metrics_exporter import (
+    MetricsExporter,
+    register_runtime_gauges,
+    start_metrics_exporter
+)
+
+from .profiling import (
+    Profiler,
+    PROFILE_MODES,
+    start_profiling
+)
+
+from .startup import (
+    StartupTimer,
+    StagedStartup,
+    STARTUP,
+    STARTUP_REPORT_ENV
+)
+
 __all__ = [
     # date_utils
     'get_current_datetime',
@@ -46,6 +109,18 @@ __all__ = [
     'validate_time',
     'get_date_range',
     'format_datetime',
+    'gregorian_to_jalali_ymd',
+    'jalali_to_gregorian_ymd',
+    'gregorian_ordinals_to_jalali',
+    'jalali_to_gregorian_ordinals',
+    'date_strings_to_ordinals',
+    'gregorian_dates_to_jalali',
+    'jalali_dates_to_gregorian',
+    'format_datetimes',
+    'parse_datetime_columns',
+    'gregorian_to_jalali_display',
+    'get_date_cache_stats',
+    'clear_date_caches',
     
     # validation
     'validate_glucose_level',
@@ -60,13 +135,59 @@ __all__ = [
     'validate_stress_level',
     'validate_exercise_minutes',
     'validate_sleep_hours',
+    'validate_reading_columns',
+    'BatchValidationResult',
+    
+    # reading_schema
+    'FieldSpec',
+    'CompiledReadingSchema',
+    'READING_FIELDS',
+    'READING_SCHEMA',
     
     # logging
     'setup_logging',
+    'shutdown_logging',
+    'parse_module_levels',
+    'JsonFormatter',
+    'EVENT_SAMPLE_RATES',
+    'log_event',
+    'timed_event',
     'get_logger',
     'log_error',
     'log_info',
     'log_warning',
     'log_debug',
-    'log_critical'
+    'log_critical',
+    
+    # metrics
+    'MetricsRegistry',
+    'Counter',
+    'Gauge',
+    'Histogram',
+    'REGISTRY',
+    'LATENCY_BUCKETS',
+    'counter',
+    'gauge',
+    'histogram',
+    'timed',
+    'time_block',
+    'get_metrics_snapshot',
+    'render_prometheus',
+    'write_textfile',
+    
+    # metrics_exporter
+    'MetricsExporter',
+    'register_runtime_gauges',
+    'start_metrics_exporter',
+    
+    # profiling
+    'Profiler',
+    'PROFILE_MODES',
+    'start_profiling',
+    
+    # startup
+    'StartupTimer',
+    'StagedStartup',
+    'STARTUP',
+    'STARTUP_REPORT_ENV'
 ] 
\ No newline at end of file
@@ -5,9 +5,20 @@
 توابع کمکی برای کار با تاریخ و زمان
 """
 
+from __future__ import annotations
+
 import jdatetime
 from datetime import datetime, timedelta
-from typing import Tuple, Optional
+from functools import lru_cache
+from typing import Tuple, Optional, Dict
+
+from .lazy import lazy_import
+
+# NumPy فقط در توابع برداری لازم است و در اولین فراخوانی آن‌ها بارگذاری می‌شود
+np = lazy_import('numpy')
+
+# ظرفیت هر حافظه نهان تبدیل تاریخ (چند صد تاریخ یکتا در سال)
+DATE_CACHE_SIZE = 4096
 
 def get_current_datetime() -> Tuple[str, str, str]:
     """
@@ -25,6 +36,7 @@ def get_current_datetime() -> Tuple[str, str, str]:
     
     return gregorian_date, jalali_date, time
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def jalali_to_gregorian(jalali_date: str) -> Optional[str]:
     """
     تبدیل تاریخ شمسی به میلادی
@@ -43,6 +55,7 @@ def jalali_to_gregorian(jalali_date: str) -> Optional[str]:
     except Exception:
         return None
 
+@lru_cache(maxsize=DATE_CACHE_SIZE)
 def gregorian_to_jalali(gregorian_date: str) -> Optional[str]:
     """
     تبدیل تاریخ میلادی به شمسی
@@ -56,7 +69,7 @@ def gregorian_to_jalali(gregorian_date: str) -> Optional[str]:
     try:
         year, month, day = map(int, gregorian_date.split('-'))
         gregorian = datetime(year, month, day)
-        jalali = jdatetime.date.fromgregorian(datetime=gregorian)
+        jalali = jdatetime.date.fromgregorian(date=gregorian.date())
         return jalali.strftime("%Y-%m-%d")
     except Exception:
         return None
@@ -122,9 +135,359 @@ def format_datetime(gregorian_date: str, time: str) -> str:
     Returns:
         str: رشته فرمت‌شده تاریخ و زمان
     """
+    jalali = gregorian_to_jalali_display(gregorian_date)
+    return f"{jalali or gregorian_date} {time}"
+
+# مجموع روزهای ماه‌های میلادی پیش از هر ماه (سال غیرکبیسه)
+_GREGORIAN_DAYS_BEFORE_MONTH = (0, 31, 59, 90, 120, 151, 181, 212, 243, 273, 304, 334)
+
+def gregorian_to_jalali_ymd(gy: int, gm: int, gd: int) -> Tuple[int, int, int]:
+    """
+    تبدیل حسابی تاریخ میلادی به شمسی (بدون jdatetime)
+    
+    Args:
+        gy (int): سال میلادی
+        gm (int): ماه میلادی
+        gd (int): روز میلادی
+        
+    Returns:
+        Tuple[int, int, int]: (سال، ماه، روز) شمسی
+    """
+    gy2 = gy + 1 if gm > 2 else gy
+    days = (355666 + 365 * gy + (gy2 + 3) // 4 - (gy2 + 99) // 100 + (gy2 + 399) // 400
+            + gd + _GREGORIAN_DAYS_BEFORE_MONTH[gm - 1])
+    jy = -1595 + 33 * (days // 12053)
+    days %= 12053
+    jy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        jy += (days - 1) // 365
+        days = (days - 1) % 365
+    if days < 186:
+        return jy, 1 + days // 31, 1 + days % 31
+    return jy, 7 + (days - 186) // 30, 1 + (days - 186) % 30
+
+def jalali_to_gregorian_ymd(jy: int, jm: int, jd: int) -> Tuple[int, int, int]:
+    """
+    تبدیل حسابی تاریخ شمسی به میلادی (بدون jdatetime)
+    
+    Args:
+        jy (int): سال شمسی
+        jm (int): ماه شمسی
+        jd (int): روز شمسی
+        
+    Returns:
+        Tuple[int, int, int]: (سال، ماه، روز) میلادی
+    """
+    jy += 1595
+    days = (-355668 + 365 * jy + (jy // 33) * 8 + ((jy % 33) + 3) // 4 + jd
+            + ((jm - 1) * 31 if jm < 7 else (jm - 7) * 30 + 186))
+    gy = 400 * (days // 146097)
+    days %= 146097
+    if days > 36524:
+        days -= 1
+        gy += 100 * (days // 36524)
+        days %= 36524
+        if days >= 365:
+            days += 1
+    gy += 4 * (days // 1461)
+    days %= 1461
+    if days > 365:
+        gy += (days - 1) // 365
+        days = (days - 1) % 365
+    gd = days + 1
+    leap = (gy % 4 == 0 and gy % 100 != 0) or gy % 400 == 0
+    for gm, month_days in enumerate((31, 29 if leap else 28, 31, 30, 31, 30, 31, 31, 30, 31, 30, 31), 1):
+        if gd <= month_days:
+            break
+        gd -= month_days
+    return gy, gm, gd
+
+def jalali_day_of_year(jm: int, jd: int) -> int:
+    """شماره روز در سال شمسی (1 تا 366)"""
+    return (jm - 1) * 31 + jd if jm <= 6 else 186 + (jm - 7) * 30 + jd
+
+def date_to_ordinal(date_str: str) -> Optional[int]:
+    """
+    تبدیل رشته تاریخ شمسی یا میلادی به شماره روز میلادی (date.toordinal)
+    
+    سال‌های کمتر از 1700 شمسی در نظر گرفته می‌شوند؛ جداکننده می‌تواند - یا / باشد.
+    
+    Args:
+        date_str (str): تاریخ به فرمت YYYY-MM-DD یا YYYY/MM/DD
+        
+    Returns:
+        Optional[int]: شماره روز یا None در صورت خطا
+    """
+    try:
+        year, month, day = map(int, date_str[:10].replace('/', '-').split('-'))
+        if year < 1700:
+            year, month, day = jalali_to_gregorian_ymd(year, month, day)
+        return datetime(year, month, day).toordinal()
+    except Exception:
+        return None
+
+# ---------------------------------------------------------------------------
+# تبدیل برداری (آرایه‌های NumPy) بدون ساخت شیء پایتون برای هر عنصر
+# ---------------------------------------------------------------------------
+
+# شماره روز (date.toordinal) تاریخ 1970-01-01؛ مبدأ datetime64
+_EPOCH_ORDINAL = 719163
+# فاصله شمارنده روز الگوریتم حسابی شمسی با date.toordinal
+_G2J_DAY_OFFSET = 356032
+_J2G_DAY_OFFSET = -365
+
+def gregorian_ordinals_to_jalali(ordinals) -> Tuple[np.ndarray, np.ndarray, np.ndarray]:
+    """
+    تبدیل برداری شماره روزهای میلادی به تاریخ شمسی
+    
+    Args:
+        ordinals (array-like): شماره روزها (date.toordinal)
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray, np.ndarray]: آرایه‌های سال، ماه و روز شمسی
+    """
+    days = np.asarray(ordinals, dtype=np.int64) + _G2J_DAY_OFFSET
+    jy = -1595 + 33 * (days // 12053)
+    days = days % 12053
+    jy += 4 * (days // 1461)
+    days = days % 1461
+    extra = days > 365
+    jy += np.where(extra, (days - 1) // 365, 0)
+    days = np.where(extra, (days - 1) % 365, days)
+    first_half = days < 186
+    jm = np.where(first_half, 1 + days // 31, 7 + (days - 186) // 30)
+    jd = np.where(first_half, 1 + days % 31, 1 + (days - 186) % 30)
+    return jy, jm, jd
+
+def jalali_to_gregorian_ordinals(jy, jm, jd) -> np.ndarray:
+    """
+    تبدیل برداری تاریخ شمسی به شماره روزهای میلادی
+    
+    Args:
+        jy (array-like): سال‌های شمسی
+        jm (array-like): ماه‌های شمسی
+        jd (array-like): روزهای شمسی
+        
+    Returns:
+        np.ndarray: شماره روزها (date.toordinal)
+    """
+    jy = np.asarray(jy, dtype=np.int64) + 1595
+    jm = np.asarray(jm, dtype=np.int64)
+    jd = np.asarray(jd, dtype=np.int64)
+    days = (-355668 + 365 * jy + (jy // 33) * 8 + ((jy % 33) + 3) // 4 + jd
+            + np.where(jm < 7, (jm - 1) * 31, (jm - 7) * 30 + 186))
+    return days + _J2G_DAY_OFFSET
+
+def _split_date_strings(dates) -> Tuple[np.ndarray, np.ndarray, np.ndarray, np.ndarray]:
+    """
+    استخراج سال، ماه و روز از آرایه رشته‌های YYYY-MM-DD یا YYYY/MM/DD با حساب روی بایت‌ها
+    
+    Returns:
+        Tuple: (سال، ماه، روز، ماسک اعتبار)
+    """
+    try:
+        raw = np.asarray(dates, dtype='S10')
+    except UnicodeEncodeError:
+        # نویسه‌های غیر ASCII (مثلاً ارقام فارسی) نامعتبر شمرده می‌شوند
+        raw = np.char.encode(np.asarray(dates, dtype='U10'), 'ascii', 'replace').astype('S10')
+    chars = raw.view(np.uint8).reshape(len(raw), 10).astype(np.int64) - ord('0')
+    digits = chars[:, [0, 1, 2, 3, 5, 6, 8, 9]]
+    separators = chars[:, [4, 7]] + ord('0')
+    valid = (((digits >= 0) & (digits <= 9)).all(axis=1)
+             & np.isin(separators, (ord('-'), ord('/'))).all(axis=1))
+    digits = np.where(valid[:, None], digits, 0)
+    year = digits[:, 0] * 1000 + digits[:, 1] * 100 + digits[:, 2] * 10 + digits[:, 3]
+    month = digits[:, 4] * 10 + digits[:, 5]
+    day = digits[:, 6] * 10 + digits[:, 7]
+    valid &= (month >= 1) & (month <= 12) & (day >= 1) & (day <= 31)
+    return year, month, day, valid
+
+def _join_date_strings(year, month, day, sep: str) -> np.ndarray:
+    """ساخت آرایه رشته‌های YYYY{sep}MM{sep}DD از آرایه‌های عددی بدون حلقه پایتون"""
+    count = len(year)
+    chars = np.empty((count, 10), dtype=np.uint8)
+    for position, (values, divisor) in enumerate(((year, 1000), (year, 100), (year, 10), (year, 1))):
+        chars[:, position] = (values // divisor) % 10 + ord('0')
+    chars[:, 4] = chars[:, 7] = ord(sep)
+    chars[:, 5], chars[:, 6] = month // 10 + ord('0'), month % 10 + ord('0')
+    chars[:, 8], chars[:, 9] = day // 10 + ord('0'), day % 10 + ord('0')
+    return chars.view('S10').reshape(count).astype('U10')
+
+def date_strings_to_ordinals(dates) -> np.ndarray:
+    """
+    تبدیل برداری رشته‌های تاریخ میلادی YYYY-MM-DD به شماره روز
+    
+    Args:
+        dates (array-like): رشته‌های تاریخ میلادی (بخش زمان پس از 10 نویسه نادیده گرفته می‌شود)
+        
+    Returns:
+        np.ndarray: شماره روزها؛ -1 برای تاریخ نامعتبر
+    """
+    year, month, day, valid = _split_date_strings(dates)
+    months = np.where(valid, (year - 1970) * 12 + month - 1, 0).astype('datetime64[M]')
+    days = months.astype('datetime64[D]') + np.where(valid, day - 1, 0)
+    # روزهای بیش از طول ماه (مانند 02-30) نامعتبرند
+    valid &= days.astype('datetime64[M]') == months
+    return np.where(valid, days.astype(np.int64) + _EPOCH_ORDINAL, -1)
+
+def gregorian_dates_to_jalali(dates, sep: str = '/') -> np.ndarray:
+    """
+    تبدیل برداری رشته‌های تاریخ میلادی به شمسی
+    
+    Args:
+        dates (array-like): رشته‌های YYYY-MM-DD
+        sep (str): جداکننده خروجی
+        
+    Returns:
+        np.ndarray: رشته‌های شمسی؛ رشته خالی برای ورودی نامعتبر
+    """
+    ordinals = date_strings_to_ordinals(dates)
+    jy, jm, jd = gregorian_ordinals_to_jalali(np.maximum(ordinals, 1))
+    return np.where(ordinals > 0, _join_date_strings(jy, jm, jd, sep), '')
+
+def jalali_dates_to_gregorian(dates, sep: str = '-') -> np.ndarray:
+    """
+    تبدیل برداری رشته‌های تاریخ شمسی (YYYY/MM/DD یا YYYY-MM-DD) به میلادی
+    
+    Args:
+        dates (array-like): رشته‌های تاریخ شمسی
+        sep (str): جداکننده خروجی
+        
+    Returns:
+        np.ndarray: رشته‌های میلادی؛ رشته خالی برای ورودی نامعتبر
+    """
+    jy, jm, jd, valid = _split_date_strings(dates)
+    ordinals = jalali_to_gregorian_ordinals(np.where(valid, jy, 1400), np.where(valid, jm, 1), np.where(valid, jd, 1))
+    # روزهای بیش از طول ماه شمسی (مانند 1403/07/31) با تبدیل برگشتی شناسایی می‌شوند
+    check_y, check_m, check_d = gregorian_ordinals_to_jalali(ordinals)
+    valid &= (check_y == jy) & (check_m == jm) & (check_d == jd)
+    gregorian = (ordinals - _EPOCH_ORDINAL).astype('datetime64[D]')
+    year = gregorian.astype('datetime64[Y]').astype(np.int64) + 1970
+    month = gregorian.astype('datetime64[M]').astype(np.int64) % 12 + 1
+    day = (gregorian - gregorian.astype('datetime64[M]')).astype(np.int64) + 1
+    return np.where(valid, _join_date_strings(year, month, day, sep), '')
+
+def format_datetimes(gregorian_dates, times) -> np.ndarray:
+    """
+    نسخه برداری format_datetime: تاریخ شمسی YYYY/MM/DD به همراه زمان
+    
+    Args:
+        gregorian_dates (array-like): رشته‌های تاریخ میلادی
+        times (array-like): رشته‌های زمان HH:MM
+        
+    Returns:
+        np.ndarray: رشته‌های فرمت‌شده؛ تاریخ میلادی اصلی برای ورودی نامعتبر
+    """
+    gregorian_dates = np.asarray(gregorian_dates, dtype='U10')
+    jalali = gregorian_dates_to_jalali(gregorian_dates)
+    dates = np.where(jalali != '', jalali, gregorian_dates)
+    return np.char.add(np.char.add(dates, ' '), np.asarray(times, dtype='U8'))
+
+def _split_time_strings(times) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    استخراج دقیقه از آغاز روز از آرایه رشته‌های HH:MM یا H:MM (ثانیه نادیده گرفته می‌شود)
+    
+    Returns:
+        Tuple: (دقیقه‌ها، ماسک اعتبار)
+    """
+    try:
+        raw = np.asarray(times, dtype='S5')
+    except UnicodeEncodeError:
+        raw = np.char.encode(np.asarray(times, dtype='U5'), 'ascii', 'replace').astype('S5')
+    chars = raw.view(np.uint8).reshape(len(raw), 5).astype(np.int64) - ord('0')
+    colon = ord(':') - ord('0')
+    # در قالب H:MM همه نویسه‌ها یک خانه به چپ جابه‌جا شده‌اند
+    short = chars[:, 1] == colon
+    digits = np.stack([
+        np.where(short, 0, chars[:, 0]),
+        np.where(short, chars[:, 0], chars[:, 1]),
+        np.where(short, chars[:, 2], chars[:, 3]),
+        np.where(short, chars[:, 3], chars[:, 4]),
+    ], axis=1)
+    valid = ((digits >= 0) & (digits <= 9)).all(axis=1) & (np.where(short, chars[:, 1], chars[:, 2]) == colon)
+    digits = np.where(valid[:, None], digits, 0)
+    hour = digits[:, 0] * 10 + digits[:, 1]
+    minute = digits[:, 2] * 10 + digits[:, 3]
+    valid &= (hour <= 23) & (minute <= 59)
+    return hour * 60 + minute, valid
+
+def parse_datetime_columns(dates, times=None) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    تجزیه ستونی تاریخ‌های میلادی YYYY-MM-DD و زمان‌های HH:MM بدون strptime
+    
+    به جای استثنا، ماسک اعتبار برگردانده می‌شود؛ مقدار عناصر نامعتبر NaT است.
+    برای زمان یونیکس (دقیقه) از result.astype('int64') استفاده کنید.
+    
+    Args:
+        dates (array-like): رشته‌های تاریخ میلادی
+        times (Optional[array-like]): رشته‌های زمان؛ None برای آغاز روز
+        
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (آرایه datetime64[m]، ماسک اعتبار)
+    """
+    ordinals = date_strings_to_ordinals(dates)
+    valid = ordinals > 0
+    minutes = (ordinals - _EPOCH_ORDINAL) * 1440
+    if times is not None:
+        time_minutes, time_valid = _split_time_strings(times)
+        valid &= time_valid
+        minutes += time_minutes
+    result = np.where(valid, minutes, 0).astype('datetime64[m]')
+    result[~valid] = np.datetime64('NaT')
+    return result, valid
+
+# ---------------------------------------------------------------------------
+# حافظه نهان تبدیل‌های پرتکرار
+# ---------------------------------------------------------------------------
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def gregorian_to_jalali_display(gregorian_date: str) -> Optional[str]:
+    """
+    تبدیل تاریخ میلادی به شمسی نمایشی YYYY/MM/DD (با حافظه نهان)
+    
+    Args:
+        gregorian_date (str): تاریخ میلادی به فرمت YYYY-MM-DD
+        
+    Returns:
+        Optional[str]: تاریخ شمسی یا None در صورت خطا
+    """
     try:
-        date_obj = datetime.strptime(gregorian_date, "%Y-%m-%d")
-        jalali = jdatetime.datetime.fromgregorian(datetime=date_obj)
-        return f"{jalali.strftime('%Y/%m/%d')} {time}"
+        year, month, day = map(int, gregorian_date.split('-'))
+        datetime(year, month, day)
     except Exception:
-        return f"{gregorian_date} {time}" 
\ No newline at end of file
+        return None
+    jy, jm, jd = gregorian_to_jalali_ymd(year, month, day)
+    return f"{jy:04d}/{jm:02d}/{jd:02d}"
+
+# توابع دارای حافظه نهان؛ lru_cache در برابر دسترسی هم‌زمان چند رشته ایمن است
+_DATE_CACHES = {
+    'gregorian_to_jalali': gregorian_to_jalali,
+    'jalali_to_gregorian': jalali_to_gregorian,
+    'gregorian_to_jalali_display': gregorian_to_jalali_display,
+}
+
+def get_date_cache_stats() -> Dict[str, Dict[str, float]]:
+    """
+    آمار حافظه‌های نهان تبدیل تاریخ
+    
+    Returns:
+        Dict[str, Dict[str, float]]: برای هر تابع hits، misses، size، maxsize و hit_rate
+    """
+    stats = {}
+    for name, func in _DATE_CACHES.items():
+        info = func.cache_info()
+        lookups = info.hits + info.misses
+        stats[name] = {
+            'hits': info.hits,
+            'misses': info.misses,
+            'size': info.currsize,
+            'maxsize': info.maxsize,
+            'hit_rate': info.hits / lookups if lookups else 0.0
+        }
+    return stats
+
+def clear_date_caches() -> None:
+    """پاک کردن همه حافظه‌های نهان تبدیل تاریخ"""
+    for func in _DATE_CACHES.values():
+        func.cache_clear()
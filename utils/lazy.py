@@ -0,0 +1,88 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+بارگذاری تأخیری (lazy) ماژول‌های سنگین
+
+کتابخانه‌هایی مانند matplotlib، pandas و sklearn بیشتر زمان راه‌اندازی را
+می‌گیرند در حالی که ممکن است کاربر در یک نشست هرگز از آن‌ها استفاده نکند.
+lazy_import یک جانشین ماژول برمی‌گرداند که import واقعی را تا اولین دسترسی
+به یکی از ویژگی‌های آن به تعویق می‌اندازد.
+"""
+
+import sys
+import types
+import importlib
+import threading
+from typing import Callable, Optional
+
+_lock = threading.RLock()
+
+
+class LazyModule(types.ModuleType):
+    """
+    جانشین ماژول که در اولین دسترسی به ویژگی، ماژول واقعی را import می‌کند
+
+    پس از بارگذاری، دسترسی‌ها به ماژول واقعی ارجاع داده می‌شوند؛ on_load (در
+    صورت وجود) یک بار با ماژول واقعی صدا زده می‌شود (مثلاً برای تنظیم rcParams).
+    """
+
+    def __init__(self, name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None):
+        super().__init__(name)
+        self.__dict__['_lazy_module'] = None
+        self.__dict__['_lazy_on_load'] = on_load
+
+    def _lazy_load(self) -> types.ModuleType:
+        module = self.__dict__['_lazy_module']
+        if module is None:
+            with _lock:
+                module = self.__dict__['_lazy_module']
+                if module is None:
+                    module = importlib.import_module(self.__name__)
+                    on_load = self.__dict__['_lazy_on_load']
+                    if on_load is not None:
+                        on_load(module)
+                    self.__dict__['_lazy_module'] = module
+        return module
+
+    def __getattr__(self, attr: str):
+        return getattr(self._lazy_load(), attr)
+
+    def __setattr__(self, attr: str, value) -> None:
+        setattr(self._lazy_load(), attr, value)
+
+    def __dir__(self):
+        return dir(self._lazy_load())
+
+    def __repr__(self) -> str:
+        state = 'loaded' if self.__dict__['_lazy_module'] is not None else 'not loaded'
+        return f"<lazy module {self.__name__!r} ({state})>"
+
+
+def lazy_import(name: str, on_load: Optional[Callable[[types.ModuleType], None]] = None) -> types.ModuleType:
+    """
+    دریافت ماژول به صورت تأخیری
+
+    اگر ماژول قبلاً بارگذاری شده باشد خود آن برگردانده می‌شود (و on_load بلافاصله
+    اجرا می‌شود).
+
+    Args:
+        name (str): نام کامل ماژول (مثلاً 'matplotlib.pyplot')
+        on_load (Optional[Callable]): تابعی که پس از بارگذاری با ماژول صدا زده می‌شود
+
+    Returns:
+        ModuleType: ماژول یا جانشین تأخیری آن
+    """
+    module = sys.modules.get(name)
+    if module is not None:
+        if on_load is not None:
+            on_load(module)
+        return module
+    return LazyModule(name, on_load)
+
+
+def is_loaded(module: types.ModuleType) -> bool:
+    """آیا ماژول (یا جانشین تأخیری آن) واقعاً بارگذاری شده است"""
+    if isinstance(module, LazyModule):
+        return module.__dict__['_lazy_module'] is not None
+    return True
@@ -6,68 +6,261 @@
 """
 
 import os
+import json
+import time
+import atexit
+import queue
+import random
 import logging
-from logging.handlers import RotatingFileHandler
+from contextlib import contextmanager
+from logging.handlers import RotatingFileHandler, QueueHandler, QueueListener
 from datetime import datetime
-from typing import Optional
+from typing import Optional, Dict, Union, Iterator, Any
+
+LOG_FORMAT = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
+DATE_FORMAT = '%Y-%m-%d %H:%M:%S'
+
+# متغیر محیطی برای تنظیم سطح ماژول‌ها بدون تغییر کد، مثلاً "database=DEBUG,ui=WARNING"
+LOG_LEVELS_ENV = 'GLUCOSE_LOG_LEVELS'
+# مقدار 1 حالت ساخت‌یافته (JSON) را فعال می‌کند
+LOG_STRUCTURED_ENV = 'GLUCOSE_LOG_STRUCTURED'
+
+# سطح پیش‌فرض کتابخانه‌های پرحرف
+DEFAULT_MODULE_LEVELS = {
+    'matplotlib': logging.WARNING,
+    'PIL': logging.WARNING,
+}
+
+class _DeferredQueueHandler(QueueHandler):
+    """
+    QueueHandler با کمترین کار در رشته فراخواننده
+    
+    فقط پیام و متن خطا (که به اشیای زنده وابسته‌اند) همین‌جا ساخته می‌شوند؛
+    قالب‌بندی کامل در رشته نویسنده انجام می‌شود و رکورد کپی نمی‌شود.
+    """
+    
+    def prepare(self, record: logging.LogRecord) -> logging.LogRecord:
+        if record.args:
+            record.msg = record.getMessage()
+            record.args = None
+        if record.exc_info:
+            record.exc_text = _EXCEPTION_FORMATTER.formatException(record.exc_info)
+            record.exc_info = None
+        return record
+
+class JsonFormatter(logging.Formatter):
+    """قالب‌بندی هر رکورد به صورت یک خط JSON (همراه با فیلدهای رویداد در صورت وجود)"""
+    
+    def format(self, record: logging.LogRecord) -> str:
+        data = {
+            'ts': datetime.fromtimestamp(record.created).isoformat(timespec='milliseconds'),
+            'level': record.levelname,
+            'logger': record.name,
+            'message': record.getMessage(),
+        }
+        fields = getattr(record, 'event_fields', None)
+        if fields:
+            data.update(fields)
+        if record.exc_info and not record.exc_text:
+            record.exc_text = self.formatException(record.exc_info)
+        if record.exc_text:
+            data['exc'] = record.exc_text
+        return json.dumps(data, ensure_ascii=False, default=str)
+
+_EXCEPTION_FORMATTER = logging.Formatter()
+_listener: Optional[QueueListener] = None
+_queue_handler: Optional[QueueHandler] = None
+
+def parse_module_levels(spec: str) -> Dict[str, str]:
+    """
+    تجزیه رشته سطح ماژول‌ها به فرمت name=LEVEL,name=LEVEL
+    
+    Args:
+        spec (str): رشته تنظیمات
+        
+    Returns:
+        Dict[str, str]: نام logger -> نام سطح
+    """
+    levels = {}
+    for item in spec.split(','):
+        name, sep, level = item.partition('=')
+        if sep and level.strip():
+            levels[name.strip()] = level.strip().upper()
+    return levels
 
 def setup_logging(
     log_dir: str = "logs",
     log_level: int = logging.INFO,
     max_size: int = 10 * 1024 * 1024,  # 10MB
-    backup_count: int = 5
-) -> None:
+    backup_count: int = 5,
+    module_levels: Optional[Dict[str, Union[int, str]]] = None,
+    console: bool = True,
+    structured: bool = False
+) -> QueueListener:
     """
-    راه‌اندازی سیستم لاگینگ
+    راه‌اندازی سیستم لاگینگ مبتنی بر صف
+    
+    logger اصلی فقط یک QueueHandler دارد و نوشتن در فایل و کنسول در یک رشته
+    جداگانه (QueueListener) انجام می‌شود؛ بنابراین هر رکورد یک بار و بدون
+    مسدود کردن رشته فراخواننده نوشته می‌شود. logger‌های ماژول‌ها handler ندارند
+    و فقط سطح خود را تعیین می‌کنند. فراخوانی دوباره، تنظیمات قبلی را جایگزین می‌کند.
+    
+    در حالت ساخت‌یافته (structured) فایل لاگ به صورت خطوط JSON (پسوند .jsonl)
+    نوشته می‌شود و رویدادهای log_event/timed_event فعال می‌شوند.
     
     Args:
         log_dir (str): مسیر پوشه لاگ‌ها
         log_level (int): سطح لاگینگ
         max_size (int): حداکثر اندازه فایل لاگ
         backup_count (int): تعداد فایل‌های پشتیبان
+        module_levels (Optional[Dict[str, Union[int, str]]]): سطح اختصاصی هر logger (مثلاً {'database': 'DEBUG'})
+        console (bool): نوشتن لاگ‌ها در کنسول
+        structured (bool): نوشتن فایل لاگ به صورت JSON و فعال‌سازی رویدادهای زمان‌دار
+        
+    Returns:
+        QueueListener: رشته نویسنده لاگ‌ها
     """
+    global _listener, _queue_handler
+    shutdown_logging()
+    
     # ایجاد پوشه لاگ‌ها
     os.makedirs(log_dir, exist_ok=True)
-    
-    # تنظیم فرمت لاگ
-    log_format = '%(asctime)s - %(name)s - %(levelname)s - %(message)s'
-    date_format = '%Y-%m-%d %H:%M:%S'
+    formatter = logging.Formatter(LOG_FORMAT, DATE_FORMAT)
     
     # تنظیم handler فایل
-    log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.log")
+    extension = 'jsonl' if structured else 'log'
+    log_file = os.path.join(log_dir, f"app_{datetime.now().strftime('%Y%m%d')}.{extension}")
     file_handler = RotatingFileHandler(
         log_file,
         maxBytes=max_size,
         backupCount=backup_count,
         encoding='utf-8'
     )
-    file_handler.setFormatter(logging.Formatter(log_format, date_format))
+    file_handler.setFormatter(JsonFormatter() if structured else formatter)
+    handlers = [file_handler]
     
     # تنظیم handler کنسول
-    console_handler = logging.StreamHandler()
-    console_handler.setFormatter(logging.Formatter(log_format, date_format))
+    if console:
+        console_handler = logging.StreamHandler()
+        console_handler.setFormatter(formatter)
+        handlers.append(console_handler)
+    
+    _listener = QueueListener(queue.SimpleQueue(), *handlers, respect_handler_level=True)
+    _queue_handler = _DeferredQueueHandler(_listener.queue)
     
-    # تنظیم logger اصلی
+    # تنظیم logger اصلی: حذف handlerهای قبلی (مثلاً basicConfig) برای جلوگیری از ثبت تکراری
     root_logger = logging.getLogger()
+    for handler in root_logger.handlers[:]:
+        root_logger.removeHandler(handler)
     root_logger.setLevel(log_level)
-    root_logger.addHandler(file_handler)
-    root_logger.addHandler(console_handler)
-    
-    # تنظیم logger‌های دیگر
-    loggers = [
-        'core',
-        'ai',
-        'ui',
-        'devices',
-        'analytics',
-        'utils'
-    ]
-    
-    for logger_name in loggers:
-        logger = logging.getLogger(logger_name)
-        logger.setLevel(log_level)
-        logger.addHandler(file_handler)
-        logger.addHandler(console_handler)
+    root_logger.addHandler(_queue_handler)
+    
+    # سطح اختصاصی ماژول‌ها؛ متغیر محیطی بر مقادیر ورودی اولویت دارد
+    levels = dict(DEFAULT_MODULE_LEVELS)
+    levels[EVENT_LOGGER_NAME] = logging.INFO if structured else logging.WARNING
+    levels.update(module_levels or {})
+    levels.update(parse_module_levels(os.environ.get(LOG_LEVELS_ENV, '')))
+    for name, level in levels.items():
+        try:
+            logging.getLogger(name).setLevel(level.upper() if isinstance(level, str) else level)
+        except (ValueError, TypeError):
+            root_logger.warning(f"سطح لاگ نامعتبر برای {name}: {level}")
+    
+    _listener.start()
+    return _listener
+
+def shutdown_logging() -> None:
+    """توقف رشته نویسنده و نوشتن رکوردهای باقی‌مانده در صف"""
+    global _listener, _queue_handler
+    if _queue_handler is not None:
+        logging.getLogger().removeHandler(_queue_handler)
+        _queue_handler = None
+    if _listener is not None:
+        _listener.stop()
+        for handler in _listener.handlers:
+            handler.close()
+        _listener = None
+
+atexit.register(shutdown_logging)
+
+def get_log_queue_depth() -> int:
+    """تعداد رکوردهای منتظر نوشتن در صف لاگ (برای متریک‌ها)"""
+    listener = _listener
+    return listener.queue.qsize() if listener is not None else 0
+
+# ---------------------------------------------------------------------------
+# رویدادهای ساخت‌یافته (مدت، تعداد سطر، کاربر و نتیجه)
+# ---------------------------------------------------------------------------
+
+# رویدادها فقط وقتی ثبت می‌شوند که این logger در سطح INFO فعال باشد
+EVENT_LOGGER_NAME = 'events'
+_event_logger = logging.getLogger(EVENT_LOGGER_NAME)
+
+# نرخ نمونه‌برداری رویدادهای پرتکرار (احتمال ثبت هر رخداد)
+EVENT_SAMPLE_RATES: Dict[str, float] = {
+    'reading.insert': 0.1,
+}
+
+def log_event(event: str, duration_ms: Optional[float] = None, rows: Optional[int] = None,
+              user_id: Optional[int] = None, outcome: str = 'ok',
+              sample_rate: Optional[float] = None, **fields: Any) -> None:
+    """
+    ثبت یک رویداد ساخت‌یافته
+    
+    Args:
+        event (str): نام رویداد (مثلاً 'report.load')
+        duration_ms (Optional[float]): مدت اجرا به میلی‌ثانیه
+        rows (Optional[int]): تعداد سطرهای پردازش‌شده
+        user_id (Optional[int]): شناسه کاربر
+        outcome (str): نتیجه ('ok'، 'error'، 'skipped' و ...)
+        sample_rate (Optional[float]): احتمال ثبت؛ None برای EVENT_SAMPLE_RATES
+        **fields: فیلدهای اضافی
+    """
+    if not _event_logger.isEnabledFor(logging.INFO):
+        return
+    rate = EVENT_SAMPLE_RATES.get(event, 1.0) if sample_rate is None else sample_rate
+    if rate < 1.0 and random.random() >= rate:
+        return
+    data = {'event': event, 'outcome': outcome}
+    if duration_ms is not None:
+        data['duration_ms'] = round(duration_ms, 3)
+    if rows is not None:
+        data['rows'] = rows
+    if user_id is not None:
+        data['user_id'] = user_id
+    if rate < 1.0:
+        data['sample_rate'] = rate
+    data.update(fields)
+    message = ' '.join(f"{key}={value}" for key, value in data.items())
+    _event_logger.info(message, extra={'event_fields': data})
+
+@contextmanager
+def timed_event(event: str, user_id: Optional[int] = None, **fields: Any) -> Iterator[Dict[str, Any]]:
+    """
+    اندازه‌گیری مدت یک بلوک و ثبت آن به صورت رویداد
+    
+    دیکشنری برگشتی را می‌توان برای افزودن rows، outcome یا فیلدهای دیگر پر کرد؛
+    در صورت بروز استثنا outcome برابر 'error' ثبت می‌شود. قابل استفاده به
+    عنوان decorator نیز هست.
+    
+    Args:
+        event (str): نام رویداد
+        user_id (Optional[int]): شناسه کاربر
+        **fields: فیلدهای اضافی
+    """
+    info: Dict[str, Any] = {}
+    if not _event_logger.isEnabledFor(logging.INFO):
+        yield info
+        return
+    start = time.perf_counter()
+    try:
+        yield info
+    except BaseException as e:
+        info.setdefault('outcome', 'error')
+        info.setdefault('error', type(e).__name__)
+        raise
+    finally:
+        log_event(event, (time.perf_counter() - start) * 1000, **{'user_id': user_id, **fields, **info})
 
 def get_logger(name: str) -> logging.Logger:
     """
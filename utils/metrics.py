@@ -0,0 +1,360 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ماژول متریک‌های درون‌فرایندی: شمارنده، سنجه (gauge) و هیستوگرام تأخیر با سطل‌های ثابت
+
+ثبت هر مقدار فقط چند عمل حسابی و یک قفل کوتاه است تا بتوان متریک‌ها را در
+محیط عملیاتی همیشه روشن نگه داشت. متریک‌ها بر اساس نام و برچسب‌ها (labels)
+یکتا هستند و دریافت دوباره با همان نام و برچسب همان شیء را برمی‌گرداند.
+"""
+
+import os
+import time
+import threading
+from bisect import bisect_left
+from contextlib import contextmanager
+from functools import wraps
+from typing import Any, Callable, Dict, Iterator, Optional, Sequence, Tuple
+
+# سطل‌های پیش‌فرض تأخیر (ثانیه)، هم‌راستا با قرارداد Prometheus
+LATENCY_BUCKETS: Tuple[float, ...] = (
+    0.0005, 0.001, 0.0025, 0.005, 0.01, 0.025, 0.05, 0.1, 0.25, 0.5, 1.0, 2.5, 5.0, 10.0
+)
+
+# نام متریک‌های مشترک بین ماژول‌ها
+DB_QUERY_SECONDS = 'db_query_seconds'
+AI_TRAIN_SECONDS = 'ai_train_model_seconds'
+AI_PREDICT_SECONDS = 'ai_predict_seconds'
+UI_TAB_LOAD_SECONDS = 'ui_tab_load_seconds'
+BACKUP_SECONDS = 'db_backup_seconds'
+BACKUP_BYTES = 'db_backup_last_bytes'
+
+LabelKey = Tuple[Tuple[str, str], ...]
+
+
+class Counter:
+    """شمارنده افزایشی"""
+    kind = 'counter'
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self._value = 0.0
+        self._lock = threading.Lock()
+
+    def inc(self, amount: float = 1.0) -> None:
+        """افزایش شمارنده"""
+        with self._lock:
+            self._value += amount
+
+    @property
+    def value(self) -> float:
+        return self._value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'value': self._value}
+
+
+class Gauge:
+    """
+    سنجه با مقدار دلخواه
+
+    با set_function مقدار در زمان خواندن از یک تابع محاسبه می‌شود (مثلاً طول صف
+    یا نرخ برخورد حافظه نهان) و مسیر اصلی هیچ هزینه‌ای نمی‌پردازد.
+    """
+    kind = 'gauge'
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self._value = 0.0
+        self._function: Optional[Callable[[], float]] = None
+        self._lock = threading.Lock()
+
+    def set(self, value: float) -> None:
+        self._value = value
+
+    def inc(self, amount: float = 1.0) -> None:
+        with self._lock:
+            self._value += amount
+
+    def dec(self, amount: float = 1.0) -> None:
+        self.inc(-amount)
+
+    def set_function(self, function: Callable[[], float]) -> None:
+        """محاسبه مقدار در زمان خواندن"""
+        self._function = function
+
+    @property
+    def value(self) -> float:
+        if self._function is not None:
+            try:
+                return float(self._function())
+            except Exception:
+                return float('nan')
+        return self._value
+
+    def snapshot(self) -> Dict[str, Any]:
+        return {'value': self.value}
+
+
+class Histogram:
+    """هیستوگرام با سطل‌های ثابت (شمارش غیرتجمعی هر سطل، مجموع و تعداد)"""
+    kind = 'histogram'
+
+    def __init__(self, name: str, description: str = "", labels: Optional[Dict[str, str]] = None,
+                 buckets: Sequence[float] = LATENCY_BUCKETS):
+        self.name = name
+        self.description = description
+        self.labels = dict(labels or {})
+        self.buckets = tuple(sorted(buckets))
+        # یک خانه اضافه برای مقادیر بزرگ‌تر از آخرین سطل (+Inf)
+        self._counts = [0] * (len(self.buckets) + 1)
+        self._sum = 0.0
+        self._count = 0
+        self._lock = threading.Lock()
+
+    def observe(self, value: float) -> None:
+        """ثبت یک مقدار"""
+        index = bisect_left(self.buckets, value)
+        with self._lock:
+            self._counts[index] += 1
+            self._sum += value
+            self._count += 1
+
+    @contextmanager
+    def time(self) -> Iterator[None]:
+        """اندازه‌گیری مدت یک بلوک به ثانیه"""
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.observe(time.perf_counter() - start)
+
+    def snapshot(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: count، sum و buckets به صورت فهرست (حد بالا، شمارش تجمعی)
+        """
+        with self._lock:
+            counts = list(self._counts)
+            total, count = self._sum, self._count
+        cumulative, running = [], 0
+        for bound, bucket_count in zip(self.buckets + (float('inf'),), counts):
+            running += bucket_count
+            cumulative.append((bound, running))
+        return {'count': count, 'sum': total, 'buckets': cumulative}
+
+
+class MetricsRegistry:
+    """
+    مخزن متریک‌ها
+
+    ایجاد متریک (با قفل) فقط یک بار انجام می‌شود؛ فراخواننده‌ها باید شیء متریک
+    را نگه دارند و در مسیر پرتکرار فقط inc/observe را صدا بزنند.
+    """
+
+    def __init__(self):
+        self._metrics: Dict[Tuple[str, LabelKey], Any] = {}
+        self._lock = threading.Lock()
+
+    def _get_or_create(self, cls, name: str, description: str, labels: Dict[str, Any], **kwargs):
+        key = (name, tuple(sorted((k, str(v)) for k, v in labels.items())))
+        metric = self._metrics.get(key)
+        if metric is None:
+            with self._lock:
+                metric = self._metrics.get(key)
+                if metric is None:
+                    metric = cls(name, description, dict(key[1]), **kwargs)
+                    self._metrics[key] = metric
+        if not isinstance(metric, cls):
+            raise ValueError(f"متریک {name} قبلاً با نوع {metric.kind} ثبت شده است")
+        return metric
+
+    def counter(self, name: str, description: str = "", **labels: Any) -> Counter:
+        return self._get_or_create(Counter, name, description, labels)
+
+    def gauge(self, name: str, description: str = "", **labels: Any) -> Gauge:
+        return self._get_or_create(Gauge, name, description, labels)
+
+    def histogram(self, name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS,
+                  **labels: Any) -> Histogram:
+        return self._get_or_create(Histogram, name, description, labels, buckets=buckets)
+
+    def collect(self) -> Iterator[Any]:
+        """همه متریک‌ها به ترتیب نام"""
+        with self._lock:
+            metrics = list(self._metrics.items())
+        for _, metric in sorted(metrics, key=lambda item: item[0]):
+            yield metric
+
+    def snapshot(self) -> Dict[str, Dict[str, Any]]:
+        """
+        تصویر لحظه‌ای همه متریک‌ها
+
+        Returns:
+            Dict[str, Dict[str, Any]]: نام متریک -> {'type', 'description', 'values': [{'labels', ...}]}
+        """
+        result: Dict[str, Dict[str, Any]] = {}
+        for metric in self.collect():
+            entry = result.setdefault(metric.name, {
+                'type': metric.kind, 'description': metric.description, 'values': []
+            })
+            entry['values'].append({'labels': dict(metric.labels), **metric.snapshot()})
+        return result
+
+    def clear(self) -> None:
+        """حذف همه متریک‌ها"""
+        with self._lock:
+            self._metrics.clear()
+
+
+# مخزن پیش‌فرض برنامه
+REGISTRY = MetricsRegistry()
+
+
+def counter(name: str, description: str = "", **labels: Any) -> Counter:
+    """دریافت یا ایجاد شمارنده در مخزن پیش‌فرض"""
+    return REGISTRY.counter(name, description, **labels)
+
+
+def gauge(name: str, description: str = "", **labels: Any) -> Gauge:
+    """دریافت یا ایجاد سنجه در مخزن پیش‌فرض"""
+    return REGISTRY.gauge(name, description, **labels)
+
+
+def histogram(name: str, description: str = "", buckets: Sequence[float] = LATENCY_BUCKETS,
+              **labels: Any) -> Histogram:
+    """دریافت یا ایجاد هیستوگرام در مخزن پیش‌فرض"""
+    return REGISTRY.histogram(name, description, buckets, **labels)
+
+
+def timed(name: str, description: str = "", **labels: Any) -> Callable:
+    """
+    decorator ثبت مدت اجرای تابع (ثانیه) در هیستوگرام
+
+    هیستوگرام یک بار در زمان تعریف تابع ساخته می‌شود؛ هزینه هر فراخوانی دو
+    خواندن ساعت و یک observe است. استثناها ثبت و دوباره پرتاب می‌شوند و در
+    شمارنده name_errors_total شمرده می‌شوند.
+
+    Args:
+        name (str): نام هیستوگرام
+        description (str): توضیح متریک
+        **labels: برچسب‌ها (مثلاً method='fetch_report')
+    """
+    def decorator(func: Callable) -> Callable:
+        metric = histogram(name, description, **labels)
+        errors = counter(f"{name}_errors_total", f"خطاهای {name}", **labels)
+        perf_counter = time.perf_counter
+
+        @wraps(func)
+        def wrapper(*args, **kwargs):
+            start = perf_counter()
+            try:
+                return func(*args, **kwargs)
+            except BaseException:
+                errors.inc()
+                raise
+            finally:
+                metric.observe(perf_counter() - start)
+        return wrapper
+    return decorator
+
+
+@contextmanager
+def time_block(name: str, description: str = "", **labels: Any) -> Iterator[Histogram]:
+    """
+    context manager ثبت مدت یک بلوک (ثانیه) در هیستوگرام
+
+    برای مسیرهای پرتکرار بهتر است هیستوگرام یک بار دریافت و از Histogram.time استفاده شود.
+    """
+    metric = histogram(name, description, **labels)
+    start = time.perf_counter()
+    try:
+        yield metric
+    finally:
+        metric.observe(time.perf_counter() - start)
+
+
+def get_metrics_snapshot() -> Dict[str, Dict[str, Any]]:
+    """تصویر لحظه‌ای متریک‌های مخزن پیش‌فرض"""
+    return REGISTRY.snapshot()
+
+
+# ---------------------------------------------------------------------------
+# قالب متنی Prometheus (exposition format 0.0.4)
+# ---------------------------------------------------------------------------
+
+PROMETHEUS_CONTENT_TYPE = 'text/plain; version=0.0.4; charset=utf-8'
+
+
+def _escape_label(value: str) -> str:
+    return value.replace('\\', '\\\\').replace('"', '\\"').replace('\n', '\\n')
+
+
+def _format_labels(labels: Dict[str, str], extra: Optional[Tuple[str, str]] = None) -> str:
+    items = list(labels.items())
+    if extra is not None:
+        items.append(extra)
+    if not items:
+        return ''
+    return '{' + ','.join(f'{key}="{_escape_label(value)}"' for key, value in items) + '}'
+
+
+def _format_value(value: float) -> str:
+    if value == float('inf'):
+        return '+Inf'
+    if value != value:
+        return 'NaN'
+    return repr(float(value)) if isinstance(value, float) else str(value)
+
+
+def render_prometheus(registry: Optional[MetricsRegistry] = None) -> str:
+    """
+    تبدیل متریک‌ها به قالب متنی Prometheus
+
+    Args:
+        registry (Optional[MetricsRegistry]): مخزن متریک‌ها؛ پیش‌فرض REGISTRY
+
+    Returns:
+        str: متن قابل ارائه در /metrics یا فایل textfile collector
+    """
+    lines = []
+    current = None
+    for metric in (registry or REGISTRY).collect():
+        if metric.name != current:
+            current = metric.name
+            if metric.description:
+                description = metric.description.replace('\\', '\\\\').replace('\n', '\\n')
+                lines.append(f"# HELP {metric.name} {description}")
+            lines.append(f"# TYPE {metric.name} {metric.kind}")
+        if metric.kind == 'histogram':
+            snapshot = metric.snapshot()
+            for bound, count in snapshot['buckets']:
+                labels = _format_labels(metric.labels, ('le', _format_value(bound)))
+                lines.append(f"{metric.name}_bucket{labels} {count}")
+            labels = _format_labels(metric.labels)
+            lines.append(f"{metric.name}_sum{labels} {_format_value(snapshot['sum'])}")
+            lines.append(f"{metric.name}_count{labels} {snapshot['count']}")
+        else:
+            lines.append(f"{metric.name}{_format_labels(metric.labels)} {_format_value(metric.value)}")
+    return '\n'.join(lines) + '\n'
+
+
+def write_textfile(path: str, registry: Optional[MetricsRegistry] = None) -> None:
+    """
+    نوشتن متریک‌ها برای textfile collector (node_exporter)
+
+    فایل ابتدا با نام موقت نوشته و سپس جایگزین می‌شود تا جمع‌آوری‌کننده هرگز
+    فایل نیمه‌کاره نخواند.
+    """
+    directory = os.path.dirname(path)
+    if directory:
+        os.makedirs(directory, exist_ok=True)
+    temp_path = f"{path}.{os.getpid()}.tmp"
+    with open(temp_path, 'w', encoding='utf-8') as f:
+        f.write(render_prometheus(registry))
+    os.replace(temp_path, path)
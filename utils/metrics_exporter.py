@@ -0,0 +1,143 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+ارائه متریک‌ها به سامانه پایش: شنونده HTTP محلی (/metrics) یا فایل textfile collector
+
+هر دو مسیر در رشته‌های daemon اجرا می‌شوند و روی رشته رابط کاربری هزینه‌ای ندارند.
+"""
+
+import logging
+import threading
+from http.server import BaseHTTPRequestHandler, ThreadingHTTPServer
+from typing import Any, Dict, Optional
+
+from .date_utils import get_date_cache_stats
+from .logging import get_log_queue_depth
+from .metrics import REGISTRY, MetricsRegistry, PROMETHEUS_CONTENT_TYPE, render_prometheus, write_textfile
+
+logger = logging.getLogger(__name__)
+
+# تنظیمات پیش‌فرض بخش MONITORING؛ پورت 0 یعنی شنونده HTTP غیرفعال است
+DEFAULT_MONITORING_SETTINGS = {
+    "metrics_port": 0,
+    "metrics_host": "127.0.0.1",
+    "textfile_path": "logs/glucose_metrics.prom",
+    "textfile_interval": 15,
+    "ui_lag_interval_ms": 500
+}
+
+# فقط نشانی‌های محلی پذیرفته می‌شوند تا متریک‌ها از شبکه در دسترس نباشند
+LOCAL_HOSTS = ('127.0.0.1', 'localhost', '::1')
+
+
+def register_runtime_gauges(registry: MetricsRegistry = REGISTRY) -> None:
+    """
+    ثبت سنجه‌هایی که در زمان خواندن محاسبه می‌شوند (نرخ برخورد حافظه‌های نهان و طول صف‌ها)
+    """
+    for name in get_date_cache_stats():
+        registry.gauge('date_cache_hit_ratio', "نرخ برخورد حافظه نهان تبدیل تاریخ", cache=name) \
+            .set_function(lambda name=name: get_date_cache_stats()[name]['hit_rate'])
+        registry.gauge('date_cache_entries', "تعداد ورودی‌های حافظه نهان تبدیل تاریخ", cache=name) \
+            .set_function(lambda name=name: get_date_cache_stats()[name]['size'])
+    registry.gauge('log_queue_depth', "رکوردهای منتظر در صف لاگ").set_function(get_log_queue_depth)
+
+
+class _MetricsRequestHandler(BaseHTTPRequestHandler):
+    registry: MetricsRegistry = REGISTRY
+
+    def do_GET(self):
+        if self.path.split('?', 1)[0] not in ('/', '/metrics'):
+            self.send_error(404)
+            return
+        body = render_prometheus(self.registry).encode('utf-8')
+        self.send_response(200)
+        self.send_header('Content-Type', PROMETHEUS_CONTENT_TYPE)
+        self.send_header('Content-Length', str(len(body)))
+        self.end_headers()
+        self.wfile.write(body)
+
+    def log_message(self, format, *args):
+        # درخواست‌های دوره‌ای scrape در لاگ برنامه ثبت نمی‌شوند
+        pass
+
+
+class MetricsExporter:
+    """
+    ارائه‌دهنده متریک‌ها
+
+    اگر metrics_port بزرگ‌تر از صفر باشد شنونده HTTP روی نشانی محلی راه‌اندازی
+    می‌شود؛ در غیر این صورت (یا در صورت خطا در باز کردن پورت) همان محتوا هر
+    textfile_interval ثانیه در textfile_path نوشته می‌شود.
+    """
+
+    def __init__(self, settings: Optional[Dict[str, Any]] = None, registry: MetricsRegistry = REGISTRY):
+        """
+        Args:
+            settings (Optional[Dict[str, Any]]): بخش MONITORING تنظیمات
+            registry (MetricsRegistry): مخزن متریک‌ها
+        """
+        self.settings = {**DEFAULT_MONITORING_SETTINGS, **(settings or {})}
+        self.registry = registry
+        self.server: Optional[ThreadingHTTPServer] = None
+        self._stop = threading.Event()
+        self._thread: Optional[threading.Thread] = None
+
+    def start(self) -> None:
+        """راه‌اندازی شنونده HTTP یا نویسنده فایل"""
+        port = int(self.settings['metrics_port'] or 0)
+        host = self.settings['metrics_host']
+        if port > 0:
+            if host not in LOCAL_HOSTS:
+                logger.warning(f"نشانی {host} محلی نیست؛ شنونده متریک روی 127.0.0.1 راه‌اندازی می‌شود")
+                host = '127.0.0.1'
+            try:
+                handler = type('MetricsRequestHandler', (_MetricsRequestHandler,), {'registry': self.registry})
+                self.server = ThreadingHTTPServer((host, port), handler)
+                self.server.daemon_threads = True
+                self._thread = threading.Thread(target=self.server.serve_forever,
+                                                name='metrics-http', daemon=True)
+                self._thread.start()
+                logger.info(f"متریک‌ها در http://{host}:{self.server.server_port}/metrics ارائه می‌شوند")
+                return
+            except OSError as e:
+                logger.error(f"خطا در باز کردن پورت متریک‌ها {port}: {str(e)}")
+                self.server = None
+
+        if self.settings['textfile_path']:
+            self._thread = threading.Thread(target=self._write_loop, name='metrics-textfile', daemon=True)
+            self._thread.start()
+            logger.info(f"متریک‌ها در فایل {self.settings['textfile_path']} نوشته می‌شوند")
+
+    def _write_loop(self) -> None:
+        """نوشتن دوره‌ای فایل textfile collector"""
+        interval = max(1.0, float(self.settings['textfile_interval']))
+        while True:
+            self.write_textfile()
+            if self._stop.wait(interval):
+                break
+
+    def write_textfile(self) -> None:
+        try:
+            write_textfile(self.settings['textfile_path'], self.registry)
+        except OSError as e:
+            logger.error(f"خطا در نوشتن فایل متریک‌ها: {str(e)}")
+
+    def stop(self) -> None:
+        """توقف شنونده یا نوشتن آخرین نسخه فایل"""
+        self._stop.set()
+        if self.server is not None:
+            self.server.shutdown()
+            self.server.server_close()
+            self.server = None
+        elif self._thread is not None:
+            self._thread.join(timeout=2)
+        self._thread = None
+
+
+def start_metrics_exporter(settings: Optional[Dict[str, Any]] = None) -> MetricsExporter:
+    """ثبت سنجه‌های زمان اجرا و راه‌اندازی ارائه‌دهنده متریک‌ها"""
+    register_runtime_gauges()
+    exporter = MetricsExporter(settings)
+    exporter.start()
+    return exporter
@@ -0,0 +1,241 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+پروفایل‌گیری داخلی برنامه با cProfile (پردازنده) و tracemalloc (حافظه)
+
+گزارش‌ها در پایان (stop) نوشته می‌شوند: فایل pstats و خلاصه متنی توابع پرهزینه
+برای پردازنده، و بیشترین محل‌های تخصیص حافظه برای حافظه. در حالت حافظه،
+تصاویر دوره‌ای (همراه با تفاوت نسبت به تصویر قبلی) نیز ذخیره می‌شوند.
+"""
+
+import io
+import os
+import atexit
+import cProfile
+import logging
+import pstats
+import threading
+import tracemalloc
+from datetime import datetime
+from typing import Callable, List, Optional
+
+logger = logging.getLogger(__name__)
+
+PROFILE_MODES = ('cpu', 'memory', 'both')
+DEFAULT_PROFILE_DIR = os.path.join('logs', 'profile')
+
+# تعداد قاب‌های پشته ذخیره‌شده برای هر تخصیص (بیشتر = دقیق‌تر و کندتر)
+TRACEMALLOC_FRAMES = 10
+
+
+class Profiler:
+    """
+    پروفایلر قابل روشن و خاموش شدن در زمان اجرا
+
+    cProfile فقط رشته‌ای را اندازه می‌گیرد که start در آن صدا زده شده است؛ برای
+    برنامه گرافیکی این رشته اصلی (حلقه رویداد Tk) است.
+    """
+
+    def __init__(self, out_dir: str = DEFAULT_PROFILE_DIR, snapshot_interval: float = 60,
+                 top_n: int = 30):
+        """
+        Args:
+            out_dir (str): پوشه گزارش‌ها
+            snapshot_interval (float): فاصله تصاویر دوره‌ای حافظه به ثانیه (0 = بدون تصویر دوره‌ای)
+            top_n (int): تعداد سطرهای هر گزارش
+        """
+        self.out_dir = out_dir
+        self.snapshot_interval = snapshot_interval
+        self.top_n = top_n
+        self.mode: Optional[str] = None
+        self._cpu: Optional[cProfile.Profile] = None
+        self._owns_tracemalloc = False
+        self._last_snapshot: Optional[tracemalloc.Snapshot] = None
+        self._snapshot_count = 0
+        self._stop_event = threading.Event()
+        self._snapshot_thread: Optional[threading.Thread] = None
+        self._window_timer: Optional[threading.Timer] = None
+        self._lock = threading.Lock()
+        self._session = ''
+
+    @property
+    def active(self) -> bool:
+        return self.mode is not None
+
+    def start(self, mode: str = 'cpu') -> bool:
+        """
+        شروع پروفایل‌گیری
+
+        Args:
+            mode (str): یکی از PROFILE_MODES
+
+        Returns:
+            bool: True در صورت شروع؛ False اگر از قبل فعال باشد
+        """
+        if mode not in PROFILE_MODES:
+            raise ValueError(f"حالت پروفایل نامعتبر است: {mode}")
+        with self._lock:
+            if self.active:
+                logger.warning(f"پروفایل‌گیری ({self.mode}) از قبل فعال است")
+                return False
+            os.makedirs(self.out_dir, exist_ok=True)
+            self._session = datetime.now().strftime('%Y%m%d_%H%M%S')
+            self.mode = mode
+
+            if mode in ('memory', 'both'):
+                self._owns_tracemalloc = not tracemalloc.is_tracing()
+                if self._owns_tracemalloc:
+                    tracemalloc.start(TRACEMALLOC_FRAMES)
+                self._last_snapshot = None
+                self._snapshot_count = 0
+                if self.snapshot_interval > 0:
+                    self._stop_event.clear()
+                    self._snapshot_thread = threading.Thread(
+                        target=self._snapshot_loop, name='profiler-snapshots', daemon=True
+                    )
+                    self._snapshot_thread.start()
+
+            if mode in ('cpu', 'both'):
+                self._cpu = cProfile.Profile()
+                self._cpu.enable()
+
+        logger.info(f"پروفایل‌گیری {mode} شروع شد (خروجی: {self.out_dir})")
+        return True
+
+    def stop(self) -> List[str]:
+        """
+        توقف پروفایل‌گیری و نوشتن گزارش‌ها
+
+        Returns:
+            List[str]: مسیر فایل‌های نوشته‌شده
+        """
+        with self._lock:
+            if not self.active:
+                return []
+            if self._window_timer is not None:
+                self._window_timer.cancel()
+                self._window_timer = None
+            written = []
+
+            if self._cpu is not None:
+                self._cpu.disable()
+                written.extend(self._write_cpu_report(self._cpu))
+                self._cpu = None
+
+            if self.mode in ('memory', 'both'):
+                self._stop_event.set()
+                if self._snapshot_thread is not None:
+                    self._snapshot_thread.join(timeout=5)
+                    self._snapshot_thread = None
+                written.append(self._write_memory_report(final=True))
+                if self._owns_tracemalloc:
+                    tracemalloc.stop()
+                self._last_snapshot = None
+
+            mode, self.mode = self.mode, None
+
+        logger.info(f"پروفایل‌گیری {mode} پایان یافت؛ گزارش‌ها: {', '.join(written)}")
+        return written
+
+    def toggle(self, mode: str = 'cpu') -> bool:
+        """
+        روشن یا خاموش کردن پروفایل‌گیری
+
+        Returns:
+            bool: وضعیت جدید (True = فعال)
+        """
+        if self.active:
+            self.stop()
+            return False
+        return self.start(mode)
+
+    def start_window(self, seconds: float, mode: str = 'cpu',
+                     schedule: Optional[Callable[[int, Callable], object]] = None) -> bool:
+        """
+        پروفایل‌گیری برای یک بازه زمانی مشخص
+
+        Args:
+            seconds (float): طول بازه
+            mode (str): یکی از PROFILE_MODES
+            schedule (Optional[Callable]): زمان‌بند (مثلاً root.after) تا توقف در همان
+                رشته‌ای انجام شود که cProfile در آن فعال شده است؛ پیش‌فرض threading.Timer
+        """
+        if not self.start(mode):
+            return False
+        if schedule is not None:
+            schedule(int(seconds * 1000), self.stop)
+        else:
+            self._window_timer = threading.Timer(seconds, self.stop)
+            self._window_timer.daemon = True
+            self._window_timer.start()
+        return True
+
+    def _path(self, name: str) -> str:
+        return os.path.join(self.out_dir, f"{name}_{self._session}")
+
+    def _write_cpu_report(self, profile: cProfile.Profile) -> List[str]:
+        """نوشتن فایل pstats و خلاصه متنی بر اساس زمان تجمعی و زمان داخلی"""
+        stats_path = self._path('cpu') + '.pstats'
+        profile.dump_stats(stats_path)
+
+        buffer = io.StringIO()
+        stats = pstats.Stats(profile, stream=buffer).strip_dirs()
+        for sort_key in ('cumulative', 'tottime'):
+            buffer.write(f"=== sorted by {sort_key} ===\n")
+            stats.sort_stats(sort_key).print_stats(self.top_n)
+        text_path = self._path('cpu') + '.txt'
+        with open(text_path, 'w', encoding='utf-8') as f:
+            f.write(buffer.getvalue())
+        return [stats_path, text_path]
+
+    def _snapshot_loop(self) -> None:
+        """تصویر دوره‌ای حافظه تا زمان توقف"""
+        while not self._stop_event.wait(self.snapshot_interval):
+            try:
+                self._write_memory_report()
+            except Exception as e:
+                logger.error(f"خطا در ثبت تصویر حافظه: {str(e)}")
+
+    def _write_memory_report(self, final: bool = False) -> str:
+        """نوشتن بیشترین محل‌های تخصیص و تفاوت با تصویر قبلی"""
+        snapshot = tracemalloc.take_snapshot().filter_traces((
+            tracemalloc.Filter(False, tracemalloc.__file__),
+            tracemalloc.Filter(False, '<frozen importlib._bootstrap*>'),
+        ))
+        self._snapshot_count += 1
+        suffix = 'final' if final else f"{self._snapshot_count:03d}"
+        path = self._path('memory') + f"_{suffix}.txt"
+        current, peak = tracemalloc.get_traced_memory()
+
+        lines = [
+            f"traced current={current / 1024:.1f} KiB peak={peak / 1024:.1f} KiB",
+            "",
+            f"=== top {self.top_n} allocations by line ===",
+        ]
+        lines.extend(str(stat) for stat in snapshot.statistics('lineno')[:self.top_n])
+        if self._last_snapshot is not None:
+            lines.extend(["", f"=== top {self.top_n} changes since previous snapshot ==="])
+            lines.extend(str(stat) for stat in
+                         snapshot.compare_to(self._last_snapshot, 'lineno')[:self.top_n])
+        self._last_snapshot = snapshot
+
+        with open(path, 'w', encoding='utf-8') as f:
+            f.write('\n'.join(lines) + '\n')
+        return path
+
+
+def start_profiling(mode: str, out_dir: str = DEFAULT_PROFILE_DIR,
+                    snapshot_interval: float = 60) -> Profiler:
+    """
+    شروع پروفایل‌گیری از ابتدای اجرا و نوشتن گزارش‌ها هنگام خروج برنامه
+
+    Args:
+        mode (str): یکی از PROFILE_MODES
+        out_dir (str): پوشه گزارش‌ها
+        snapshot_interval (float): فاصله تصاویر دوره‌ای حافظه به ثانیه
+    """
+    profiler = Profiler(out_dir, snapshot_interval)
+    profiler.start(mode)
+    atexit.register(profiler.stop)
+    return profiler
@@ -0,0 +1,239 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+طرح‌واره (schema) اعلانی خوانش قند خون و اعتبارسنج/نرمال‌ساز کامپایل‌شده آن
+
+قواعد فیلدها (محدوده‌ها، مقادیر مجاز و پیش‌فرض‌ها) فقط یک بار در READING_FIELDS
+تعریف می‌شوند و فرم ورود، ورود انبوه و دریافت از دستگاه همگی از آن استفاده می‌کنند.
+"""
+
+import re
+from datetime import date
+from functools import lru_cache
+from typing import Any, Dict, Iterable, List, Optional, Sequence, Tuple
+
+from .date_utils import gregorian_to_jalali_ymd, jalali_to_gregorian_ymd, DATE_CACHE_SIZE
+from .validation import (
+    GLUCOSE_RANGE, STRESS_RANGE, EXERCISE_RANGE, SLEEP_RANGE,
+    VALID_MEAL_STATUSES, VALID_MOODS, NUMERIC_RULES, CHOICE_RULES,
+    validate_reading_columns, BatchValidationResult
+)
+
+# محدوده سال‌های شمسی پذیرفته‌شده (هم‌راستا با ui.utils.validate_persian_date)
+JALALI_YEAR_RANGE = (1300, 1500)
+
+_DATE_PATTERN = re.compile(r'^(\d{4})[/-](\d{1,2})[/-](\d{1,2})$')
+_TIME_PATTERN = re.compile(r'^(\d{1,2}):(\d{1,2})(?::\d{1,2})?$')
+
+DATE_MESSAGE = "فرمت تاریخ نامعتبر است. (مثال: 1402/01/15)"
+TIME_MESSAGE = "فرمت زمان نامعتبر است. (مثال: 14:30)"
+
+
+class FieldSpec:
+    """
+    تعریف اعلانی یک فیلد خوانش
+
+    kind یکی از 'int'، 'float'، 'str'، 'choice'، 'jalali_date'، 'gregorian_date' و 'time' است.
+    """
+    __slots__ = ('name', 'kind', 'default', 'required', 'bounds', 'choices', 'message')
+
+    def __init__(self, name, kind, default=None, required=False, bounds=None, choices=None, message=None):
+        self.name = name
+        self.kind = kind
+        self.default = default
+        self.required = required
+        self.bounds = bounds
+        self.choices = choices
+        self.message = message or f"مقدار {name} نامعتبر است"
+
+
+# پیش‌فرض‌ها با مقادیر DEFAULT جدول readings یکسان هستند
+READING_FIELDS = (
+    FieldSpec('jalali_date', 'jalali_date', message=DATE_MESSAGE),
+    FieldSpec('gregorian_date', 'gregorian_date', message=DATE_MESSAGE),
+    FieldSpec('time', 'time', required=True, message=TIME_MESSAGE),
+    FieldSpec('glucose_level', 'int', required=True, bounds=GLUCOSE_RANGE,
+              message=NUMERIC_RULES['glucose_level'][3]),
+    FieldSpec('description', 'str', default=''),
+    FieldSpec('meal_status', 'choice', default='نامعلوم', choices=VALID_MEAL_STATUSES,
+              message=CHOICE_RULES['meal_status'][1]),
+    FieldSpec('mood', 'choice', default='متوسط', choices=VALID_MOODS,
+              message=CHOICE_RULES['mood'][1]),
+    FieldSpec('stress_level', 'int', default=5, bounds=STRESS_RANGE,
+              message=NUMERIC_RULES['stress_level'][3]),
+    FieldSpec('exercise_minutes', 'int', default=0, bounds=EXERCISE_RANGE,
+              message=NUMERIC_RULES['exercise_minutes'][3]),
+    FieldSpec('sleep_hours', 'float', default=8.0, bounds=SLEEP_RANGE,
+              message=NUMERIC_RULES['sleep_hours'][3]),
+)
+
+
+def _parse_date(value):
+    """جداسازی سال، ماه و روز از رشته YYYY/MM/DD یا YYYY-MM-DD"""
+    match = _DATE_PATTERN.match(str(value).strip()[:10])
+    if match is None:
+        raise ValueError
+    return int(match.group(1)), int(match.group(2)), int(match.group(3))
+
+
+# تاریخ‌ها و زمان‌ها در داده‌های واقعی بسیار تکراری‌اند؛ تبدیل‌ها با حافظه نهان انجام می‌شوند
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _jalali_date(value):
+    jy, jm, jd = _parse_date(value)
+    if not JALALI_YEAR_RANGE[0] <= jy <= JALALI_YEAR_RANGE[1] or not 1 <= jm <= 12 or not 1 <= jd <= 31:
+        raise ValueError
+    # روزهای بیش از طول ماه (مانند 1402/12/30 در سال غیرکبیسه) در تبدیل برگشتی آشکار می‌شوند
+    if gregorian_to_jalali_ymd(*jalali_to_gregorian_ymd(jy, jm, jd)) != (jy, jm, jd):
+        raise ValueError
+    return f"{jy:04d}/{jm:02d}/{jd:02d}"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _gregorian_date(value):
+    gy, gm, gd = _parse_date(value)
+    date(gy, gm, gd)  # ValueError برای تاریخ ناموجود
+    return f"{gy:04d}-{gm:02d}-{gd:02d}"
+
+
+@lru_cache(maxsize=2048)
+def _time(value):
+    match = _TIME_PATTERN.match(str(value).strip())
+    if match is None:
+        raise ValueError
+    hour, minute = int(match.group(1)), int(match.group(2))
+    if hour > 23 or minute > 59:
+        raise ValueError
+    return f"{hour:02d}:{minute:02d}"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _jalali_to_gregorian_str(jalali):
+    gy, gm, gd = jalali_to_gregorian_ymd(*map(int, jalali.split('/')))
+    return f"{gy:04d}-{gm:02d}-{gd:02d}"
+
+
+@lru_cache(maxsize=DATE_CACHE_SIZE)
+def _gregorian_to_jalali_str(gregorian):
+    jy, jm, jd = gregorian_to_jalali_ymd(*map(int, gregorian.split('-')))
+    return f"{jy:04d}/{jm:02d}/{jd:02d}"
+
+
+def _compile_converter(spec, choices=None):
+    """ساخت تابع تبدیل یک فیلد؛ در صورت نامعتبر بودن ValueError می‌دهد"""
+    kind = spec.kind
+    if kind in ('int', 'float'):
+        cast = int if kind == 'int' else float
+        low, high = spec.bounds
+
+        def convert(value):
+            # همان قواعد int()/float() توابع utils.validation
+            number = cast(value.strip() if isinstance(value, str) else value)
+            if not low <= number <= high:
+                raise ValueError
+            return number
+        return convert
+    if kind == 'choice':
+        allowed = frozenset(choices if choices is not None else spec.choices)
+
+        def convert(value):
+            if value not in allowed:
+                raise ValueError
+            return value
+        return convert
+    if kind == 'str':
+        return lambda value: str(value).strip()
+    return {'jalali_date': _jalali_date, 'gregorian_date': _gregorian_date, 'time': _time}[kind]
+
+
+class CompiledReadingSchema:
+    """
+    اعتبارسنج و نرمال‌ساز کامپایل‌شده خوانش
+
+    برای هر فیلد یک تابع تبدیل از پیش ساخته می‌شود تا اعتبارسنجی هر رکورد
+    فقط یک حلقه روی این توابع باشد. خروجی normalize مستقیماً به
+    DatabaseManager.insert_reading قابل ارسال است.
+    """
+
+    def __init__(self, fields: Sequence[FieldSpec] = READING_FIELDS,
+                 choices: Optional[Dict[str, Iterable[str]]] = None):
+        """
+        Args:
+            fields (Sequence[FieldSpec]): تعریف فیلدها
+            choices (Optional[Dict[str, Iterable[str]]]): جایگزینی مقادیر مجاز فیلدهای choice
+        """
+        choices = choices or {}
+        self.fields = tuple(fields)
+        self.choices = {spec.name: tuple(choices.get(spec.name, spec.choices))
+                        for spec in self.fields if spec.kind == 'choice'}
+        self._steps = tuple(
+            (spec.name, _compile_converter(spec, self.choices.get(spec.name)),
+             spec.default, spec.required, spec.message)
+            for spec in self.fields
+        )
+
+    def normalize(self, record: Dict[str, Any]) -> Tuple[Optional[Dict[str, Any]], List[str]]:
+        """
+        اعتبارسنجی و نرمال‌سازی یک رکورد
+
+        تاریخ می‌تواند شمسی (jalali_date) یا میلادی (gregorian_date) باشد و دیگری
+        محاسبه می‌شود؛ فیلدهای خالی غیرالزامی مقدار پیش‌فرض می‌گیرند.
+
+        Args:
+            record (Dict[str, Any]): رکورد خام (مثلاً رشته‌های فرم)
+
+        Returns:
+            Tuple[Optional[Dict[str, Any]], List[str]]: (رکورد نرمال‌شده یا None، پیام‌های خطا)
+        """
+        result = {}
+        errors = []
+        for name, convert, default, required, message in self._steps:
+            value = record.get(name)
+            if value is None or value == '':
+                if required:
+                    errors.append(message)
+                else:
+                    result[name] = default
+                continue
+            try:
+                result[name] = convert(value)
+            except (ValueError, TypeError):
+                errors.append(message)
+
+        if not errors:
+            jalali, gregorian = result.get('jalali_date'), result.get('gregorian_date')
+            if jalali is None and gregorian is None:
+                errors.append(DATE_MESSAGE)
+            elif gregorian is None:
+                result['gregorian_date'] = _jalali_to_gregorian_str(jalali)
+            elif jalali is None:
+                result['jalali_date'] = _gregorian_to_jalali_str(gregorian)
+
+        return (None, errors) if errors else (result, errors)
+
+    def normalize_many(self, records: Iterable[Dict[str, Any]]) -> Tuple[List[Dict[str, Any]], List[Tuple[int, List[str]]]]:
+        """
+        نرمال‌سازی گروهی رکوردها
+
+        Returns:
+            Tuple: (رکوردهای معتبر، فهرست (شماره رکورد، پیام‌های خطا) برای رکوردهای ردشده)
+        """
+        normalize = self.normalize
+        valid, rejected = [], []
+        for index, record in enumerate(records):
+            normalized, errors = normalize(record)
+            if errors:
+                rejected.append((index, errors))
+            else:
+                valid.append(normalized)
+        return valid, rejected
+
+    def validate_columns(self, columns: Dict[str, Sequence],
+                         choices: Optional[Dict[str, Iterable[str]]] = None) -> BatchValidationResult:
+        """اعتبارسنجی ستونی (utils.validation) با مقادیر مجاز همین طرح‌واره یا جایگزین آن‌ها"""
+        return validate_reading_columns(columns, {**self.choices, **(choices or {})})
+
+
+# نمونه پیش‌فرض که یک بار در زمان بارگذاری ماژول کامپایل می‌شود
+READING_SCHEMA = CompiledReadingSchema()
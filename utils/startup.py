@@ -0,0 +1,332 @@
+#!/usr/bin/env python3
+# -*- coding: utf-8 -*-
+
+"""
+زمان‌سنجی مراحل راه‌اندازی برنامه
+
+مراحل (phase) با مدت اجرا و نقاط عطف (mark) با فاصله از مبدأ ثبت می‌شوند.
+نقاط عطف اصلی:
+    first_window: اولین نمایش (Map) پنجره اصلی
+    interactive: اولین زمان بیکار شدن حلقه رویداد پس از نمایش پنجره
+    ready: پایان همه مراحل پس‌زمینه StagedStartup (در صورت استفاده)
+
+اگر متغیر محیطی GLUCOSE_STARTUP_REPORT مسیر یک فایل باشد، گزارش JSON پس از
+ثبت همه نقاط عطف لازم نوشته و برنامه بسته می‌شود (برای benchmarks/bench_startup.py).
+
+StagedStartup کارهای کند راه‌اندازی (باز کردن پایگاه داده، بارگذاری مدل،
+گرم کردن حافظه‌های نهان) را پس از نمایش پنجره در رشته‌های پس‌زمینه اجرا
+می‌کند و نتیجه و پیشرفت آن‌ها را در رشته رابط کاربری اعلام می‌کند.
+"""
+
+import os
+import json
+import time
+import queue
+import atexit
+import logging
+import threading
+from contextlib import contextmanager
+from typing import Any, Callable, Dict, Iterable, Iterator, List, Optional, Tuple
+
+logger = logging.getLogger(__name__)
+
+STARTUP_REPORT_ENV = 'GLUCOSE_STARTUP_REPORT'
+
+
+class StartupTimer:
+    """ثبت مدت مراحل و نقاط عطف راه‌اندازی نسبت به زمان ایجاد شیء"""
+
+    def __init__(self):
+        self.origin = time.perf_counter()
+        # زمان مطلق مبدأ تا اجراکننده بیرونی بتواند زمان شروع مفسر را هم حساب کند
+        self.origin_epoch = time.time()
+        self.phases: Dict[str, float] = {}
+        self.marks: Dict[str, float] = {}
+        self.finished = False
+        # نقاط عطفی که پیش از پایان زمان‌سنجی باید ثبت شوند
+        self.required_marks: List[str] = ['interactive']
+        self._written = False
+
+    def elapsed(self) -> float:
+        """ثانیه‌های گذشته از مبدأ"""
+        return time.perf_counter() - self.origin
+
+    @contextmanager
+    def phase(self, name: str) -> Iterator[None]:
+        """اندازه‌گیری مدت یک مرحله؛ پس از پایان زمان‌سنجی ثبتی انجام نمی‌شود"""
+        if self.finished:
+            yield
+            return
+        start = time.perf_counter()
+        try:
+            yield
+        finally:
+            self.phases[name] = self.phases.get(name, 0.0) + time.perf_counter() - start
+
+    def mark(self, name: str) -> None:
+        """ثبت یک نقطه عطف (فقط اولین بار)"""
+        if name not in self.marks:
+            self.marks[name] = self.elapsed()
+
+    def require(self, name: str) -> None:
+        """افزودن نقطه عطفی که پایان زمان‌سنجی منتظر آن می‌ماند"""
+        if name not in self.required_marks:
+            self.required_marks.append(name)
+
+    def report(self) -> Dict[str, Any]:
+        """
+        Returns:
+            Dict[str, Any]: مراحل و نقاط عطف به میلی‌ثانیه
+        """
+        return {
+            'origin_epoch': self.origin_epoch,
+            'completed': all(name in self.marks for name in self.required_marks),
+            'phases_ms': {name: round(value * 1000, 3) for name, value in self.phases.items()},
+            'marks_ms': {name: round(value * 1000, 3) for name, value in self.marks.items()},
+        }
+
+    def write(self, path: str) -> None:
+        """نوشتن گزارش JSON"""
+        with open(path, 'w', encoding='utf-8') as f:
+            json.dump(self.report(), f, ensure_ascii=False, indent=2)
+        self._written = True
+
+    def track_window(self, root) -> None:
+        """
+        ثبت first_window و interactive برای پنجره Tk
+
+        Args:
+            root (tk.Tk): پنجره اصلی
+        """
+        self._root = root
+
+        def on_map(event):
+            if event.widget is root and 'first_window' not in self.marks:
+                self.mark('first_window')
+                # callbackهای بیکار به ترتیب اجرا می‌شوند؛ این یکی پس از کارهای در صف اجرا می‌شود
+                root.after_idle(self.complete, 'interactive')
+
+        root.bind('<Map>', on_map, add='+')
+
+    def complete(self, name: str) -> None:
+        """
+        ثبت یک نقطه عطف لازم در رشته رابط کاربری و پایان زمان‌سنجی پس از ثبت همه آن‌ها
+        """
+        self.mark(name)
+        if self.finished or not all(required in self.marks for required in self.required_marks):
+            return
+        self.finished = True
+        logger.info("راه‌اندازی: " + "، ".join(f"{required} در {self.marks[required] * 1000:.0f}ms"
+                                              for required in ['first_window'] + self.required_marks))
+        path = os.environ.get(STARTUP_REPORT_ENV)
+        if path:
+            self.write(path)
+            self._root.quit()
+
+    def write_pending(self) -> None:
+        """نوشتن گزارش ناقص هنگام خروج (مثلاً خطا پیش از نمایش پنجره)"""
+        path = os.environ.get(STARTUP_REPORT_ENV)
+        if path and not self._written:
+            try:
+                self.write(path)
+            except OSError:
+                pass
+
+
+class StagedStartup:
+    """
+    اجرای مراحل راه‌اندازی در رشته‌های پس‌زمینه با رعایت وابستگی‌ها
+
+    هر مرحله در رشته daemon خود اجرا می‌شود و تا پایان مراحل پیش‌نیاز منتظر
+    می‌ماند؛ شکست یک مرحله باعث شکست مراحل وابسته می‌شود. اعلان‌ها (پیشرفت و
+    آماده شدن) فقط در poll و در نتیجه در رشته رابط کاربری اجرا می‌شوند، چون
+    Tk در برابر فراخوانی از رشته‌های دیگر ایمن نیست.
+    """
+
+    PENDING = 'pending'
+    RUNNING = 'running'
+    DONE = 'done'
+    FAILED = 'failed'
+
+    def __init__(self, timer: Optional[StartupTimer] = None):
+        """
+        Args:
+            timer (Optional[StartupTimer]): زمان‌سنجی که مدت هر مرحله در آن ثبت می‌شود
+        """
+        self.timer = timer
+        self._tasks: Dict[str, Tuple[Callable[[], Any], Tuple[str, ...], str]] = {}
+        self._done: Dict[str, threading.Event] = {}
+        self.status: Dict[str, str] = {}
+        self.results: Dict[str, Any] = {}
+        self.errors: Dict[str, BaseException] = {}
+        self._queue: "queue.Queue[Tuple[str, str]]" = queue.Queue()
+        self._waiters: List[Tuple[Tuple[str, ...], Callable, Optional[Callable]]] = []
+        self._progress_listeners: List[Callable[[str, str, str, int, int], None]] = []
+        self._started = False
+
+    def add(self, name: str, func: Callable[[], Any], requires: Iterable[str] = (),
+            label: Optional[str] = None) -> None:
+        """
+        افزودن یک مرحله
+
+        Args:
+            name (str): نام مرحله
+            func (Callable[[], Any]): کار مرحله (در رشته پس‌زمینه)؛ مقدار برگشتی نتیجه مرحله است
+            requires (Iterable[str]): مراحل پیش‌نیاز (باید پیش‌تر افزوده شده باشند)
+            label (Optional[str]): عنوان قابل نمایش به کاربر
+        """
+        requires = tuple(requires)
+        unknown = [dependency for dependency in requires if dependency not in self._tasks]
+        if unknown:
+            raise ValueError(f"مرحله پیش‌نیاز ناشناخته: {', '.join(unknown)}")
+        self._tasks[name] = (func, requires, label or name)
+        self._done[name] = threading.Event()
+        self.status[name] = self.PENDING
+
+    @property
+    def finished(self) -> bool:
+        """آیا همه مراحل (موفق یا ناموفق) پایان یافته‌اند"""
+        return all(event.is_set() for event in self._done.values())
+
+    def progress(self) -> Tuple[int, int]:
+        """
+        Returns:
+            Tuple[int, int]: (تعداد مراحل پایان‌یافته، تعداد کل)
+        """
+        return sum(event.is_set() for event in self._done.values()), len(self._done)
+
+    def label(self, name: str) -> str:
+        """عنوان قابل نمایش یک مرحله"""
+        return self._tasks[name][2]
+
+    def is_ready(self, *names: str) -> bool:
+        """آیا همه مراحل نام‌برده با موفقیت پایان یافته‌اند"""
+        return all(self.status.get(name) == self.DONE for name in names)
+
+    def on_progress(self, callback: Callable[[str, str, str, int, int], None]) -> None:
+        """ثبت شنونده پیشرفت: callback(name, label, state, done, total)"""
+        self._progress_listeners.append(callback)
+
+    def on_ready(self, requires: Iterable[str], callback: Callable[..., None],
+                 on_error: Optional[Callable[[str, BaseException], None]] = None) -> None:
+        """
+        اجرای callback با نتایج مراحل (به ترتیب requires) پس از موفقیت همه آن‌ها
+
+        Args:
+            requires (Iterable[str]): مراحل مورد نیاز
+            callback (Callable[..., None]): در رشته رابط کاربری صدا زده می‌شود
+            on_error (Optional[Callable]): در صورت شکست یکی از مراحل با (نام مرحله، خطا)
+        """
+        self._waiters.append((tuple(requires), callback, on_error))
+        if self._started:
+            self._notify_waiters()
+
+    def start(self) -> None:
+        """شروع اجرای همه مراحل"""
+        self._started = True
+        for name in self._tasks:
+            threading.Thread(target=self._run, args=(name,), name=f"startup-{name}", daemon=True).start()
+
+    def _run(self, name: str) -> None:
+        func, requires, _ = self._tasks[name]
+        try:
+            for dependency in requires:
+                self._done[dependency].wait()
+                if self.status[dependency] != self.DONE:
+                    raise RuntimeError(f"مرحله پیش‌نیاز {dependency} ناموفق بود")
+            self.status[name] = self.RUNNING
+            self._queue.put((name, self.RUNNING))
+            if self.timer is not None:
+                with self.timer.phase(f"background_{name}"):
+                    self.results[name] = func()
+            else:
+                self.results[name] = func()
+            self.status[name] = self.DONE
+        except Exception as e:
+            logger.error(f"خطا در مرحله راه‌اندازی {name}: {str(e)}")
+            self.errors[name] = e
+            self.status[name] = self.FAILED
+        finally:
+            self._done[name].set()
+            self._queue.put((name, self.status[name]))
+
+    def poll(self) -> bool:
+        """
+        پردازش رویدادهای مراحل در رشته فراخواننده (رشته رابط کاربری)
+
+        Returns:
+            bool: True اگر همه مراحل پایان یافته و همه رویدادها پردازش شده باشند
+        """
+        while True:
+            try:
+                name, state = self._queue.get_nowait()
+            except queue.Empty:
+                break
+            done, total = self.progress()
+            for listener in self._progress_listeners:
+                try:
+                    listener(name, self.label(name), state, done, total)
+                except Exception as e:
+                    logger.error(f"خطا در اعلان پیشرفت راه‌اندازی: {str(e)}")
+        self._notify_waiters()
+        return self.finished and self._queue.empty()
+
+    def _notify_waiters(self) -> None:
+        """اجرای callbackهایی که مراحل مورد نیازشان پایان یافته است"""
+        pending = []
+        for waiter in self._waiters:
+            requires, callback, on_error = waiter
+            failed = next((name for name in requires if self.status.get(name) == self.FAILED), None)
+            try:
+                if failed is not None:
+                    if on_error is not None:
+                        on_error(failed, self.errors.get(failed))
+                elif self.is_ready(*requires):
+                    callback(*(self.results[name] for name in requires))
+                else:
+                    pending.append(waiter)
+            except Exception as e:
+                logger.error(f"خطا در فعال‌سازی پس از راه‌اندازی: {str(e)}")
+        self._waiters = pending
+
+    def attach(self, root, interval_ms: int = 50) -> None:
+        """
+        شروع مراحل و پردازش دوره‌ای رویدادها با root.after تا پایان همه مراحل
+
+        پایان مراحل به عنوان نقطه عطف ready در زمان‌سنج ثبت می‌شود.
+        """
+        if self.timer is not None:
+            self.timer.require('ready')
+
+        def loop():
+            if self.poll():
+                if self.timer is not None:
+                    self.timer.complete('ready')
+                return
+            root.after(interval_ms, loop)
+
+        self.start()
+        root.after(interval_ms, loop)
+
+    def wait(self, timeout: Optional[float] = None) -> bool:
+        """
+        انتظار برای پایان همه مراحل و پردازش رویدادها (برای اجرای بدون رابط کاربری)
+
+        Returns:
+            bool: True اگر همه مراحل تا پایان timeout تمام شده باشند
+        """
+        if not self._started:
+            self.start()
+        deadline = None if timeout is None else time.monotonic() + timeout
+        for event in self._done.values():
+            remaining = None if deadline is None else max(0.0, deadline - time.monotonic())
+            if not event.wait(remaining):
+                self.poll()
+                return False
+        self.poll()
+        return True
+
+
+# زمان‌سنج سراسری؛ مبدأ آن زمان اولین import این ماژول است
+STARTUP = StartupTimer()
+atexit.register(STARTUP.write_pending)
@@ -5,8 +5,26 @@
 توابع اعتبارسنجی ورودی‌ها
 """
 
+from __future__ import annotations
+
 import re
-from typing import Tuple, Optional
+from typing import Tuple, Optional, Dict, List, Iterable, Sequence
+
+from .lazy import lazy_import
+
+np = lazy_import('numpy')
+
+# محدوده‌های مجاز فیلدهای عددی خوانش
+GLUCOSE_RANGE = (20, 600)
+STRESS_RANGE = (1, 10)
+EXERCISE_RANGE = (0, 480)
+SLEEP_RANGE = (0, 24)
+
+# شامل گزینه‌های فرم‌های برنامه (config.READING_FIELDS و ghand2)
+VALID_MEAL_STATUSES = ('قبل از صبحانه', 'بعد از صبحانه', 'قبل از نهار', 'بعد از نهار',
+                       'قبل از شام', 'بعد از شام', 'قبل از خواب', 'نامعلوم',
+                       'ناشتا', 'قبل از غذا', 'بعد از غذا', 'بعد از ناهار', 'سایر')
+VALID_MOODS = ('عالی', 'خوب', 'متوسط', 'بد', 'خیلی بد')
 
 def validate_glucose_level(level: str) -> Tuple[bool, Optional[int]]:
     """
@@ -20,7 +38,7 @@ def validate_glucose_level(level: str) -> Tuple[bool, Optional[int]]:
     """
     try:
         value = int(level)
-        if 20 <= value <= 600:  # محدوده منطقی برای قند خون
+        if GLUCOSE_RANGE[0] <= value <= GLUCOSE_RANGE[1]:  # محدوده منطقی برای قند خون
             return True, value
         return False, None
     except ValueError:
@@ -140,9 +158,7 @@ def validate_meal_status(status: str) -> bool:
     Returns:
         bool: True اگر وضعیت معتبر باشد، False در غیر این صورت
     """
-    valid_statuses = ['قبل از صبحانه', 'بعد از صبحانه', 'قبل از نهار', 'بعد از نهار',
-                     'قبل از شام', 'بعد از شام', 'قبل از خواب', 'نامعلوم']
-    return status in valid_statuses
+    return status in VALID_MEAL_STATUSES
 
 def validate_mood(mood: str) -> bool:
     """
@@ -154,8 +170,7 @@ def validate_mood(mood: str) -> bool:
     Returns:
         bool: True اگر وضعیت معتبر باشد، False در غیر این صورت
     """
-    valid_moods = ['عالی', 'خوب', 'متوسط', 'بد', 'خیلی بد']
-    return mood in valid_moods
+    return mood in VALID_MOODS
 
 def validate_stress_level(level: str) -> Tuple[bool, Optional[int]]:
     """
@@ -169,7 +184,7 @@ def validate_stress_level(level: str) -> Tuple[bool, Optional[int]]:
     """
     try:
         value = int(level)
-        if 1 <= value <= 10:  # مقیاس 1 تا 10
+        if STRESS_RANGE[0] <= value <= STRESS_RANGE[1]:  # مقیاس 1 تا 10
             return True, value
         return False, None
     except ValueError:
@@ -187,7 +202,7 @@ def validate_exercise_minutes(minutes: str) -> Tuple[bool, Optional[int]]:
     """
     try:
         value = int(minutes)
-        if 0 <= value <= 480:  # حداکثر 8 ساعت
+        if EXERCISE_RANGE[0] <= value <= EXERCISE_RANGE[1]:  # حداکثر 8 ساعت
             return True, value
         return False, None
     except ValueError:
@@ -205,8 +220,131 @@ def validate_sleep_hours(hours: str) -> Tuple[bool, Optional[float]]:
     """
     try:
         value = float(hours)
-        if 0 <= value <= 24:  # محدوده منطقی برای خواب
+        if SLEEP_RANGE[0] <= value <= SLEEP_RANGE[1]:  # محدوده منطقی برای خواب
             return True, value
         return False, None
     except ValueError:
-        return False, None 
\ No newline at end of file
+        return False, None 
+
+# ---------------------------------------------------------------------------
+# اعتبارسنجی گروهی (ستونی) برای ورود انبوه داده‌ها
+# ---------------------------------------------------------------------------
+
+# قواعد عددی: ستون -> (نوع، حداقل، حداکثر، پیام خطا)
+NUMERIC_RULES = {
+    'glucose_level': (int, *GLUCOSE_RANGE, f"سطح قند خون باید عدد صحیح بین {GLUCOSE_RANGE[0]} تا {GLUCOSE_RANGE[1]} باشد"),
+    'stress_level': (int, *STRESS_RANGE, f"سطح استرس باید عدد صحیح بین {STRESS_RANGE[0]} تا {STRESS_RANGE[1]} باشد"),
+    'exercise_minutes': (int, *EXERCISE_RANGE, f"دقایق ورزش باید عدد صحیح بین {EXERCISE_RANGE[0]} تا {EXERCISE_RANGE[1]} باشد"),
+    'sleep_hours': (float, *SLEEP_RANGE, f"ساعات خواب باید عددی بین {SLEEP_RANGE[0]} تا {SLEEP_RANGE[1]} باشد"),
+}
+
+# قواعد عضویت: ستون -> (مقادیر مجاز، پیام خطا)
+CHOICE_RULES = {
+    'meal_status': (VALID_MEAL_STATUSES, "وضعیت وعده غذایی نامعتبر است"),
+    'mood': (VALID_MOODS, "وضعیت روحی نامعتبر است"),
+}
+
+class BatchValidationResult:
+    """نتیجه اعتبارسنجی گروهی: مقادیر تبدیل‌شده و ماسک خطای هر ستون"""
+
+    def __init__(self, values: Dict[str, np.ndarray], errors: Dict[str, np.ndarray], messages: Dict[str, str]):
+        self.values = values
+        self.errors = errors
+        self.messages = messages
+
+    @property
+    def valid_rows(self) -> np.ndarray:
+        """ماسک سطرهایی که در هیچ ستونی خطا ندارند"""
+        masks = list(self.errors.values())
+        if not masks:
+            return np.ones(0, dtype=bool)
+        return ~np.logical_or.reduce(masks)
+
+    def error_counts(self) -> Dict[str, int]:
+        """تعداد خطاهای هر ستون (فقط ستون‌های دارای خطا)"""
+        counts = {name: int(mask.sum()) for name, mask in self.errors.items()}
+        return {name: count for name, count in counts.items() if count}
+
+    def row_errors(self, limit: Optional[int] = None) -> List[Tuple[int, str, str]]:
+        """
+        فهرست خطاها به ترتیب سطر
+        
+        Args:
+            limit (Optional[int]): حداکثر تعداد خطای برگشتی
+            
+        Returns:
+            List[Tuple[int, str, str]]: (شماره سطر، نام ستون، پیام خطا)
+        """
+        result = []
+        for name, mask in self.errors.items():
+            result.extend((int(row), name, self.messages[name]) for row in np.flatnonzero(mask))
+        result.sort()
+        return result[:limit] if limit is not None else result
+
+def _coerce_numeric(column: Sequence, kind: type) -> Tuple[np.ndarray, np.ndarray]:
+    """
+    تبدیل یک ستون به آرایه عددی با همان قواعد int()/float() توابع تکی
+    
+    ستون‌های عددی مستقیماً تبدیل می‌شوند؛ برای ستون‌های رشته‌ای هر مقدار یکتا
+    فقط یک بار تجزیه می‌شود.
+    
+    Returns:
+        Tuple[np.ndarray, np.ndarray]: (مقادیر float64، ماسک قابل تبدیل بودن)
+    """
+    array = np.asarray(column)
+    if array.dtype.kind in 'biuf':
+        values = array.astype(np.float64)
+        ok = np.isfinite(values)
+        if kind is int:
+            values = np.trunc(values)
+        return np.where(ok, values, 0.0), ok
+
+    uniques, inverse = np.unique(array.astype(str), return_inverse=True)
+    parsed = np.zeros(len(uniques), dtype=np.float64)
+    parsed_ok = np.zeros(len(uniques), dtype=bool)
+    for index, text in enumerate(uniques):
+        try:
+            value = float(kind(text))
+        except ValueError:
+            continue
+        if np.isfinite(value):
+            parsed[index], parsed_ok[index] = value, True
+    return parsed[inverse], parsed_ok[inverse]
+
+def validate_reading_columns(columns: Dict[str, Sequence],
+                             choices: Optional[Dict[str, Iterable[str]]] = None) -> BatchValidationResult:
+    """
+    اعتبارسنجی ستونی خوانش‌ها برای ورود انبوه
+    
+    قواعد همان توابع تکی (validate_glucose_level و ...) هستند اما روی کل ستون
+    اجرا می‌شوند؛ ستون‌هایی که در columns نیستند بررسی نمی‌شوند.
+    
+    Args:
+        columns (Dict[str, Sequence]): نام ستون -> فهرست یا آرایه مقادیر
+        choices (Optional[Dict[str, Iterable[str]]]): جایگزینی مقادیر مجاز meal_status یا mood
+        
+    Returns:
+        BatchValidationResult: مقادیر تبدیل‌شده (int64/float64/str) و ماسک خطای هر ستون
+    """
+    values, errors, messages = {}, {}, {}
+
+    for name, (kind, low, high, message) in NUMERIC_RULES.items():
+        if name not in columns:
+            continue
+        coerced, ok = _coerce_numeric(columns[name], kind)
+        ok &= (coerced >= low) & (coerced <= high)
+        values[name] = np.where(ok, coerced, 0).astype(np.int64 if kind is int else np.float64)
+        errors[name] = ~ok
+        messages[name] = message
+
+    for name, (allowed, message) in CHOICE_RULES.items():
+        if name not in columns:
+            continue
+        if choices and name in choices:
+            allowed = tuple(choices[name])
+        column = np.asarray(columns[name], dtype=object).astype(str)
+        values[name] = column
+        errors[name] = ~np.isin(column, allowed)
+        messages[name] = message
+
+    return BatchValidationResult(values, errors, messages)